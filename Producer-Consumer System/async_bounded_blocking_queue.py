@@ -0,0 +1,259 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Generic, Iterable, List, Optional, TypeVar
+
+from bounded_blocking_queue import QueueClosedError
+from events import EventHook, EventType, make_event
+
+T = TypeVar("T")
+
+
+class AsyncBoundedBlockingQueue(Generic[T]):
+    """
+    asyncio counterpart of BoundedBlockingQueue, for coroutines on one event loop:
+    - put: waits while the queue is full
+    - get: waits while the queue is empty
+    - put_many / get_many: batch variants that move as many items as possible per lock acquisition
+    - try_put / try_get: variants that never wait for room or items
+    - close: wakes every waiter; later puts fail, gets drain what is left and then fail with QueueClosedError
+
+    Producers wait on `not_full`, consumers wait on `not_empty` (two asyncio Conditions sharing one lock),
+    and every operation only wakes as many waiters of the other side as it made room/items for.
+    Waiting is cancellation-safe: a waiter that is cancelled or times out right after being woken up
+    passes the wakeup on, so no other waiter is left sleeping while it could make progress.
+    """
+
+    def __init__(self, capacity: int, observer: Optional[EventHook] = None) -> None:
+        # we want to ensure that the holding capacity of queue is positive to run any operation on it
+        if capacity < 0:
+            raise ValueError("capacity must be positive to operate on queue, exiting...")
+        # forbid deadlocks
+        if capacity == 0:
+            raise ValueError("Capacity is 0, queue will be stuck in a deadlock, exiting...")
+
+        self._capacity = capacity
+        self._queue: Deque[T] = deque()
+        self._lock = asyncio.Lock()
+        self._not_full = asyncio.Condition(self._lock) # producers wait here for free space
+        self._not_empty = asyncio.Condition(self._lock) # consumers wait here for items
+        self._observer = observer
+        self._closed = False
+
+    async def put(self, item: T, timeout: Optional[float] = None) -> None:
+        """
+        Producer puts an item into the queue.
+        Waits as long as the queue is full (i.e., when maximum capacity is reached),
+        for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError if the queue is or gets closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async with self._not_full:
+            # While queue is full, wait for space
+            while len(self._queue) >= self._capacity and not self._closed:
+                if self._observer is not None:
+                    self._observer(make_event(EventType.PRODUCER_BLOCKED, size=len(self._queue)))
+                try:
+                    await self._wait(self._not_full, self._has_room, deadline)
+                except asyncio.TimeoutError:
+                    raise TimeoutError("timed out waiting for space in the queue") from None
+
+            if self._closed:
+                raise QueueClosedError("put on a closed queue")
+
+            self._queue.append(item)
+            # Wake up one consumer waiting on empty, the only one that can take this item
+            self._not_empty.notify()
+
+    async def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Consumer removes and returns an item from the queue.
+        Waits as long as the queue is empty (i.e., when no items are in the queue),
+        for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async with self._not_empty:
+            # While queue is empty, wait for an item
+            while not self._queue:
+                if self._closed:
+                    raise QueueClosedError("get on a closed and drained queue")
+                if self._observer is not None:
+                    self._observer(make_event(EventType.CONSUMER_BLOCKED, size=len(self._queue)))
+                try:
+                    await self._wait(self._not_empty, self._has_items, deadline)
+                except asyncio.TimeoutError:
+                    raise TimeoutError("timed out waiting for an item in the queue") from None
+
+            item = self._queue.popleft()
+            # Wake up one producer waiting on full, the only one that can use the freed slot
+            self._not_full.notify()
+            return item
+
+    async def try_put(self, item: T) -> bool:
+        """
+        Put an item only if there is room right now.
+        Returns False instead of waiting for room when the queue is full; raises QueueClosedError if it is closed.
+        """
+        async with self._lock:
+            if self._closed:
+                raise QueueClosedError("put on a closed queue")
+            if len(self._queue) >= self._capacity:
+                return False
+
+            self._queue.append(item)
+            self._not_empty.notify()
+            return True
+
+    async def try_get(self, default: Any = None) -> Any:
+        """
+        Remove and return an item only if one is available right now, otherwise return `default`.
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        async with self._lock:
+            if not self._queue:
+                if self._closed:
+                    raise QueueClosedError("get on a closed and drained queue")
+                return default
+
+            item = self._queue.popleft()
+            self._not_full.notify()
+            return item
+
+    async def close(self) -> None:
+        """
+        Close the queue and wake every waiting producer and consumer.
+        Further puts raise QueueClosedError; gets still return the remaining items and raise
+        QueueClosedError once the queue is drained. Closing twice is a no-op.
+        """
+        async with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._observer is not None:
+                self._observer(make_event(EventType.QUEUE_CLOSED, size=len(self._queue)))
+            self._not_full.notify_all()
+            self._not_empty.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether close() has been called.
+        """
+        return self._closed
+
+    async def put_many(self, items: Iterable[T], timeout: Optional[float] = None) -> int:
+        """
+        Producer puts a batch of items into the queue, filling all free slots at once each time there is room.
+        Waits while the queue is full, for at most `timeout` seconds in total if given.
+        Returns the number of items put, which is less than len(items) only if the timeout expired.
+        Raises QueueClosedError if the queue is or gets closed before the whole batch is in.
+        """
+        batch = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+
+        async with self._not_full:
+            while put_count < len(batch):
+                # While queue is full, wait for space
+                while len(self._queue) >= self._capacity and not self._closed:
+                    if self._observer is not None:
+                        self._observer(make_event(EventType.PRODUCER_BLOCKED, size=len(self._queue)))
+                    try:
+                        await self._wait(self._not_full, self._has_room, deadline)
+                    except asyncio.TimeoutError:
+                        return put_count
+
+                if self._closed:
+                    raise QueueClosedError("put on a closed queue")
+
+                # Fill all the free slots at once
+                room = self._capacity - len(self._queue)
+                chunk = batch[put_count:put_count + room]
+                self._queue.extend(chunk)
+                put_count += len(chunk)
+                # Wake up at most one consumer per new item
+                self._not_empty.notify(len(chunk))
+
+            # Free slots may remain after the batch, pass the turn on to the next waiting producer
+            if self._has_room():
+                self._not_full.notify()
+
+        return put_count
+
+    async def get_many(self, max_items: int, timeout: Optional[float] = None, stop: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """
+        Consumer removes and returns up to `max_items` items from the queue under a single lock acquisition.
+        Waits as long as the queue is empty, for at most `timeout` seconds if given.
+        Returns whatever is available once at least one item is in the queue, or an empty list on timeout.
+        With `stop`, the batch ends after the first item for which stop(item) is true and the items behind it
+        stay queued (e.g. a consumer stopping at its sentinel).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async with self._not_empty:
+            # While queue is empty, wait for an item
+            while not self._queue:
+                if self._closed:
+                    raise QueueClosedError("get on a closed and drained queue")
+                if self._observer is not None:
+                    self._observer(make_event(EventType.CONSUMER_BLOCKED, size=len(self._queue)))
+                try:
+                    await self._wait(self._not_empty, self._has_items, deadline)
+                except asyncio.TimeoutError:
+                    return []
+
+            count = min(max_items, len(self._queue))
+            if stop is None:
+                items = [self._queue.popleft() for _ in range(count)]
+            else:
+                items = []
+                while len(items) < count:
+                    items.append(self._queue.popleft())
+                    if stop(items[-1]):
+                        break
+            # Wake up at most one producer per freed slot
+            self._not_full.notify(len(items))
+            # Items may remain after the batch, pass the turn on to the next waiting consumer
+            if self._queue:
+                self._not_empty.notify()
+            return items
+
+    def size(self) -> int:
+        """
+        Return the current number of items in the queue.
+        """
+        # coroutines on one loop never run concurrently with this, so no lock is needed
+        return len(self._queue)
+
+    def _has_room(self) -> bool:
+        return len(self._queue) < self._capacity
+
+    def _has_items(self) -> bool:
+        return bool(self._queue)
+
+    @staticmethod
+    async def _wait(condition: asyncio.Condition, can_proceed: Callable[[], bool], deadline: Optional[float] = None) -> None:
+        """
+        Wait on `condition` (lock held), optionally until `deadline` (raises asyncio.TimeoutError).
+        When the wait is cancelled or times out, the lock is held again and a wakeup this waiter may have
+        consumed is handed to the next waiter, so targeted notify never strands anyone.
+        """
+        try:
+            if deadline is None:
+                await condition.wait()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(condition.wait(), remaining)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if can_proceed():
+                condition.notify()
+            raise
@@ -0,0 +1,74 @@
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, List, Optional, Union
+
+from async_bounded_blocking_queue import AsyncBoundedBlockingQueue
+from bounded_blocking_queue import QueueClosedError
+from events import EventHook, EventType, make_event
+from sinks import Sink
+
+# a destination is either a list/Sink or a (sync or async) callable that receives every item
+AsyncDestination = Union[List[Any], Sink, Callable[[Any], Union[None, Awaitable[None]]]]
+
+
+class AsyncConsumer:
+    """
+    asyncio counterpart of Consumer: a coroutine worker instead of a thread.
+    process_fn and a callable destination may be plain functions or coroutine functions.
+    """
+
+    def __init__(self, queue: AsyncBoundedBlockingQueue[Any], destination: AsyncDestination, sentinel: Any, delay_seconds: float = 0.0, batch_size: int = 1,
+                 observer: Optional[EventHook] = None, name: str = "AsyncConsumer", process_fn: Optional[Callable[[Any], Any]] = None) -> None:
+        # batches must hold at least one item, otherwise nothing is ever consumed
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.name = name
+        self._queue = queue
+        self._store = destination.append if isinstance(destination, (list, Sink)) else destination
+        self._sentinel = sentinel
+        self._delay_seconds = delay_seconds
+        self._batch_size = batch_size
+        self._observer = observer
+        self._process_fn = process_fn
+
+    async def run(self) -> None:
+        """
+        Reads items from the shared queue, applies process_fn if given, and hands them to the destination,
+        until it encounters the sentinel or the queue is closed and drained, which signals stop.
+        """
+        try:
+            await self._consume()
+        except QueueClosedError:
+            pass
+
+    async def _consume(self) -> None:
+        observer = self._observer
+        while True:
+            if self._batch_size == 1:
+                batch = [await self._queue.get()]
+            else:
+                batch = await self._queue.get_many(self._batch_size, stop=self._is_sentinel)
+
+            for item in batch:
+                # Sentinel means no more real data; get_many stopped there, the items behind it are someone else's
+                if item == self._sentinel:
+                    if observer is not None:
+                        observer(make_event(EventType.SENTINEL_RECEIVED))
+                    return
+
+                if self._process_fn is not None:
+                    item = await _maybe_await(self._process_fn(item))
+                if observer is not None:
+                    observer(make_event(EventType.CONSUMED, item))
+                await _maybe_await(self._store(item))
+
+            if self._delay_seconds > 0:
+                await asyncio.sleep(self._delay_seconds * len(batch))
+
+    def _is_sentinel(self, item: Any) -> bool:
+        return item == self._sentinel
+
+
+async def _maybe_await(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, List, Optional, Union
+
+from async_bounded_blocking_queue import AsyncBoundedBlockingQueue
+from bounded_blocking_queue import QueueClosedError
+from events import EventHook, EventType, make_event
+
+AsyncSource = Union[Iterable[Any], AsyncIterable[Any]]
+
+
+class AsyncSharedIterator(AsyncIterator[Any]):
+    """
+    Wrapper around a sync or async iterable, so several async producers can draw from one source.
+    Every item is handed out exactly once; async sources are advanced by one producer at a time.
+    """
+
+    def __init__(self, source: AsyncSource) -> None:
+        self._async_iterator = source.__aiter__() if hasattr(source, "__aiter__") else None
+        self._iterator = None if self._async_iterator is not None else iter(source)
+        self._lock = asyncio.Lock()
+
+    def __aiter__(self) -> "AsyncSharedIterator":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._iterator is not None:
+            # a plain next() never yields to the loop, so no lock is needed
+            try:
+                return next(self._iterator)
+            except StopIteration:
+                raise StopAsyncIteration
+        async with self._lock:
+            return await self._async_iterator.__anext__()
+
+
+class AsyncProducer:
+    """
+    asyncio counterpart of Producer: a coroutine worker instead of a thread.
+    """
+
+    def __init__(self, source: AsyncSource, queue: AsyncBoundedBlockingQueue[Any], sentinel: Any, delay_seconds: float = 0.0, batch_size: int = 1,
+                 observer: Optional[EventHook] = None, send_sentinel: bool = True, name: str = "AsyncProducer") -> None:
+        # batches must hold at least one item, otherwise nothing is ever produced
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.name = name
+        self._source = source if isinstance(source, AsyncSharedIterator) else AsyncSharedIterator(source)
+        self._queue = queue
+        self._sentinel = sentinel
+        self._delay_seconds = delay_seconds
+        self._batch_size = batch_size
+        self._observer = observer
+        # with several producers the sentinel is sent once by whoever coordinates them
+        self._send_sentinel = send_sentinel
+
+    async def run(self) -> None:
+        """
+        Reads items from the sync or async source and places them into the shared queue,
+        then sends the sentinel, which signals stop.
+        With batch_size > 1, items are handed over to the queue in batches via put_many.
+        Stops early, without error, if the queue gets closed (shutdown).
+        """
+        try:
+            await self._produce()
+        except QueueClosedError:
+            pass
+
+    async def _produce(self) -> None:
+        observer = self._observer
+        batch: List[Any] = []
+        async for item in self._source:
+            if observer is not None:
+                observer(make_event(EventType.PRODUCED, item))
+
+            if self._batch_size == 1:
+                await self._queue.put(item)
+            else:
+                batch.append(item)
+                if len(batch) < self._batch_size:
+                    continue
+                await self._queue.put_many(batch)
+                batch = []
+
+            if self._delay_seconds > 0:
+                await asyncio.sleep(self._delay_seconds * self._batch_size)
+
+        if batch:
+            await self._queue.put_many(batch)
+
+        # Indicate that production has finished
+        if self._send_sentinel:
+            if observer is not None:
+                observer(make_event(EventType.SENTINEL_SENT))
+            await self._queue.put(self._sentinel)
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, Callable, List, Optional
+
+from async_bounded_blocking_queue import AsyncBoundedBlockingQueue
+from async_consumer import AsyncConsumer, AsyncDestination
+from async_producer import AsyncProducer, AsyncSharedIterator, AsyncSource
+from events import EventHook
+from sinks import Sink
+
+
+class AsyncProducerConsumerSystem:
+    """
+    asyncio counterpart of ProducerConsumerSystem: producers and consumers are tasks on one event loop,
+    so thousands of I/O-bound pipelines can run without a thread per stage.
+
+    The source may be a sync or async iterable and is consumed lazily. The destination defaults to a list
+    and may instead be a Sink or a sync or async callable (an async sink) that receives every item.
+    """
+
+    def __init__(self, source: AsyncSource, capacity: int = 5, producer_delay: float = 0.0, consumer_delay: float = 0.0, batch_size: int = 1,
+                 observer: Optional[EventHook] = None, num_producers: int = 1, num_consumers: int = 1,
+                 process_fn: Optional[Callable[[Any], Any]] = None, destination: Optional[AsyncDestination] = None) -> None:
+        # every pool needs at least one worker, otherwise the system never finishes
+        if num_producers < 1:
+            raise ValueError("num_producers must be at least 1")
+        if num_consumers < 1:
+            raise ValueError("num_consumers must be at least 1")
+
+        self._source_data = source # source data, consumed lazily
+        self._destination_data: AsyncDestination = [] if destination is None else destination # destination data or sink
+        self._queue = AsyncBoundedBlockingQueue[Any](capacity=capacity, observer=observer) # bounded queue shared by all workers
+        self._sentinel = object() # sentinel object which marks the end of input stream
+
+        # producers draw from one shared iterator, so each source item is produced exactly once
+        shared_source = AsyncSharedIterator(source)
+        self._producers = [
+            AsyncProducer(source=shared_source, queue=self._queue, sentinel=self._sentinel, delay_seconds=producer_delay, batch_size=batch_size,
+                          observer=observer, send_sentinel=False, name=f"AsyncProducer-{i}")
+            for i in range(num_producers)
+        ]
+        self._consumers = [
+            AsyncConsumer(queue=self._queue, destination=self._destination_data, sentinel=self._sentinel, delay_seconds=consumer_delay,
+                          batch_size=batch_size, observer=observer, name=f"AsyncConsumer-{i}", process_fn=process_fn)
+            for i in range(num_consumers)
+        ]
+
+    async def run(self) -> None:
+        """
+        Run producer and consumer tasks and wait for them to finish.
+        Once every producer is done the queue is closed; consumers drain the remaining items and stop.
+        If run() is cancelled, or any worker fails, all worker tasks are cancelled and awaited
+        before the cancellation/error propagates, so no task is left running in the background.
+        """
+        producer_tasks = [asyncio.ensure_future(producer.run()) for producer in self._producers]
+        consumer_tasks = [asyncio.ensure_future(consumer.run()) for consumer in self._consumers]
+
+        try:
+            await asyncio.gather(*producer_tasks)
+
+            # Indicate that production has finished
+            await self._queue.close()
+
+            await asyncio.gather(*consumer_tasks)
+
+            # buffered sinks may still hold the last partial batch
+            if isinstance(self._destination_data, Sink):
+                self._destination_data.flush()
+        except BaseException:
+            await self._cancel(producer_tasks + consumer_tasks)
+            raise
+
+    @staticmethod
+    async def _cancel(tasks: List["asyncio.Future[None]"]) -> None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def queue_size(self) -> int:
+        """
+        Convenience method for current queue size (mostly for debugging).
+        """
+        return self._queue.size()
@@ -0,0 +1,169 @@
+import math
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from events import EventHook, EventType, make_event
+from metrics import MetricsSnapshot, QueueMetrics
+
+
+class AutoscalePolicy(NamedTuple):
+    """
+    Bounds and thresholds for the Autoscaler. Occupancy is queue size / capacity, sampled every `interval` seconds.
+
+    A tick is under pressure when occupancy is at or above `high_watermark`, or producers spent at least
+    `blocked_share` of the tick waiting on a full queue. It is slack when occupancy is at or below
+    `low_watermark` and no producer waited. Anything in between resets both streaks, so the system only
+    scales after `scale_up_after` pressured or `scale_down_after` slack ticks in a row.
+    Scaling up multiplies consumers and capacity by `growth`; scaling down retires one consumer and
+    divides the capacity by `growth`, so bursts are absorbed quickly and resources are returned slowly.
+    """
+
+    min_consumers: int = 1
+    max_consumers: int = 8
+    min_capacity: int = 16
+    max_capacity: int = 1024
+    high_watermark: float = 0.75
+    low_watermark: float = 0.1
+    blocked_share: float = 0.05
+    scale_up_after: int = 2
+    scale_down_after: int = 20
+    interval: float = 0.05
+    growth: float = 2.0
+
+    def validate(self) -> None:
+        if not 1 <= self.min_consumers <= self.max_consumers:
+            raise ValueError("consumer bounds must satisfy 1 <= min_consumers <= max_consumers")
+        if not 1 <= self.min_capacity <= self.max_capacity:
+            raise ValueError("capacity bounds must satisfy 1 <= min_capacity <= max_capacity")
+        if not 0 <= self.low_watermark < self.high_watermark <= 1:
+            raise ValueError("watermarks must satisfy 0 <= low_watermark < high_watermark <= 1")
+        if self.scale_up_after < 1 or self.scale_down_after < 1:
+            raise ValueError("scale_up_after and scale_down_after must be at least 1")
+        if self.interval <= 0:
+            raise ValueError("interval must be positive")
+        if self.growth <= 1:
+            raise ValueError("growth must be greater than 1")
+
+
+class ScalingAction(NamedTuple):
+    """
+    Consumer count and capacity after a scaling step, and why it was taken ("pressure" or "slack").
+    """
+
+    consumers: int
+    capacity: int
+    reason: str
+
+
+class Autoscaler(threading.Thread):
+    """
+    Controller thread that resizes a BoundedBlockingQueue and its consumer pool from the queue's metrics.
+
+    Every `policy.interval` seconds it reads the occupancy and the producer blocked time recorded since the
+    previous tick (see AutoscalePolicy), and calls `start_consumer` / `retire_consumer` and
+    queue.set_capacity within the policy bounds. Each step is reported to the observer as a SCALED event.
+    ProducerConsumerSystem runs one when given `autoscale`; tick() may also be driven by hand.
+    """
+
+    def __init__(self, queue: BoundedBlockingQueue[Any], metrics: QueueMetrics, policy: AutoscalePolicy, consumers: int,
+                 start_consumer: Callable[[], None], retire_consumer: Callable[[], None],
+                 observer: Optional[EventHook] = None, name: str = "AutoscalerThread") -> None:
+        super().__init__(name=name, daemon=True)
+        policy.validate()
+
+        self._queue = queue
+        self._metrics = metrics
+        self._policy = policy
+        self._consumers = consumers
+        self._start_consumer = start_consumer
+        self._retire_consumer = retire_consumer
+        self._observer = observer
+        self._stop_event = threading.Event()
+        self._last: Optional[MetricsSnapshot] = None # metrics at the previous tick
+        self._pressured = 0 # consecutive ticks under pressure
+        self._slack = 0 # consecutive slack ticks
+
+    @property
+    def consumers(self) -> int:
+        """
+        The number of consumers the autoscaler currently runs.
+        """
+        return self._consumers
+
+    def run(self) -> None:
+        """
+        Tick every interval until stop() is called or the queue is closed.
+        """
+        while not self._stop_event.wait(self._policy.interval):
+            if self._queue.closed:
+                return
+            try:
+                self.tick()
+            except QueueClosedError:
+                return
+
+    def stop(self) -> None:
+        """
+        Ask the thread to stop; it finishes the current tick first.
+        """
+        self._stop_event.set()
+
+    def tick(self) -> Optional[ScalingAction]:
+        """
+        One control step: sample the queue, extend the pressure or slack streak, and scale once a streak
+        is long enough. Returns the action taken, or None.
+        """
+        policy = self._policy
+        snapshot = self._metrics.snapshot()
+        last, self._last = self._last, snapshot
+        occupancy = self._queue.size() / self._queue.capacity
+
+        blocked = 0.0 # share of the tick producers spent blocked
+        if last is not None and snapshot.uptime_seconds > last.uptime_seconds:
+            blocked = (snapshot.producer_blocked_seconds - last.producer_blocked_seconds) / (snapshot.uptime_seconds - last.uptime_seconds)
+
+        if occupancy >= policy.high_watermark or blocked >= policy.blocked_share:
+            self._pressured += 1
+            self._slack = 0
+        elif occupancy <= policy.low_watermark and blocked == 0:
+            self._slack += 1
+            self._pressured = 0
+        else:
+            self._pressured = self._slack = 0
+
+        if self._pressured >= policy.scale_up_after:
+            return self._scale_up()
+        if self._slack >= policy.scale_down_after:
+            return self._scale_down()
+        return None
+
+    def _scale_up(self) -> Optional[ScalingAction]:
+        policy = self._policy
+        consumers = min(policy.max_consumers, math.ceil(self._consumers * policy.growth))
+        capacity = min(policy.max_capacity, math.ceil(self._queue.capacity * policy.growth))
+        for _ in range(consumers - self._consumers):
+            self._start_consumer()
+        return self._apply(consumers, capacity, "pressure")
+
+    def _scale_down(self) -> Optional[ScalingAction]:
+        policy = self._policy
+        consumers = max(policy.min_consumers, self._consumers - 1)
+        capacity = max(policy.min_capacity, int(self._queue.capacity / policy.growth))
+        if consumers < self._consumers:
+            self._retire_consumer()
+        return self._apply(consumers, capacity, "slack")
+
+    def _apply(self, consumers: int, capacity: int, reason: str) -> Optional[ScalingAction]:
+        self._pressured = self._slack = 0
+        if consumers == self._consumers and capacity == self._queue.capacity:
+            return None # already at the bound
+
+        self._consumers = consumers
+        if capacity != self._queue.capacity:
+            self._queue.set_capacity(capacity)
+        # a queue may round the capacity, e.g. a WeightedFairQueue keeps a slot in every lane
+        action = ScalingAction(consumers, self._queue.capacity, reason)
+        if self._observer is not None:
+            self._observer(make_event(EventType.SCALED, action, size=self._queue.size()))
+        return action
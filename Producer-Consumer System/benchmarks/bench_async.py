@@ -0,0 +1,80 @@
+"""
+Benchmark: many concurrent I/O-bound pipelines, asyncio system versus threaded system.
+
+Each pipeline moves `--items` items from a producer to a consumer that waits `--io-delay`
+seconds per item (simulated I/O). The async variant runs every pipeline as tasks on one event
+loop; the threaded variant runs every ProducerConsumerSystem (two threads each) concurrently.
+
+Usage:
+    python benchmarks/bench_async.py --pipelines 1000 --items 20 --io-delay 0.001
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from async_producer_consumer_system import AsyncProducerConsumerSystem
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def run_async(pipelines: int, items: int, capacity: int, io_delay: float) -> float:
+    """Run all pipelines on one event loop and return elapsed seconds."""
+    systems = [AsyncProducerConsumerSystem(source=range(items), capacity=capacity, consumer_delay=io_delay) for _ in range(pipelines)]
+
+    async def run_all() -> None:
+        await asyncio.gather(*(system.run() for system in systems))
+
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    _check(system._destination_data for system in systems)
+    return elapsed
+
+
+def run_threaded(pipelines: int, items: int, capacity: int, io_delay: float) -> float:
+    """Run all pipelines concurrently, each driven by its own thread, and return elapsed seconds."""
+    systems = [ProducerConsumerSystem(source=range(items), capacity=capacity, consumer_delay=io_delay) for _ in range(pipelines)]
+    drivers = [threading.Thread(target=system.run) for system in systems]
+
+    start = time.perf_counter()
+    for driver in drivers:
+        driver.start()
+    for driver in drivers:
+        driver.join()
+    elapsed = time.perf_counter() - start
+
+    _check(system._destination_data for system in systems)
+    return elapsed
+
+
+def _check(destinations) -> None:
+    for destination in destinations:
+        if destination != sorted(destination):
+            raise RuntimeError("pipeline lost or reordered items")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pipelines", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--io-delay", type=float, default=0.001)
+    args = parser.parse_args()
+
+    print(f"{args.items} items per pipeline, capacity {args.capacity}, {args.io_delay}s simulated I/O per item")
+    print(f"  {'pipelines':>9} {'variant':<9} {'seconds':>8} {'items/sec':>12} {'threads':>8}")
+    for pipelines in args.pipelines:
+        total = pipelines * args.items
+        for variant, runner, threads in (("asyncio", run_async, 1), ("threads", run_threaded, 3 * pipelines + 1)):
+            elapsed = runner(pipelines, args.items, args.capacity, args.io_delay)
+            print(f"  {pipelines:>9} {variant:<9} {elapsed:>8.2f} {total / elapsed:>12,.0f} {threads:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: item latency under bursty load, static queue/consumer settings vs the autoscaler.
+
+Items arrive on a fixed schedule: a quiet rate, then a burst well above what one consumer can handle, then quiet again
+(repeated `--bursts` times). Every consumer spends `--service-ms` per item waiting on simulated I/O. Latency is
+measured from the scheduled arrival to the end of processing, so time a producer spends blocked on a full queue counts.
+Reported per configuration: p50/p99 latency, the mean number of consumer threads, and the peak queue capacity.
+
+Usage:
+    python benchmarks/bench_autoscale.py --quiet-rate 200 --burst-rate 4000 --burst-seconds 0.5 --service-ms 1
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from autoscaler import AutoscalePolicy
+from events import Event, EventType
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def schedule(quiet_rate: float, burst_rate: float, quiet_seconds: float, burst_seconds: float, bursts: int) -> List[float]:
+    """Arrival times (seconds from the start) of quiet, burst, quiet, ... phases."""
+    arrivals: List[float] = []
+    start = 0.0
+    for _ in range(bursts):
+        for rate, seconds in ((quiet_rate, quiet_seconds), (burst_rate, burst_seconds)):
+            arrivals.extend(start + i / rate for i in range(int(rate * seconds)))
+            start += seconds
+    arrivals.extend(start + i / quiet_rate for i in range(int(quiet_rate * quiet_seconds)))
+    return arrivals
+
+
+def arrivals_from(offsets: List[float]) -> Iterator[float]:
+    """Yield each item's absolute arrival time, no earlier than that time."""
+    start = time.perf_counter()
+    for offset in offsets:
+        arrival = start + offset
+        wait = arrival - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        yield arrival
+
+
+class PoolTracker:
+    """Observer recording the consumer count and capacity chosen by the autoscaler over time."""
+
+    def __init__(self, consumers: int, capacity: int) -> None:
+        self.steps: List[Tuple[float, int]] = [(time.perf_counter(), consumers)]
+        self.peak_capacity = capacity
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        if event.type is EventType.SCALED:
+            with self._lock:
+                self.steps.append((time.perf_counter(), event.item.consumers))
+                self.peak_capacity = max(self.peak_capacity, event.item.capacity)
+
+    def mean_consumers(self, end: float) -> float:
+        total = 0.0
+        for (start, consumers), (stop, _) in zip(self.steps, self.steps[1:] + [(end, 0)]):
+            total += consumers * (stop - start)
+        return total / (end - self.steps[0][0])
+
+
+def run(offsets: List[float], service_seconds: float, capacity: int, consumers: int,
+        policy: Optional[AutoscalePolicy]) -> Tuple[List[float], float, int]:
+    """Returns the latencies, the mean consumer count and the peak capacity."""
+    def service(arrival: float) -> float:
+        time.sleep(service_seconds)
+        return time.perf_counter() - arrival
+
+    tracker = PoolTracker(consumers, capacity)
+    system = ProducerConsumerSystem(source=arrivals_from(offsets), capacity=capacity, num_consumers=consumers,
+                                    process_fn=service, observer=tracker if policy is not None else None, autoscale=policy)
+    system.run()
+    return list(system._destination_data), tracker.mean_consumers(time.perf_counter()), tracker.peak_capacity
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * share))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiet-rate", type=float, default=200.0, help="items per second between bursts")
+    parser.add_argument("--burst-rate", type=float, default=4000.0, help="items per second during a burst")
+    parser.add_argument("--quiet-seconds", type=float, default=1.0)
+    parser.add_argument("--burst-seconds", type=float, default=0.5)
+    parser.add_argument("--bursts", type=int, default=2)
+    parser.add_argument("--service-ms", type=float, default=1.0, help="simulated I/O time per item")
+    parser.add_argument("--max-consumers", type=int, default=16)
+    args = parser.parse_args()
+
+    offsets = schedule(args.quiet_rate, args.burst_rate, args.quiet_seconds, args.burst_seconds, args.bursts)
+    policy = AutoscalePolicy(min_consumers=1, max_consumers=args.max_consumers, min_capacity=16, max_capacity=4096,
+                             interval=0.02, scale_up_after=2, scale_down_after=25)
+    configurations = [
+        ("static 1 consumer, capacity 16", 16, 1, None),
+        ("static 1 consumer, capacity 4096", 4096, 1, None),
+        ("static 4 consumers, capacity 64", 64, 4, None),
+        ("autoscaled", 16, 1, policy),
+    ]
+
+    print(f"{len(offsets)} items, bursts of {args.burst_rate:.0f}/s between {args.quiet_rate:.0f}/s, {args.service_ms} ms per item")
+    print(f"  {'configuration':<34} {'p50 ms':>9} {'p99 ms':>9} {'consumers':>10} {'capacity':>9}")
+    for name, capacity, consumers, configuration_policy in configurations:
+        latencies, mean_consumers, peak_capacity = run(offsets, args.service_ms / 1e3, capacity, consumers, configuration_policy)
+        values = sorted(latencies)
+        p50, p99 = (percentile(values, share) * 1e3 for share in (0.5, 0.99))
+        print(f"  {name:<34} {p50:>9.2f} {p99:>9.2f} {mean_consumers:>10.2f} {peak_capacity:>9}")
+
+
+if __name__ == "__main__":
+    main()
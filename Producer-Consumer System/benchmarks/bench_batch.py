@@ -0,0 +1,83 @@
+"""
+Benchmark: single-item put/get versus batched put_many/get_many on BoundedBlockingQueue.
+
+One producer thread pushes N integers through the queue to one consumer thread,
+and the items/sec of each path is reported.
+
+Usage:
+    python benchmarks/bench_batch.py --items 200000 --capacity 1024 --batch-sizes 1 16 64 256
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+
+
+def run_single(items: int, capacity: int) -> float:
+    """Move `items` integers through the queue one at a time, return elapsed seconds."""
+    queue = BoundedBlockingQueue[int](capacity=capacity)
+
+    def produce() -> None:
+        for i in range(items):
+            queue.put(i)
+
+    def consume() -> None:
+        for _ in range(items):
+            queue.get()
+
+    return _time_threads(produce, consume)
+
+
+def run_batched(items: int, capacity: int, batch_size: int) -> float:
+    """Move `items` integers through the queue in batches of `batch_size`, return elapsed seconds."""
+    queue = BoundedBlockingQueue[int](capacity=capacity)
+
+    def produce() -> None:
+        for start in range(0, items, batch_size):
+            queue.put_many(range(start, min(start + batch_size, items)))
+
+    def consume() -> None:
+        received = 0
+        while received < items:
+            received += len(queue.get_many(batch_size))
+
+    return _time_threads(produce, consume)
+
+
+def _time_threads(produce, consume) -> float:
+    producer = threading.Thread(target=produce)
+    consumer = threading.Thread(target=consume)
+    start = time.perf_counter()
+    producer.start()
+    consumer.start()
+    producer.join()
+    consumer.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--capacity", type=int, default=1024)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256])
+    args = parser.parse_args()
+
+    results = []
+    baseline = run_single(args.items, args.capacity)
+    results.append(("put/get", baseline))
+    for batch_size in args.batch_sizes:
+        results.append((f"put_many/get_many (batch={batch_size})", run_batched(args.items, args.capacity, batch_size)))
+
+    print(f"{args.items} items, capacity {args.capacity}")
+    for label, elapsed in results:
+        print(f"  {label:<36} {args.items / elapsed:>14,.0f} items/sec  ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: wakeups and throughput of BoundedBlockingQueue under N producers x M consumers.
+
+Compares the queue's targeted notify (separate not_full / not_empty conditions) against the
+previous scheme of one shared condition with notify_all on every put and get. Every return
+from a condition wait is counted as a wakeup; wakeups per item show the thundering herd.
+
+Usage:
+    python benchmarks/bench_contention.py --items 50000 --capacity 16 --workers 1 4 16 32
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+
+
+class CountingCondition(threading.Condition):
+    """Condition that counts how many times waiting threads are woken up."""
+
+    def __init__(self, lock, broadcast: bool = False) -> None:
+        super().__init__(lock)
+        self.wakeups = 0
+        self._broadcast = broadcast
+
+    def wait(self, timeout=None):
+        result = super().wait(timeout)
+        # still holding the lock here, so the counter needs no extra synchronization
+        self.wakeups += 1
+        return result
+
+    def notify(self, n=1):
+        # notify_all is implemented on top of notify, so broadcast by widening n instead
+        super().notify(len(self._waiters) if self._broadcast else n)
+
+
+def instrumented_queue(capacity: int, legacy: bool):
+    """Build a queue whose conditions count wakeups, optionally emulating the single notify_all condition."""
+    queue = BoundedBlockingQueue[int](capacity=capacity)
+    if legacy:
+        shared = CountingCondition(queue._lock, broadcast=True)
+        queue._not_full = queue._not_empty = shared
+        return queue, (shared,)
+    queue._not_full = CountingCondition(queue._lock)
+    queue._not_empty = CountingCondition(queue._lock)
+    return queue, (queue._not_full, queue._not_empty)
+
+
+def run(items: int, capacity: int, producers: int, consumers: int, legacy: bool):
+    """Push `items` integers from `producers` threads to `consumers` threads, return (seconds, wakeups)."""
+    queue, conditions = instrumented_queue(capacity, legacy)
+    per_producer, extra = divmod(items, producers)
+    sentinel = -1
+
+    def produce(count: int) -> None:
+        for i in range(count):
+            queue.put(i)
+
+    def consume() -> None:
+        while queue.get() != sentinel:
+            pass
+
+    producer_threads = [threading.Thread(target=produce, args=(per_producer + (1 if i < extra else 0),)) for i in range(producers)]
+    consumer_threads = [threading.Thread(target=consume) for _ in range(consumers)]
+
+    start = time.perf_counter()
+    for thread in producer_threads + consumer_threads:
+        thread.start()
+    for thread in producer_threads:
+        thread.join()
+    for _ in consumer_threads:
+        queue.put(sentinel)
+    for thread in consumer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, sum(condition.wakeups for condition in conditions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--capacity", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 32],
+                        help="thread counts to sweep, used for both producers and consumers")
+    args = parser.parse_args()
+
+    rows = []
+    for workers in args.workers:
+        for legacy in (True, False):
+            elapsed, wakeups = run(args.items, args.capacity, workers, workers, legacy)
+            rows.append((workers, "notify_all" if legacy else "targeted", elapsed, wakeups))
+
+    print(f"{args.items} items, capacity {args.capacity}")
+    print(f"  {'N x M':>7}  {'scheme':<10} {'items/sec':>12} {'wakeups':>10} {'wakeups/item':>13}")
+    for workers, scheme, elapsed, wakeups in rows:
+        print(f"  {f'{workers} x {workers}':>7}  {scheme:<10} {args.items / elapsed:>12,.0f} {wakeups:>10,} {wakeups / args.items:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: the throughput cost of ordered mode against unordered mode with several consumer threads.
+
+Every item costs `--service-us` of sleep plus up to `--jitter-us` more, so consumers finish items out of order
+and the reorder buffer has to hold some back. Reports items/sec for unordered mode and for ordered mode at
+each `--max-skew`, and the cost of ordering relative to unordered mode.
+
+Usage:
+    python benchmarks/bench_ordered.py --items 20000 --consumers 4 --max-skew 16 256 4096
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def run(items: int, consumers: int, batch_size: int, service_seconds: float, jitter_seconds: float, max_skew: Optional[int]) -> float:
+    def process(item: int) -> int:
+        # sleeping releases the GIL, like I/O-bound work
+        time.sleep(service_seconds + random.random() * jitter_seconds)
+        return item
+
+    system = ProducerConsumerSystem(source=range(items), capacity=256, num_consumers=consumers, batch_size=batch_size, process_fn=process,
+                                    ordered=max_skew is not None, max_skew=max_skew or 1)
+    start = time.perf_counter()
+    system.run()
+    elapsed = time.perf_counter() - start
+    assert len(system._destination_data) == items
+    if max_skew is not None:
+        assert system._destination_data == list(range(items))
+    return items / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--consumers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--service-us", type=float, default=50.0)
+    parser.add_argument("--jitter-us", type=float, default=200.0)
+    parser.add_argument("--max-skew", type=int, nargs="+", default=[16, 256, 4096])
+    args = parser.parse_args()
+
+    def measure(max_skew: Optional[int]) -> float:
+        return run(args.items, args.consumers, args.batch_size, args.service_us / 1e6, args.jitter_us / 1e6, max_skew)
+
+    print(f"{args.items} items, {args.consumers} consumers, batch {args.batch_size}, "
+          f"{args.service_us} us + up to {args.jitter_us} us per item")
+    print(f"  {'mode':<24} {'items/sec':>12} {'cost':>8}")
+    unordered = measure(None)
+    print(f"  {'unordered':<24} {unordered:>12,.0f}")
+    for max_skew in args.max_skew:
+        ordered = measure(max_skew)
+        print(f"  {f'ordered, max_skew {max_skew}':<24} {ordered:>12,.0f} {1 - ordered / unordered:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: per-priority latency with FIFO, priority and weighted-fair queues under a bulk backlog.
+
+A producer emits a mix of urgent (priority 0) and bulk (priority 1) items faster than the consumer can
+process them, so a backlog builds up in the queue. Each item carries the time it was produced, the consumer
+records how long it took to get through, and p50/p95/p99 latencies are reported per priority.
+
+Usage:
+    python benchmarks/bench_priority.py --items 5000 --urgent-share 0.1 --capacity 256 --service-us 100
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from priority_queues import PriorityBlockingQueue, WeightedFairQueue
+from producer_consumer_system import ProducerConsumerSystem
+
+URGENT = 0
+BULK = 1
+
+
+def priority_of(item: Tuple[int, float]) -> int:
+    return item[0]
+
+
+def make_queues(capacity: int) -> Dict[str, BoundedBlockingQueue]:
+    return {
+        "FIFO BoundedBlockingQueue": BoundedBlockingQueue(capacity=capacity),
+        "PriorityBlockingQueue": PriorityBlockingQueue(capacity=capacity, key=priority_of),
+        "WeightedFairQueue 4:1": WeightedFairQueue(weights={URGENT: 4, BULK: 1}, lane_of=priority_of,
+                                                   lane_capacity={URGENT: capacity // 4, BULK: capacity - capacity // 4}),
+    }
+
+
+def run(queue: BoundedBlockingQueue, items: int, urgent_share: float, service_seconds: float) -> Dict[int, List[float]]:
+    """Push `items` timestamped items through the system, return latencies (seconds) per priority."""
+    rng = random.Random(42)
+    priorities = [URGENT if rng.random() < urgent_share else BULK for _ in range(items)]
+    # timestamps are taken lazily, when the producer pulls the item from the source
+    source = ((priority, time.perf_counter()) for priority in priorities)
+
+    def service(item: Tuple[int, float]) -> Tuple[int, float]:
+        latency = time.perf_counter() - item[1]
+        # simulated processing time, busy-waiting for accuracy below the sleep granularity
+        end = time.perf_counter() + service_seconds
+        while time.perf_counter() < end:
+            pass
+        return item[0], latency
+
+    system = ProducerConsumerSystem(source=source, queue=queue, process_fn=service)
+    system.run()
+
+    latencies: Dict[int, List[float]] = {URGENT: [], BULK: []}
+    for priority, latency in system._destination_data:
+        latencies[priority].append(latency)
+    return latencies
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * share))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--urgent-share", type=float, default=0.1)
+    parser.add_argument("--capacity", type=int, default=256)
+    parser.add_argument("--service-us", type=float, default=100.0, help="consumer processing time per item")
+    args = parser.parse_args()
+
+    print(f"{args.items} items, {args.urgent_share:.0%} urgent, capacity {args.capacity}, {args.service_us:.0f} us per item")
+    print(f"  {'queue':<28} {'priority':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, queue in make_queues(args.capacity).items():
+        latencies = run(queue, args.items, args.urgent_share, args.service_us / 1e6)
+        for priority, label in zip((URGENT, BULK), ("urgent", "bulk")):
+            values = sorted(latencies[priority])
+            p50, p95, p99 = (percentile(values, share) * 1e3 for share in (0.5, 0.95, 0.99))
+            shown = name if priority == URGENT else ""
+            print(f"  {shown:<28} {label:<8} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
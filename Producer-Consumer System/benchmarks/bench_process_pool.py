@@ -0,0 +1,70 @@
+"""
+Benchmark: CPU-bound consumers in thread mode versus process mode.
+
+Every item runs a pure-Python CPU-heavy transform. Thread consumers share one core because
+of the GIL, while process mode spreads the work over worker processes and should scale close
+to linearly up to the number of cores.
+
+Usage:
+    python benchmarks/bench_process_pool.py --items 400 --work 20000 --batch-size 8
+"""
+
+import argparse
+import functools
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def cpu_heavy(item: int, work: int) -> int:
+    """Deliberately slow pure-Python transform."""
+    total = item
+    for i in range(work):
+        total = (total * 31 + i) % 1_000_003
+    return total
+
+
+def run(items: int, workers: int, mode: str, batch_size: int, process_fn, expected) -> float:
+    """Run one system to completion and return elapsed seconds."""
+    system = ProducerConsumerSystem(source=range(items), capacity=4 * batch_size * workers, batch_size=batch_size,
+                                    num_consumers=workers, process_fn=process_fn, consumer_mode=mode)
+    start = time.perf_counter()
+    system.run()
+    elapsed = time.perf_counter() - start
+
+    # several thread consumers interleave their results, process mode must keep input order
+    results = system._destination_data if mode == "process" else sorted(system._destination_data)
+    if results != expected:
+        raise RuntimeError("results are missing or out of order")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--work", type=int, default=20_000, help="loop iterations per item")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+    # a partial of a module level function can still be pickled for the worker processes
+    process_fn = functools.partial(cpu_heavy, work=args.work)
+    ordered = [process_fn(i) for i in range(args.items)]
+
+    print(f"{args.items} items, {args.work} iterations per item, {os.cpu_count()} cores")
+    print(f"  {'mode':<8} {'workers':>7} {'items/sec':>10} {'speedup':>8}")
+    for mode in ("thread", "process"):
+        baseline = None
+        for workers in args.workers:
+            expected = ordered if mode == "process" else sorted(ordered)
+            elapsed = run(args.items, workers, mode, args.batch_size, process_fn, expected)
+            baseline = baseline or elapsed
+            print(f"  {mode:<8} {workers:>7} {args.items / elapsed:>10,.1f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: ProducerConsumerSystem throughput as the number of producers and consumers changes.
+
+Each consumer spends `--consumer-delay` seconds per item (simulated I/O), so adding consumers
+should raise throughput until the producers or the queue become the bottleneck.
+
+Usage:
+    python benchmarks/bench_scaling.py --items 2000 --consumer-delay 0.001 --producers 1 2 --consumers 1 2 4 8 16
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def run(items: int, capacity: int, producers: int, consumers: int, consumer_delay: float, batch_size: int) -> float:
+    """Run one system to completion and return elapsed seconds."""
+    system = ProducerConsumerSystem(source=range(items), capacity=capacity, consumer_delay=consumer_delay, batch_size=batch_size,
+                                    num_producers=producers, num_consumers=consumers)
+    start = time.perf_counter()
+    system.run()
+    elapsed = time.perf_counter() - start
+
+    # shutdown must neither lose nor duplicate items
+    if len(system._destination_data) != items:
+        raise RuntimeError(f"expected {items} items, got {len(system._destination_data)}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--consumer-delay", type=float, default=0.001)
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--consumers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{args.items} items, capacity {args.capacity}, batch size {args.batch_size}, consumer delay {args.consumer_delay}s")
+    print(f"  {'producers':>9} {'consumers':>9} {'items/sec':>12} {'speedup':>8}")
+    for producers in args.producers:
+        baseline = None
+        for consumers in args.consumers:
+            elapsed = run(args.items, args.capacity, producers, consumers, args.consumer_delay, args.batch_size)
+            baseline = baseline or elapsed
+            print(f"  {producers:>9} {consumers:>9} {args.items / elapsed:>12,.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
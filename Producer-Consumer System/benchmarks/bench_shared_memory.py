@@ -0,0 +1,110 @@
+"""
+Benchmark: moving 1 MB arrays between processes with multiprocessing.Queue versus SharedMemoryQueue.
+
+A producer process sends N payloads of --size-mb megabytes (NumPy float64 arrays, or bytes if NumPy is
+not installed) to the main process, which touches every payload. multiprocessing.Queue pickles each one
+through a pipe; SharedMemoryQueue copies it into a shared slot once and the consumer either copies it
+out (get) or reads it in place (get_view). Throughput in MB/sec is reported.
+
+Usage:
+    python benchmarks/bench_shared_memory.py --items 500 --size-mb 1 --capacity 8
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import QueueClosedError
+from shared_memory_queue import SharedMemoryQueue
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def make_payload(size_bytes: int):
+    if np is not None:
+        return np.ones(size_bytes // 8, dtype=np.float64)
+    return bytes(size_bytes)
+
+
+def produce_pipe(queue, items: int, size_bytes: int) -> None:
+    payload = make_payload(size_bytes)
+    for _ in range(items):
+        queue.put(payload)
+    queue.put(None)
+
+
+def produce_shared(queue: SharedMemoryQueue, items: int, size_bytes: int) -> None:
+    payload = make_payload(size_bytes)
+    for _ in range(items):
+        queue.put(payload)
+    queue.close()
+
+
+def run_pipe(items: int, size_bytes: int, capacity: int) -> float:
+    """multiprocessing.Queue: every payload is pickled, sent through a pipe and unpickled."""
+    queue = multiprocessing.Queue(maxsize=capacity)
+    producer = multiprocessing.Process(target=produce_pipe, args=(queue, items, size_bytes))
+    start = time.perf_counter()
+    producer.start()
+    while True:
+        payload = queue.get()
+        if payload is None:
+            break
+        payload[0]
+    elapsed = time.perf_counter() - start
+    producer.join()
+    return elapsed
+
+
+def run_shared(items: int, size_bytes: int, capacity: int, zero_copy: bool) -> float:
+    """SharedMemoryQueue: one copy into the slot, then a copy out (get) or an in-place view (get_view)."""
+    with SharedMemoryQueue(capacity=capacity, slot_size=size_bytes) as queue:
+        producer = multiprocessing.Process(target=produce_shared, args=(queue, items, size_bytes))
+        start = time.perf_counter()
+        producer.start()
+        try:
+            while True:
+                if zero_copy:
+                    with queue.get_view() as payload:
+                        payload[0]
+                    del payload
+                else:
+                    queue.get()[0]
+        except QueueClosedError:
+            pass
+        elapsed = time.perf_counter() - start
+        producer.join()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--size-mb", type=float, default=1.0)
+    parser.add_argument("--capacity", type=int, default=8)
+    args = parser.parse_args()
+
+    size_bytes = int(args.size_mb * 1024 * 1024) // 8 * 8
+    total_mb = args.items * size_bytes / (1024 * 1024)
+    results = [
+        ("multiprocessing.Queue", run_pipe(args.items, size_bytes, args.capacity)),
+        ("SharedMemoryQueue.get", run_shared(args.items, size_bytes, args.capacity, zero_copy=False)),
+        ("SharedMemoryQueue.get_view", run_shared(args.items, size_bytes, args.capacity, zero_copy=True)),
+    ]
+
+    kind = "float64 arrays" if np is not None else "bytes (numpy not installed)"
+    print(f"{args.items} items of {size_bytes / (1024 * 1024):.1f} MB {kind}, capacity {args.capacity}")
+    baseline = results[0][1]
+    for label, elapsed in results:
+        print(f"  {label:<28} {total_mb / elapsed:>10,.0f} MB/sec  ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
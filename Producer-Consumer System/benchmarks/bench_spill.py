@@ -0,0 +1,96 @@
+"""
+Benchmark: a producer burst into a slow consumer, with a small in-memory queue, a huge in-memory queue and a SpillingQueue.
+
+The producer emits `--items` payloads of `--item-size` bytes as fast as it can; the consumer needs `--service-us` per item.
+A small BoundedBlockingQueue blocks the producer until the consumer catches up, a huge one lets it finish at once but holds
+the whole burst in RAM, and a SpillingQueue lets it finish early with only `--memory-capacity` items in RAM.
+Each configuration runs in its own process, so peak RSS belongs to that configuration alone.
+
+Usage:
+    python benchmarks/bench_spill.py --items 200000 --item-size 1024 --service-us 20
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Tuple
+
+try:
+    import resource
+except ImportError: # not available on Windows, peak RSS is then not reported
+    resource = None # type: ignore[assignment]
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from spilling_queue import SpillingQueue
+
+
+def run(kind: str, items: int, item_size: int, service_seconds: float, memory_capacity: int) -> Tuple[float, float, float]:
+    """Returns seconds until the producer was done, seconds until the consumer was done, and peak RSS in MB."""
+    with tempfile.TemporaryDirectory() as directory:
+        if kind == "small":
+            queue = BoundedBlockingQueue(capacity=memory_capacity)
+        elif kind == "huge":
+            queue = BoundedBlockingQueue(capacity=items)
+        else:
+            queue = SpillingQueue(capacity=items, directory=directory, memory_capacity=memory_capacity)
+
+        def consume() -> None:
+            try:
+                while True:
+                    queue.get()
+                    end = time.perf_counter() + service_seconds
+                    while time.perf_counter() < end:
+                        pass
+            except QueueClosedError:
+                pass
+
+        consumer = threading.Thread(target=consume)
+        start = time.perf_counter()
+        consumer.start()
+        for _ in range(items):
+            queue.put(bytes(item_size))
+        produced = time.perf_counter() - start
+        queue.close()
+        consumer.join()
+        consumed = time.perf_counter() - start
+        if isinstance(queue, SpillingQueue):
+            queue.release()
+
+    peak_rss = 0.0
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return produced, consumed, peak_rss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--item-size", type=int, default=1024)
+    parser.add_argument("--service-us", type=float, default=20.0)
+    parser.add_argument("--memory-capacity", type=int, default=1000)
+    args = parser.parse_args()
+
+    configurations = [
+        ("small", f"BoundedBlockingQueue({args.memory_capacity})"),
+        ("huge", f"BoundedBlockingQueue({args.items})"),
+        ("spill", f"SpillingQueue(memory {args.memory_capacity})"),
+    ]
+    print(f"{args.items} items of {args.item_size} bytes, {args.service_us} us per item in the consumer")
+    print(f"  {'queue':<34} {'producer s':>11} {'consumer s':>11} {'peak RSS MB':>12}")
+    for kind, name in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            produced, consumed, peak_rss = executor.submit(run, kind, args.items, args.item_size, args.service_us / 1e6,
+                                                           args.memory_capacity).result()
+        print(f"  {name:<34} {produced:>11.2f} {consumed:>11.2f} {peak_rss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: SPSCQueue ring buffer versus BoundedBlockingQueue with one producer and one consumer.
+
+Throughput: one producer thread pushes N integers to one consumer thread, with put/get and with
+put_many/get_many, and the items/sec of each queue is reported.
+
+Latency: the producer sends timestamps at a steady pace (so the queue is mostly empty and the consumer
+is waiting), and the consumer records how long each item took to arrive; p50/p99 are reported.
+
+Usage:
+    python benchmarks/bench_spsc.py --items 200000 --capacity 1024 --batch-size 64 --latency-items 2000
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from spsc_queue import SPSCQueue
+
+QUEUES: Dict[str, Callable[[int], object]] = {
+    "BoundedBlockingQueue": lambda capacity: BoundedBlockingQueue[int](capacity=capacity),
+    "SPSCQueue": lambda capacity: SPSCQueue[int](capacity=capacity),
+}
+
+
+def run_throughput(make_queue, items: int, capacity: int, batch_size: int) -> float:
+    """Move `items` integers from one thread to another, return elapsed seconds."""
+    queue = make_queue(capacity)
+
+    if batch_size == 1:
+        def produce() -> None:
+            for i in range(items):
+                queue.put(i)
+
+        def consume() -> None:
+            for _ in range(items):
+                queue.get()
+    else:
+        def produce() -> None:
+            for start in range(0, items, batch_size):
+                queue.put_many(range(start, min(start + batch_size, items)))
+
+        def consume() -> None:
+            received = 0
+            while received < items:
+                received += len(queue.get_many(batch_size))
+
+    return _time_threads(produce, consume)
+
+
+def run_latency(make_queue, items: int, interval: float) -> List[float]:
+    """Send `items` timestamps `interval` seconds apart, return the transfer latency of each in seconds."""
+    queue = make_queue(16)
+    latencies: List[float] = []
+
+    def produce() -> None:
+        for _ in range(items):
+            queue.put(time.perf_counter())
+            time.sleep(interval)
+
+    def consume() -> None:
+        for _ in range(items):
+            sent = queue.get()
+            latencies.append(time.perf_counter() - sent)
+
+    _time_threads(produce, consume)
+    return latencies
+
+
+def _time_threads(produce, consume) -> float:
+    producer = threading.Thread(target=produce)
+    consumer = threading.Thread(target=consume)
+    start = time.perf_counter()
+    producer.start()
+    consumer.start()
+    producer.join()
+    consumer.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--capacity", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--latency-items", type=int, default=2000)
+    parser.add_argument("--interval", type=float, default=0.0005, help="seconds between latency probes")
+    args = parser.parse_args()
+
+    print(f"throughput: {args.items} items, capacity {args.capacity}")
+    for batch_size in (1, args.batch_size):
+        label = "put/get" if batch_size == 1 else f"put_many/get_many (batch={batch_size})"
+        baseline = None
+        for name, make_queue in QUEUES.items():
+            elapsed = run_throughput(make_queue, args.items, args.capacity, batch_size)
+            baseline = baseline or elapsed
+            print(f"  {label:<36} {name:<22} {args.items / elapsed:>14,.0f} items/sec  ({baseline / elapsed:5.1f}x)")
+
+    print(f"latency: {args.latency_items} items, one every {args.interval * 1e6:.0f} us")
+    for name, make_queue in QUEUES.items():
+        latencies = sorted(run_latency(make_queue, args.latency_items, args.interval))
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"  {name:<22} p50 {p50 * 1e6:>9.1f} us   p99 {p99 * 1e6:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
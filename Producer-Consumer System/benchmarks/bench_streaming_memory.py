@@ -0,0 +1,82 @@
+"""
+Benchmark: resident memory while streaming a large generator through the producer/consumer pipeline.
+
+The source is a generator that is never materialized, and the results go to a batching callback sink
+that only counts them, so peak memory should stay flat at O(capacity) no matter how many items stream through.
+RSS is sampled while the pipeline runs; `--materialize` builds a list of the input first for comparison.
+
+Usage:
+    python benchmarks/bench_streaming_memory.py --items 10000000 --capacity 1024 --batch-size 256
+"""
+
+import argparse
+import os
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from producer_consumer_system import ProducerConsumerSystem
+from sinks import CallbackSink
+
+
+class Counter:
+    """Sink callback that counts items instead of keeping them."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, batch) -> None:
+        self.count += len(batch)
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MB (Linux), falling back to the peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000_000)
+    parser.add_argument("--capacity", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--samples", type=int, default=10, help="RSS samples taken while streaming")
+    parser.add_argument("--materialize", action="store_true", help="build a list of the whole input first, like the old system did")
+    args = parser.parse_args()
+
+    rss_start = current_rss_mb()
+    source = (i for i in range(args.items))
+    if args.materialize:
+        source = list(source)
+
+    counter = Counter()
+    system = ProducerConsumerSystem(source=source, capacity=args.capacity, batch_size=args.batch_size,
+                                    sink=CallbackSink(counter, flush_every=args.batch_size))
+    driver = threading.Thread(target=system.run)
+
+    samples = []
+    start = time.perf_counter()
+    driver.start()
+    while driver.is_alive():
+        samples.append((counter.count, current_rss_mb()))
+        driver.join(timeout=0.25)
+    elapsed = time.perf_counter() - start
+
+    step = max(1, len(samples) // args.samples)
+    print(f"{args.items:,} items, capacity {args.capacity}, batch size {args.batch_size}, "
+          f"{'materialized list' if args.materialize else 'streamed generator'}")
+    print(f"  RSS before source: {rss_start:8.1f} MB")
+    for consumed, rss in samples[::step]:
+        print(f"  {consumed:>12,} consumed  RSS {rss:8.1f} MB")
+    print(f"  peak RSS growth: {max(rss for _, rss in samples) - rss_start:8.1f} MB, {args.items / elapsed:,.0f} items/sec")
+
+
+if __name__ == "__main__":
+    main()
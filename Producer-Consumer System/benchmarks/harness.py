@@ -0,0 +1,225 @@
+"""
+Benchmark harness: sweeps ProducerConsumerSystem settings and records throughput, end-to-end latency,
+context switches and peak RSS per case, as JSON that later runs are compared against to catch regressions.
+
+Every case runs in a fresh worker process (repeated `--repeat` times, the median is reported), so peak RSS
+and context switches belong to that case alone and one case cannot warm up or pollute the next.
+Items are `--item-size` byte payloads built by the producer, stamped when the producer pulls them from the
+source; latency is measured when a consumer takes them, so it includes time spent blocked on a full queue.
+
+Cases come from a named profile or from the sweep options (every combination is run):
+    quick      small smoke sweep, a few seconds
+    sweep      capacity x item size x producers x consumers x batch size
+    scenario1  main.py scenario 1: capacity 3, producer delay 0.1 s, consumer delay 0.15 s
+    scenario2  main.py scenario 2: capacity 5, producer delay 0.02 s, consumer delay 0.05 s
+
+Usage:
+    python benchmarks/harness.py --profile quick --output results.json
+    python benchmarks/harness.py --profile quick --baseline results.json --tolerance 0.1
+    python benchmarks/harness.py --items 20000 --capacity 16 256 --consumers 1 4 --batch-size 1 32
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+except ImportError: # not available on Windows, context switches and peak RSS are then reported as None
+    resource = None # type: ignore[assignment]
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from producer_consumer_system import ProducerConsumerSystem
+
+
+class Case(NamedTuple):
+    """One benchmark configuration."""
+
+    items: int
+    capacity: int
+    item_size: int
+    producers: int
+    consumers: int
+    batch_size: int
+    producer_delay: float = 0.0
+    consumer_delay: float = 0.0
+
+    @property
+    def key(self) -> str:
+        """Stable name used to match a case against the baseline."""
+        key = f"items={self.items} capacity={self.capacity} size={self.item_size} P={self.producers} C={self.consumers} batch={self.batch_size}"
+        if self.producer_delay or self.consumer_delay:
+            key += f" delays={self.producer_delay}/{self.consumer_delay}"
+        return key
+
+
+def sweep(items: int, capacities: List[int], item_sizes: List[int], producers: List[int], consumers: List[int],
+          batch_sizes: List[int]) -> List[Case]:
+    return [Case(items, *values) for values in itertools.product(capacities, item_sizes, producers, consumers, batch_sizes)]
+
+
+PROFILES: Dict[str, List[Case]] = {
+    "quick": sweep(20000, [64], [64], [1], [1, 4], [1, 32]),
+    "sweep": sweep(50000, [8, 256], [64, 4096], [1, 4], [1, 4], [1, 32]),
+    "scenario1": [Case(10, 3, 8, 1, 1, 1, producer_delay=0.1, consumer_delay=0.15)],
+    "scenario2": [Case(10, 5, 8, 1, 1, 1, producer_delay=0.02, consumer_delay=0.05)],
+}
+
+
+def stamped_payloads(count: int, item_size: int) -> Iterator[Tuple[float, bytes]]:
+    """The producer builds every payload and stamps it as it pulls it from the source."""
+    for _ in range(count):
+        yield time.perf_counter(), bytes(item_size)
+
+
+def latency_of(item: Tuple[float, bytes]) -> float:
+    return time.perf_counter() - item[0]
+
+
+def usage() -> Tuple[Optional[int], Optional[float]]:
+    """Context switches so far and peak RSS in MB of this process, None where unsupported."""
+    if resource is None:
+        return None, None
+    rusage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = rusage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return rusage.ru_nvcsw + rusage.ru_nivcsw, peak_rss
+
+
+def measure(case: Case) -> Dict[str, Any]:
+    """Run one case to completion in this (fresh) process."""
+    switches_before, _ = usage()
+    system = ProducerConsumerSystem(source=stamped_payloads(case.items, case.item_size), capacity=case.capacity,
+                                    producer_delay=case.producer_delay, consumer_delay=case.consumer_delay,
+                                    batch_size=case.batch_size, num_producers=case.producers, num_consumers=case.consumers,
+                                    process_fn=latency_of)
+    start = time.perf_counter()
+    system.run()
+    elapsed = time.perf_counter() - start
+    switches_after, peak_rss = usage()
+
+    latencies = sorted(system._destination_data)
+    if len(latencies) != case.items:
+        raise RuntimeError(f"expected {case.items} items, got {len(latencies)}")
+    return {
+        "throughput": case.items / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "context_switches": None if switches_before is None else switches_after - switches_before,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * share))]
+
+
+def run_case(case: Case, repeat: int) -> Dict[str, Any]:
+    """Run a case `repeat` times, each in a new process, and keep the median of every metric."""
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            runs.append(executor.submit(measure, case).result())
+
+    result: Dict[str, Any] = {"case": case.key, **case._asdict()}
+    for metric in runs[0]:
+        values = [run[metric] for run in runs if run[metric] is not None]
+        result[metric] = statistics.median(values) if values else None
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float, latency_tolerance: float,
+            latency_floor_ms: float) -> List[str]:
+    """
+    Print each case next to its baseline and return the regressions: throughput more than `tolerance`
+    below the baseline, or p99 latency more than `latency_tolerance` and `latency_floor_ms` above it
+    (sub-millisecond p99s jitter by far more than any tolerance).
+    """
+    previous = {result["case"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"\ncompared with {baseline['meta']['created']} ({baseline['meta']['platform']})")
+    print(f"  {'case':<62} {'items/sec':>10} {'p99 ms':>10}")
+    for result in results:
+        old = previous.get(result["case"])
+        if old is None:
+            print(f"  {result['case']:<62} {'new':>10} {'new':>10}")
+            continue
+        throughput_change = result["throughput"] / old["throughput"] - 1
+        p99_change = result["p99_ms"] / old["p99_ms"] - 1 if old["p99_ms"] else 0.0
+        print(f"  {result['case']:<62} {throughput_change:>+10.1%} {p99_change:>+10.1%}")
+        if throughput_change < -tolerance:
+            regressions.append(f"{result['case']}: throughput {throughput_change:+.1%}")
+        if p99_change > latency_tolerance and result["p99_ms"] - old["p99_ms"] > latency_floor_ms:
+            regressions.append(f"{result['case']}: p99 latency {p99_change:+.1%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="named set of cases; overrides the sweep options")
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[64])
+    parser.add_argument("--item-size", type=int, nargs="+", default=[64], help="payload bytes per item")
+    parser.add_argument("--producers", type=int, nargs="+", default=[1])
+    parser.add_argument("--consumers", type=int, nargs="+", default=[1])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the median is reported")
+    parser.add_argument("--output", help="write the results to this JSON file (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed throughput drop vs the baseline")
+    parser.add_argument("--latency-tolerance", type=float, default=0.50, help="allowed p99 latency increase vs the baseline")
+    parser.add_argument("--latency-floor-ms", type=float, default=1.0, help="p99 increases below this are never regressions")
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        cases = PROFILES[args.profile]
+    else:
+        cases = sweep(args.items, args.capacity, args.item_size, args.producers, args.consumers, args.batch_size)
+
+    print(f"{len(cases)} cases, {args.repeat} runs each")
+    print(f"  {'case':<62} {'items/sec':>10} {'p50 ms':>8} {'p99 ms':>8} {'ctx sw':>8} {'RSS MB':>7}")
+    results = []
+    for case in cases:
+        result = run_case(case, args.repeat)
+        results.append(result)
+        switches = "-" if result["context_switches"] is None else f"{result['context_switches']:.0f}"
+        rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}"
+        print(f"  {case.key:<62} {result['throughput']:>10,.0f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {switches:>8} {rss:>7}")
+
+    document = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "profile": args.profile,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(document, indent=2) + "\n")
+        print(f"\nresults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance, args.latency_tolerance,
+                              args.latency_floor_ms)
+        if regressions:
+            print("\nregressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,47 @@
 import threading
+import time
 from collections import deque
-from typing import Deque, Generic, TypeVar
+from typing import Any, Callable, Deque, Generic, Iterable, List, Optional, TypeVar
+
+from events import EventHook, EventType, make_event
+from metrics import QueueMetrics
 
 T = TypeVar("T")
 
 
+class QueueClosedError(Exception):
+    """
+    Raised by put on a closed queue, and by get once a closed queue has been drained.
+    """
+
+
 class BoundedBlockingQueue(Generic[T]):
     """
     A bounded blocking queue that supports:
     - put: blocks when the queue is full
     - get: blocks when the queue is empty
+    - put_many / get_many: batch variants that move as many items as possible
+      per lock acquisition
+    - try_put / try_get: non-blocking variants
+    - close: wakes every waiter; later puts fail, gets drain what is left and then fail
+    - set_capacity: grows or shrinks the capacity while the queue is in use
 
-    Uses a Condition object for wait/notify thread synchronization.
+    Every blocking call accepts a `timeout` in seconds (None waits forever).
+
+    Uses two Condition objects sharing one lock for wait/notify thread synchronization:
+    producers wait on `not_full`, consumers wait on `not_empty`, and every operation
+    only wakes as many threads of the other side as it made room/items for.
+
+    An optional `observer` is notified when a producer or consumer has to block.
+    It is called while the lock is held, so it must be quick and must not call back into the queue.
+    Optional `metrics` (a metrics.QueueMetrics) records throughput, blocked time, occupancy and latency.
+
+    Items are kept in FIFO order. Subclasses change the ordering or the capacity rule by overriding
+    the storage hooks (_qsize, _has_room, _push, _push_many, _pop, _pop_many, _notify_room),
+    which are always called with the lock held.
     """
 
-    def __init__(self, capacity: int) -> None:
+    def __init__(self, capacity: int, observer: Optional[EventHook] = None, metrics: Optional[QueueMetrics] = None) -> None:
         # we want to ensure that the holding capacity of queue is positive to run any operation on it
         if capacity < 0:
             raise ValueError("capacity must be positive to operate on queue, exiting...")
@@ -24,42 +51,330 @@ class BoundedBlockingQueue(Generic[T]):
 
         self._capacity = capacity
         self._queue: Deque[T] = deque()
-        self._condition = threading.Condition()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock) # producers wait here for free space
+        self._not_empty = threading.Condition(self._lock) # consumers wait here for items
+        self._observer = observer
+        # metrics receives counts, blocked time, occupancy and latency, nothing is recorded when it is None
+        self._metrics = metrics
+        self._stamps: Deque[float] = deque() # put time of every queued item, only kept with metrics
+        self._closed = False
 
-    def put(self, item: T) -> None:
+    def put(self, item: T, timeout: Optional[float] = None) -> None:
         """
         Producer puts an item into the queue.
-        Blocked as long as the queue is full (i.e., when maximum capacity is reached)
+        Blocked as long as the queue is full (i.e., when maximum capacity is reached),
+        for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError if the queue is or gets closed.
         """
-        with self._condition:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
             # While queue is full, wait for space
-            while len(self._queue) >= self._capacity:
-                print(f"Queue is full, Producer is waiting for space. Current size: {self.size()}")
-                self._condition.wait()
+            if not self._has_room(item) and not self._wait_for_room(item, deadline):
+                raise TimeoutError("timed out waiting for space in the queue")
+            if self._closed:
+                raise QueueClosedError("put on a closed queue")
 
-            self._queue.append(item)
-            # Wake up any consumer waiting on empty
-            self._condition.notify_all()
+            self._push(item)
+            # Wake up one consumer waiting on empty, the only one that can take this item
+            self._not_empty.notify()
+            if self._metrics is not None:
+                self._metrics.record_put(1)
 
-    def get(self) -> T:
+    def get(self, timeout: Optional[float] = None) -> T:
         """
         Consumer removes and returns an item from the queue.
-        Blocked as long as the queue is empty (i.e., when no items are in the queue)
+        Blocked as long as the queue is empty (i.e., when no items are in the queue),
+        for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError once the queue is closed and empty.
         """
-        with self._condition:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
             # While queue is empty, wait for an item
-            while not self._queue:
-                print(f"Queue is empty, Consumer is waiting for an item. Current size: {self.size()}")
-                self._condition.wait()
+            if not self._qsize() and not self._wait_for_items(deadline):
+                raise TimeoutError("timed out waiting for an item in the queue")
+            if not self._qsize():
+                raise QueueClosedError("get on a closed and drained queue")
 
-            item = self._queue.popleft()
-            # Wake up any producer waiting on full
-            self._condition.notify_all()
+            item = self._pop()
+            # Wake up one producer waiting on full, the only one that can use the freed slot
+            self._notify_room([item])
+            if self._metrics is not None:
+                self._metrics.record_get(1, self._qsize() + 1)
             return item
 
+    def try_put(self, item: T) -> bool:
+        """
+        Put an item only if there is room right now.
+        Returns False instead of blocking when the queue is full; raises QueueClosedError if it is closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise QueueClosedError("put on a closed queue")
+            if not self._has_room(item):
+                return False
+
+            self._push(item)
+            self._not_empty.notify()
+            if self._metrics is not None:
+                self._metrics.record_put(1)
+            return True
+
+    def try_get(self, default: Any = None) -> Any:
+        """
+        Remove and return an item only if one is available right now, otherwise return `default`.
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        with self._lock:
+            if not self._qsize():
+                if self._closed:
+                    raise QueueClosedError("get on a closed and drained queue")
+                return default
+
+            item = self._pop()
+            self._notify_room([item])
+            if self._metrics is not None:
+                self._metrics.record_get(1, self._qsize() + 1)
+            return item
+
+    def put_many(self, items: Iterable[T], timeout: Optional[float] = None) -> int:
+        """
+        Producer puts a batch of items into the queue.
+        Each time there is room, as many items as fit are appended under a single lock acquisition,
+        so a batch costs one wakeup instead of one per item.
+        Blocks while the queue is full, for at most `timeout` seconds in total if given.
+        Returns the number of items put, which is less than len(items) only if the timeout expired.
+        Raises QueueClosedError if the queue is or gets closed before the whole batch is in.
+        """
+        batch = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+
+        with self._lock:
+            while put_count < len(batch):
+                # While queue is full, wait for space
+                if not self._has_room(batch[put_count]) and not self._wait_for_room(batch[put_count], deadline):
+                    return put_count
+                if self._closed:
+                    raise QueueClosedError("put on a closed queue")
+
+                # Fill all the free slots at once
+                added = self._push_many(batch, put_count)
+                put_count += added
+                # Wake up at most one consumer per new item
+                self._not_empty.notify(added)
+                if self._metrics is not None:
+                    self._metrics.record_put(added)
+
+            # Free slots may remain after the batch, pass the turn on to the next waiting producer
+            self._notify_room_left(batch)
+
+        return put_count
+
+    def get_many(self, max_items: int, timeout: Optional[float] = None, stop: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """
+        Consumer removes and returns up to `max_items` items from the queue under a single lock acquisition.
+        Blocked as long as the queue is empty, for at most `timeout` seconds if given.
+        Returns whatever is available once at least one item is in the queue, or an empty list on timeout.
+        With `stop`, the batch ends after the first item for which stop(item) is true and the items behind it
+        stay queued (e.g. a consumer stopping at its sentinel).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            # While queue is empty, wait for an item
+            if not self._qsize() and not self._wait_for_items(deadline):
+                return []
+            if not self._qsize():
+                raise QueueClosedError("get on a closed and drained queue")
+
+            count = min(max_items, self._qsize())
+            if stop is None:
+                items = self._pop_many(count)
+            else:
+                items = []
+                while len(items) < count:
+                    items.append(self._pop())
+                    if stop(items[-1]):
+                        break
+            # Wake up at most one producer per freed slot
+            self._notify_room(items)
+            # Items may remain after the batch, pass the turn on to the next waiting consumer
+            if self._qsize():
+                self._not_empty.notify()
+            if self._metrics is not None:
+                self._metrics.record_get(len(items), self._qsize() + len(items))
+            return items
+
+    def _wait_for_room(self, item: T, deadline: Optional[float]) -> bool:
+        """
+        Block (lock held) until there is room for `item` or the queue is closed.
+        Returns False if the deadline passed first.
+        """
+        blocked_at = None
+        try:
+            while not self._has_room(item) and not self._closed:
+                if self._observer is not None:
+                    self._observer(make_event(EventType.PRODUCER_BLOCKED, size=self._qsize()))
+                if self._metrics is not None and blocked_at is None:
+                    blocked_at = time.monotonic()
+                if not self._wait(self._not_full_for(item), deadline):
+                    return False
+            return True
+        finally:
+            if blocked_at is not None:
+                self._metrics.record_producer_blocked(time.monotonic() - blocked_at)
+
+    def _wait_for_items(self, deadline: Optional[float]) -> bool:
+        """
+        Block (lock held) until there is an item or the queue is closed.
+        Returns False if the deadline passed first.
+        """
+        blocked_at = None
+        try:
+            while not self._qsize() and not self._closed:
+                if self._observer is not None:
+                    self._observer(make_event(EventType.CONSUMER_BLOCKED, size=self._qsize()))
+                if self._metrics is not None and blocked_at is None:
+                    blocked_at = time.monotonic()
+                if not self._wait(self._not_empty, deadline):
+                    return False
+            return True
+        finally:
+            if blocked_at is not None:
+                self._metrics.record_consumer_blocked(time.monotonic() - blocked_at)
+
+    def close(self) -> None:
+        """
+        Close the queue and wake every waiting producer and consumer.
+        Further puts raise QueueClosedError; gets still return the remaining items and raise
+        QueueClosedError once the queue is drained. Closing twice is a no-op.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._observer is not None:
+                self._observer(make_event(EventType.QUEUE_CLOSED, size=self._qsize()))
+            self._notify_all_producers()
+            self._not_empty.notify_all()
+
+    @property
+    def capacity(self) -> int:
+        """
+        The current capacity.
+        """
+        return self._capacity
+
+    def set_capacity(self, capacity: int) -> None:
+        """
+        Change the capacity while the queue is in use (e.g. by autoscaler.Autoscaler).
+        Growing wakes the producers waiting for space. Shrinking below the current size keeps every queued item;
+        producers then wait until consumers have taken the queue below the new capacity.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        with self._lock:
+            grown = capacity > self._capacity
+            self._capacity = capacity
+            if grown:
+                self._notify_all_producers()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether close() has been called.
+        """
+        return self._closed
+
     def size(self) -> int:
         """
         Return the current number of items in the queue.
         """
-        with self._condition:
-            return len(self._queue)
+        with self._lock:
+            return self._qsize()
+
+    # Storage hooks: FIFO order on a deque, `capacity` items in total. Called with the lock held.
+
+    def _qsize(self) -> int:
+        return len(self._queue)
+
+    def _has_room(self, item: T) -> bool:
+        """
+        Whether `item` may be added now.
+        """
+        return len(self._queue) < self._capacity
+
+    def _push(self, item: T) -> None:
+        self._queue.append(item)
+        if self._metrics is not None:
+            self._stamps.append(time.monotonic())
+
+    def _push_many(self, batch: List[T], start: int) -> int:
+        """
+        Add items from batch[start:] for as long as there is room; returns how many were added (at least one,
+        since the caller checked there is room for the first).
+        """
+        chunk = batch[start:start + self._capacity - len(self._queue)]
+        self._queue.extend(chunk)
+        if self._metrics is not None:
+            self._stamps.extend([time.monotonic()] * len(chunk))
+        return len(chunk)
+
+    def _pop(self) -> T:
+        if self._metrics is not None:
+            self._metrics.record_latency(time.monotonic() - self._stamps.popleft())
+        return self._queue.popleft()
+
+    def _pop_many(self, count: int) -> List[T]:
+        if self._metrics is not None:
+            now = time.monotonic()
+            for _ in range(count):
+                self._metrics.record_latency(now - self._stamps.popleft())
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _not_full_for(self, item: T) -> threading.Condition:
+        """
+        The condition a producer waits on while there is no room for `item`.
+        """
+        return self._not_full
+
+    def _notify_room(self, items: List[T]) -> None:
+        """
+        Wake up at most one producer per slot freed by taking `items`.
+        """
+        self._not_full.notify(len(items))
+
+    def _notify_room_left(self, batch: List[T]) -> None:
+        """
+        Wake up the next producer if there is still room after putting `batch`.
+        """
+        if self._qsize() < self._capacity:
+            self._not_full.notify()
+
+    def _notify_all_producers(self) -> None:
+        self._not_full.notify_all()
+
+    @staticmethod
+    def _wait(condition: threading.Condition, deadline: Optional[float]) -> bool:
+        """
+        Wait on `condition` (lock held) until notified or `deadline` passes.
+        Returns False only if the deadline had already passed, so callers re-check their
+        predicate after every wakeup and never drop a notification they were given.
+        """
+        if deadline is None:
+            condition.wait()
+            return True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        condition.wait(remaining)
+        return True
@@ -1,39 +1,191 @@
 import threading
 import time
-from typing import Any, List
+from typing import Any, Callable, List, Optional, Union
 
-from bounded_blocking_queue import BoundedBlockingQueue
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from events import EventHook, EventType, make_event
+from retry import NO_RETRY, FailureHandler, ProcessingStats, RetryPolicy
+from sinks import Sink
 
 
 class Consumer(threading.Thread):
     """
     Consumer thread class.
+
+    process_fn contract: returning acknowledges the item and its result goes to the destination; raising is a
+    failed attempt. Failed items are retried under `retry` (a retry.RetryPolicy, no retries by default) once their
+    backoff is over, while the consumer goes on with new items. Items out of attempts, or whose process_fn raised
+    retry.Reject, are written to `dead_letter` as retry.DeadLetter records (dropped when it is None).
+    An exception in process_fn never stops the thread.
     """
 
-    def __init__(self, queue: BoundedBlockingQueue[Any], destination: List[Any], sentinel: Any, delay_seconds: float = 0.0) -> None:
-        super().__init__(name="ConsumerThread")
+    def __init__(self, queue: BoundedBlockingQueue[Any], destination: Union[List[Any], Sink], sentinel: Any, delay_seconds: float = 0.0, batch_size: int = 1,
+                 observer: Optional[EventHook] = None, name: str = "ConsumerThread", process_fn: Optional[Callable[[Any], Any]] = None,
+                 retry: Optional[RetryPolicy] = None, dead_letter: Optional[Union[List[Any], Sink]] = None) -> None:
+        super().__init__(name=name)
+        # batches must hold at least one item, otherwise nothing is ever consumed
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
         self._queue = queue
         self._destination = destination
         self._sentinel = sentinel
         self._delay_seconds = delay_seconds
+        self._batch_size = batch_size
+        self._observer = observer
+        # optional transform applied to every item before it is stored
+        self._process_fn = process_fn
+        # items waiting for a retry, and the outcome counters
+        self._failures = FailureHandler(NO_RETRY if retry is None else retry, dead_letter, observer)
+        self._retired = False # set by retire(), checked between items
+
+    def retire(self) -> None:
+        """
+        Ask the consumer to stop after the item or batch it is working on, e.g. when an autoscaler scales down.
+        A consumer waiting on an empty queue stops after its next item, or once the queue is closed.
+        """
+        self._retired = True
+
+    @property
+    def retired(self) -> bool:
+        """
+        Whether retire() has been called.
+        """
+        return self._retired
+
+    def stats(self) -> ProcessingStats:
+        """
+        Outcome counters of this consumer's process_fn calls.
+        """
+        return self._failures.stats()
 
     # run the consumer thread
     def run(self) -> None:
         """
-        Consumer thread reads items from the shared queue and stores them in the destination list,
-        until it encounters the sentinel, which signals stop.
+        Consumer thread reads items from the shared queue, applies process_fn if given, and stores them in the destination list or sink,
+        until it encounters the sentinel or the queue is closed and drained, which signals stop, or it is retired.
+        With batch_size > 1, items are taken from the queue in batches via get_many, each ending at the sentinel.
+        Items still waiting for a retry are finished before the thread ends.
+        """
+        try:
+            if self._batch_size > 1:
+                self._run_batched()
+            else:
+                self._run_single()
+        except QueueClosedError:
+            pass
+        self._finish_retries()
+
+    def _run_single(self) -> None:
+        """
+        Single-item variant of run: one queue access per item.
         """
-        while True:
-            item = self._queue.get()
+        observer = self._observer
+        process_fn = self._process_fn
+        failures = self._failures
+        while not self._retired:
+            if failures.pending:
+                # a retry that is due goes first, otherwise wait for a new item only until the next one is due
+                retries = failures.due(1)
+                if retries:
+                    self._retry(*retries[0])
+                    continue
+                try:
+                    item = self._queue.get(timeout=failures.wait_time())
+                except TimeoutError:
+                    continue
+            else:
+                item = self._queue.get()
 
             # Sentinel means no more real data
             if item == self._sentinel:
-                print("Consumer received sentinel, stopping")
+                if observer is not None:
+                    observer(make_event(EventType.SENTINEL_RECEIVED))
                 break
 
-            print(f"Consumed item ---- {item}")
+            if process_fn is not None:
+                try:
+                    item = process_fn(item)
+                except Exception as error:
+                    failures.failed(item, error, 1)
+                    continue
+                failures.succeeded += 1
+            if observer is not None:
+                observer(make_event(EventType.CONSUMED, item))
             self._destination.append(item)
 
             if self._delay_seconds > 0:
                 time.sleep(self._delay_seconds)
 
+    def _run_batched(self) -> None:
+        """
+        Batched variant of run: drains up to batch_size items per queue access
+        and hands each batch to the destination with a single extend.
+        """
+        observer = self._observer
+        process_fn = self._process_fn
+        failures = self._failures
+        while not self._retired:
+            if failures.pending:
+                # retries that are due go first, otherwise wait for new items only until the next one is due
+                retries = failures.due(self._batch_size)
+                for item, attempts in retries:
+                    self._retry(item, attempts)
+                if retries:
+                    continue
+                batch = self._queue.get_many(self._batch_size, timeout=failures.wait_time(), stop=self._is_sentinel)
+            else:
+                batch = self._queue.get_many(self._batch_size, stop=self._is_sentinel)
+            results = []
+
+            for item in batch:
+                # Sentinel means no more real data; get_many stopped there, the items behind it are someone else's
+                if item == self._sentinel:
+                    self._destination.extend(results)
+                    if observer is not None:
+                        observer(make_event(EventType.SENTINEL_RECEIVED))
+                    return
+
+                if process_fn is not None:
+                    try:
+                        item = process_fn(item)
+                    except Exception as error:
+                        failures.failed(item, error, 1)
+                        continue
+                    failures.succeeded += 1
+                if observer is not None:
+                    observer(make_event(EventType.CONSUMED, item))
+                results.append(item)
+
+            self._destination.extend(results)
+
+            # keep the per-item pacing of the single-item path
+            if self._delay_seconds > 0:
+                time.sleep(self._delay_seconds * len(batch))
+
+    def _is_sentinel(self, item: Any) -> bool:
+        return item == self._sentinel
+
+    def _retry(self, item: Any, attempts: int) -> None:
+        """
+        Run process_fn again on an item that failed `attempts` times so far.
+        """
+        try:
+            result = self._process_fn(item) # only items that went through process_fn can fail
+        except Exception as error:
+            self._failures.failed(item, error, attempts + 1)
+            return
+        self._failures.succeeded += 1
+        if self._observer is not None:
+            self._observer(make_event(EventType.CONSUMED, result))
+        self._destination.append(result)
+
+    def _finish_retries(self) -> None:
+        """
+        Wait out the backoff of the items still waiting for a retry and process them.
+        """
+        failures = self._failures
+        while failures.pending:
+            time.sleep(failures.wait_time() or 0.0)
+            for item, attempts in failures.due(failures.pending):
+                self._retry(item, attempts)
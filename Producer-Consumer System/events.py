@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, List, NamedTuple, Optional
+
+
+class EventType(Enum):
+    """
+    Kinds of events reported by the queue, producer and consumer.
+    """
+
+    PRODUCER_BLOCKED = "producer_blocked" # queue is full, producer waits for space
+    CONSUMER_BLOCKED = "consumer_blocked" # queue is empty, consumer waits for an item
+    PRODUCED = "produced"
+    CONSUMED = "consumed"
+    SENTINEL_SENT = "sentinel_sent" # producer finished and sent the end-of-stream marker
+    SENTINEL_RECEIVED = "sentinel_received" # consumer received the end-of-stream marker
+    QUEUE_CLOSED = "queue_closed" # queue was closed, waiters are woken up and consumers drain what is left
+    ITEM_FAILED = "item_failed" # process_fn raised on an item, it is retried or dead-lettered
+    DEAD_LETTERED = "dead_lettered" # an item was given up on after its last attempt
+    SCALED = "scaled" # autoscaler changed the consumer count or capacity, item is an autoscaler.ScalingAction
+
+
+class Event(NamedTuple):
+    """
+    A single observed event.
+    """
+
+    type: EventType
+    thread: str # name of the thread that raised the event
+    item: Any # item involved, None for blocked events
+    size: Optional[int] # queue size at the time of a blocked/closed event, None otherwise
+    timestamp: float # time.monotonic() when the event happened
+
+
+# An observer is any callable that accepts an Event.
+# Components skip building events entirely when no observer is set, so disabled observing costs one `is None` check.
+EventHook = Callable[[Event], None]
+
+
+def make_event(event_type: EventType, item: Any = None, size: Optional[int] = None) -> Event:
+    """
+    Build an event stamped with the current thread and time.
+    """
+    return Event(event_type, threading.current_thread().name, item, size, time.monotonic())
+
+
+class RingBufferCollector:
+    """
+    Observer that keeps the most recent `maxlen` events in memory.
+    Appending to a bounded deque is thread-safe and O(1), so it is cheap enough to call while the queue holds its lock.
+    """
+
+    def __init__(self, maxlen: int = 1024) -> None:
+        if maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self._events: Deque[Event] = deque(maxlen=maxlen)
+
+    def __call__(self, event: Event) -> None:
+        self._events.append(event)
+
+    def events(self) -> List[Event]:
+        """
+        Return a snapshot of the collected events, oldest first.
+        """
+        return list(self._events)
+
+    def clear(self) -> None:
+        """
+        Drop all collected events.
+        """
+        self._events.clear()
+
+
+class LoggingObserver:
+    """
+    Observer that writes events to a `logging` logger, using the same messages the components used to print.
+    Blocked events are logged while the queue holds its lock, so prefer a non-blocking handler under load.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+        self._logger = logger if logger is not None else logging.getLogger("producer_consumer")
+        self._level = level
+
+    def __call__(self, event: Event) -> None:
+        if not self._logger.isEnabledFor(self._level):
+            return
+        self._logger.log(self._level, format_event(event))
+
+
+def format_event(event: Event) -> str:
+    """
+    Human readable message for an event.
+    """
+    if event.type is EventType.PRODUCER_BLOCKED:
+        return f"Queue is full, Producer is waiting for space. Current size: {event.size}"
+    if event.type is EventType.CONSUMER_BLOCKED:
+        return f"Queue is empty, Consumer is waiting for an item. Current size: {event.size}"
+    if event.type is EventType.PRODUCED:
+        return f"Producing item ---- {event.item}"
+    if event.type is EventType.CONSUMED:
+        return f"Consumed item ---- {event.item}"
+    if event.type is EventType.SENTINEL_SENT:
+        return "Producer finished, sending sentinel"
+    if event.type is EventType.QUEUE_CLOSED:
+        return f"Queue closed, consumers drain the remaining items. Current size: {event.size}"
+    if event.type is EventType.ITEM_FAILED:
+        return f"Processing failed for item ---- {event.item}"
+    if event.type is EventType.DEAD_LETTERED:
+        return f"Giving up on item ---- {event.item}"
+    if event.type is EventType.SCALED:
+        action = event.item
+        return f"Autoscaler ({action.reason}): {action.consumers} consumers, capacity {action.capacity}. Current size: {event.size}"
+    return "Consumer received sentinel, stopping"
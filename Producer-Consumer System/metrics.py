@@ -0,0 +1,251 @@
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# queue occupancy buckets: 0, 1, 2, 4, ... 65536 items
+DEFAULT_OCCUPANCY_BUCKETS = (0,) + tuple(2 ** i for i in range(17))
+# item latency buckets: 10 us ... ~10 s, roughly x2.5 per bucket
+DEFAULT_LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HistogramSnapshot(NamedTuple):
+    """
+    Point-in-time copy of a histogram. `counts[i]` holds the observations <= `bounds[i]`
+    (and > bounds[i - 1]); the last count is the overflow bucket above the highest bound.
+    """
+
+    bounds: Sequence[float]
+    counts: Sequence[int]
+    count: int
+    sum: float
+    max: float
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, share: float) -> float:
+        """
+        Upper bound of the bucket holding the `share` (0..1) quantile, or the largest value
+        seen when it falls into the overflow bucket. 0.0 when nothing was observed.
+        """
+        if not self.count:
+            return 0.0
+        rank = share * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: observe() is a binary search and an increment, no per-value storage.
+    Not thread-safe, one thread at a time may observe.
+    """
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        if list(bounds) != sorted(set(bounds)) or not bounds:
+            raise ValueError("bucket bounds must be non-empty, sorted and unique")
+        self._bounds = tuple(bounds)
+        self._counts = [0] * (len(bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._count += 1
+        self._sum += value
+        if value > self._max:
+            self._max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self._bounds, tuple(self._counts), self._count, self._sum, self._max)
+
+
+class MetricsSnapshot(NamedTuple):
+    """
+    Point-in-time copy of QueueMetrics. Rates are items per second since the metrics were created.
+    """
+
+    uptime_seconds: float
+    items_put: int
+    items_got: int
+    put_rate: float
+    get_rate: float
+    producer_blocked_count: int # number of times a producer had to wait for space
+    producer_blocked_seconds: float # total time producers spent waiting on a full queue
+    consumer_blocked_count: int # number of times a consumer had to wait for an item
+    consumer_blocked_seconds: float # total time consumers spent waiting on an empty queue
+    queue_size: int # items put but not yet taken
+    occupancy: HistogramSnapshot # queue size seen by every get
+    latency: HistogramSnapshot # seconds each item spent between put and get
+
+
+class QueueMetrics:
+    """
+    Counters and histograms for one queue: items put/got, time producers/consumers spend blocked,
+    queue occupancy (sampled at every get) and item latency (time from put to get).
+
+    Pass it as `metrics` to a queue or to ProducerConsumerSystem; use one QueueMetrics per queue.
+    Recording takes no lock of its own: BoundedBlockingQueue records while holding its lock, and SPSCQueue
+    records producer-side counters from the producer and everything else from the consumer, so every
+    field has one writer at a time. A queue without metrics skips all of it with one `is None` check.
+    Read it with snapshot(), or export it in the Prometheus text format with prometheus_text(),
+    write_prometheus(path) or serve_prometheus(port).
+    """
+
+    def __init__(self, occupancy_buckets: Sequence[float] = DEFAULT_OCCUPANCY_BUCKETS,
+                 latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self._started = time.monotonic()
+        self._items_put = 0
+        self._items_got = 0
+        self._producer_blocked_count = 0
+        self._producer_blocked_seconds = 0.0
+        self._consumer_blocked_count = 0
+        self._consumer_blocked_seconds = 0.0
+        self._occupancy = Histogram(occupancy_buckets)
+        self._latency = Histogram(latency_buckets)
+
+    def record_put(self, count: int) -> None:
+        """
+        `count` items were put.
+        """
+        self._items_put += count
+
+    def record_get(self, count: int, size: int, latency: Optional[float] = None) -> None:
+        """
+        `count` items were taken from a queue that held `size` items.
+        A single item's `latency` may be passed along instead of calling record_latency.
+        """
+        self._items_got += count
+        self._occupancy.observe(size)
+        if latency is not None:
+            self._latency.observe(latency)
+
+    def record_latency(self, seconds: float) -> None:
+        """
+        An item was taken `seconds` after it was put.
+        """
+        self._latency.observe(seconds)
+
+    def record_producer_blocked(self, seconds: float) -> None:
+        self._producer_blocked_count += 1
+        self._producer_blocked_seconds += seconds
+
+    def record_consumer_blocked(self, seconds: float) -> None:
+        self._consumer_blocked_count += 1
+        self._consumer_blocked_seconds += seconds
+
+    def snapshot(self) -> MetricsSnapshot:
+        """
+        Return a copy of all counters and histograms. It may be taken while the queue is in use,
+        so values recorded at the same moment can be one operation apart.
+        """
+        uptime = time.monotonic() - self._started
+        items_put = self._items_put
+        items_got = self._items_got
+        return MetricsSnapshot(
+            uptime_seconds=uptime,
+            items_put=items_put,
+            items_got=items_got,
+            put_rate=items_put / uptime if uptime > 0 else 0.0,
+            get_rate=items_got / uptime if uptime > 0 else 0.0,
+            producer_blocked_count=self._producer_blocked_count,
+            producer_blocked_seconds=self._producer_blocked_seconds,
+            consumer_blocked_count=self._consumer_blocked_count,
+            consumer_blocked_seconds=self._consumer_blocked_seconds,
+            queue_size=max(0, items_put - items_got),
+            occupancy=self._occupancy.snapshot(),
+            latency=self._latency.snapshot(),
+        )
+
+    def prometheus_text(self, prefix: str = "producer_consumer", labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Render a snapshot in the Prometheus text exposition format; `labels` are added to every sample.
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def sample(name: str, kind: str, help_text: str, value: float) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name}{_labels(labels)} {_number(value)}")
+
+        def histogram(name: str, help_text: str, data: HistogramSnapshot) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            cumulative = 0
+            for bound, count in zip(list(data.bounds) + [float("inf")], data.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{prefix}_{name}_bucket{_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{prefix}_{name}_sum{_labels(labels)} {_number(data.sum)}")
+            lines.append(f"{prefix}_{name}_count{_labels(labels)} {data.count}")
+
+        sample("items_put_total", "counter", "Items put into the queue.", snapshot.items_put)
+        sample("items_got_total", "counter", "Items taken from the queue.", snapshot.items_got)
+        sample("producer_blocked_total", "counter", "Times a producer waited on a full queue.", snapshot.producer_blocked_count)
+        sample("producer_blocked_seconds_total", "counter", "Time producers spent waiting on a full queue.", snapshot.producer_blocked_seconds)
+        sample("consumer_blocked_total", "counter", "Times a consumer waited on an empty queue.", snapshot.consumer_blocked_count)
+        sample("consumer_blocked_seconds_total", "counter", "Time consumers spent waiting on an empty queue.", snapshot.consumer_blocked_seconds)
+        sample("queue_size", "gauge", "Items put but not yet taken.", snapshot.queue_size)
+        histogram("queue_occupancy", "Items in the queue when a consumer takes from it.", snapshot.occupancy)
+        histogram("item_latency_seconds", "Time items spent in the queue.", snapshot.latency)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "producer_consumer", labels: Optional[Dict[str, str]] = None) -> None:
+        """
+        Write the Prometheus text to `path` atomically, e.g. for the node_exporter textfile collector.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text(prefix, labels))
+        os.replace(temporary, path)
+
+    def serve_prometheus(self, port: int = 0, host: str = "127.0.0.1", prefix: str = "producer_consumer",
+                         labels: Optional[Dict[str, str]] = None) -> ThreadingHTTPServer:
+        """
+        Serve the Prometheus text over HTTP from a daemon thread (any path, GET only).
+        Port 0 picks a free port, see `server.server_address`. Call `server.shutdown()` to stop it.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.prometheus_text(prefix, labels).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass # scrapes are not worth a log line each
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="MetricsHTTPServer", daemon=True).start()
+        return server
+
+
+def _labels(labels: Optional[Dict[str, str]], **extra: str) -> str:
+    merged = {**(labels or {}), **extra}
+    if not merged:
+        return ""
+    escaped = (f'{key}="{_escape(str(value))}"' for key, value in merged.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
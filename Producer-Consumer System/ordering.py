@@ -0,0 +1,145 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from bounded_blocking_queue import QueueClosedError
+from sinks import Sink
+
+# placeholder for a sequence number whose item will never arrive (dead-lettered)
+_SKIPPED = object()
+
+
+class ReorderBuffer(Sink):
+    """
+    Sink that restores input order behind several consumers.
+
+    Consumers hand it (seq, item) pairs in any order; it holds the pairs that arrived early and writes the
+    items to `destination` strictly by sequence number, starting at 0. A sequence number that will never
+    arrive (e.g. a dead-lettered item) must be released with skip().
+
+    The buffer is bounded from the producer side: a producer calls wait_for_window(seq) before it queues
+    item `seq`, which blocks while seq is `max_skew` or more ahead of the next item to be written.
+    At most max_skew items are then in flight between producers and the buffer, so the buffer never holds
+    more than that, and consumers never block on it. Blocking the consumers instead could deadlock,
+    since the item everyone waits for may sit in a blocked consumer's retry heap.
+    """
+
+    def __init__(self, destination: Union[List[Any], Sink], max_skew: int = 1024) -> None:
+        # at least one item must be allowed in flight, otherwise nothing is ever produced
+        if max_skew < 1:
+            raise ValueError("max_skew must be at least 1")
+        self._destination = destination
+        self._max_skew = max_skew
+        self._early: Dict[int, Any] = {} # items that arrived before their turn, by sequence number
+        self._next = 0 # sequence number of the next item to write out
+        self._closed = False
+        self._lock = threading.Lock()
+        self._window = threading.Condition(self._lock) # producers waiting for their sequence number to fit
+
+    @property
+    def max_skew(self) -> int:
+        return self._max_skew
+
+    @property
+    def next_seq(self) -> int:
+        """
+        Sequence number of the next item to be written to the destination.
+        """
+        return self._next
+
+    def pending(self) -> int:
+        """
+        The number of items held back until the items before them arrive.
+        """
+        return len(self._early)
+
+    def extend(self, items: Iterable[Tuple[int, Any]]) -> None:
+        with self._lock:
+            for seq, item in items:
+                self._early[seq] = item
+            self._release()
+
+    def skip(self, seq: int) -> None:
+        """
+        Give up on sequence number `seq`: the items after it are written out without waiting for it.
+        """
+        with self._lock:
+            self._early[seq] = _SKIPPED
+            self._release()
+
+    def _release(self) -> None:
+        """
+        Write out every item whose predecessors are all done. Called with the lock held,
+        so the destination sees the items in order even with several consumers.
+        """
+        early = self._early
+        start = self._next
+        ready = []
+        while self._next in early:
+            item = early.pop(self._next)
+            if item is not _SKIPPED:
+                ready.append(item)
+            self._next += 1
+        if ready:
+            self._destination.extend(ready)
+        if self._next != start:
+            self._window.notify_all()
+
+    def wait_for_window(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until item `seq` is less than max_skew ahead of the next item to be written, for at most `timeout`
+        seconds if given. Returns whether it fits. Raises QueueClosedError once close_window() was called.
+        """
+        with self._window:
+            fits = self._window.wait_for(lambda: self._closed or seq < self._next + self._max_skew, timeout)
+            if self._closed:
+                raise QueueClosedError("wait_for_window on a closed reorder buffer")
+            return fits
+
+    def close_window(self) -> None:
+        """
+        Wake every producer waiting for the window with QueueClosedError, e.g. on shutdown.
+        Consumers can still deliver items afterwards.
+        """
+        with self._window:
+            self._closed = True
+            self._window.notify_all()
+
+    def flush(self) -> None:
+        if isinstance(self._destination, Sink):
+            self._destination.flush()
+
+
+class Sequenced:
+    """
+    Runs a process_fn on the item of a (seq, item) pair and keeps the sequence number with the result.
+    A class rather than a closure so it can be pickled for a process pool.
+    """
+
+    def __init__(self, process_fn: Callable[[Any], Any]) -> None:
+        self._process_fn = process_fn
+
+    def __call__(self, pair: Tuple[int, Any]) -> Tuple[int, Any]:
+        seq, item = pair
+        return seq, self._process_fn(item)
+
+
+class SequencedDeadLetters(Sink):
+    """
+    Dead-letter destination for ordered mode: releases the sequence number of every dead-lettered item from
+    the ReorderBuffer, so the items after it are not held back, and passes the DeadLetter on with the plain item.
+    """
+
+    def __init__(self, reorder: ReorderBuffer, destination: Optional[Union[List[Any], Sink]] = None) -> None:
+        self._reorder = reorder
+        self._destination = destination
+
+    def extend(self, letters: Iterable[Any]) -> None:
+        for letter in letters:
+            seq, item = letter.item
+            if self._destination is not None:
+                self._destination.append(letter._replace(item=item))
+            self._reorder.skip(seq)
+
+    def flush(self) -> None:
+        if isinstance(self._destination, Sink):
+            self._destination.flush()
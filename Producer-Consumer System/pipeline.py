@@ -0,0 +1,401 @@
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from consumer import Consumer
+from events import EventHook, EventType, make_event
+from process_consumer import ProcessPoolConsumer
+from producer import Producer
+from retry import NO_RETRY, DeadLetter, FailureHandler, ProcessingStats, RetryPolicy
+from sinks import QueueSink, Sink
+
+STAGE_MODES = ("thread", "process", "async")
+
+
+class StageError(Exception):
+    """
+    Raised by Pipeline.run when items failed for good in a stage that has no dead-letter destination.
+    `dead_letters` holds their retry.DeadLetter records; the first one's error is the cause.
+    """
+
+    def __init__(self, stage: str, dead_letters: List[DeadLetter]) -> None:
+        super().__init__(f"{len(dead_letters)} items failed in {stage}")
+        self.stage = stage
+        self.dead_letters = dead_letters
+
+
+class Stage(NamedTuple):
+    """
+    One step of a Pipeline: `fns` are applied in order to every item by `workers` workers of kind `mode`.
+    The stage reads from its own bounded queue of `capacity` items, `batch_size` items at a time.
+    Failed items are retried under `retry` and written to `dead_letter` once they are out of attempts.
+    """
+
+    name: str
+    fns: Tuple[Callable[[Any], Any], ...] # more than one when later stages were fused into this one
+    workers: int
+    mode: str
+    capacity: int
+    batch_size: int
+    retry: Optional[RetryPolicy]
+    dead_letter: Optional[Union[List[Any], Sink]]
+
+
+class Pipeline:
+    """
+    Builder for a chain of stages, each with its own workers, linked by BoundedBlockingQueues:
+
+        results = (Pipeline(source)
+                   .stage(parse, workers=2)
+                   .stage(enrich, workers=4, mode="process")
+                   .stage(write, mode="async", workers=64)
+                   .run())
+
+    Every stage reads items from its input queue, applies its function and puts the results into the next
+    stage's queue; the last stage writes to the destination (a list by default, or `sink`).
+    A stage runs in one of three modes:
+    - "thread": `workers` Consumer threads
+    - "process": a ProcessPoolConsumer dispatching batches to `workers` worker processes (fn must be picklable)
+    - "async": one thread running an event loop with up to `workers` calls of fn in flight; fn may be sync or async
+
+    Every queue is bounded and a full queue blocks the stage feeding it, so a slow stage holds back every stage
+    before it, down to the source. `fuse=True` runs a stage's function in the previous stage's workers instead,
+    which saves the queue hop and its wakeups for cheap steps.
+
+    An item whose function raises does not stop the stage, in any mode: it is retried under the stage's `retry`
+    (a retry.RetryPolicy, no retries by default) and written to its `dead_letter` as a retry.DeadLetter once it is
+    out of attempts or rejected with retry.Reject. When a stage without a dead-letter destination gave up on items,
+    run() raises StageError after the pipeline has finished. processing_stats() reports the outcomes per stage.
+
+    Shutdown cascades: once the source is exhausted the first queue is closed, each stage drains its queue and
+    stops, its output is flushed and the next queue is closed, and so on until the last stage is done.
+    """
+
+    def __init__(self, source: Iterable[Any], capacity: int = 64, sink: Optional[Sink] = None,
+                 observer: Optional[EventHook] = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self._source = source
+        self._capacity = capacity # default capacity of every stage's input queue
+        self._destination: Union[List[Any], Sink] = [] if sink is None else sink
+        self._observer = observer
+        self._stages: List[Stage] = []
+        self._workers: List[List[threading.Thread]] = [] # the workers of each stage in the last run
+
+    def stage(self, fn: Callable[[Any], Any], workers: int = 1, mode: str = "thread", capacity: Optional[int] = None,
+              batch_size: int = 1, fuse: bool = False, name: Optional[str] = None, retry: Optional[RetryPolicy] = None,
+              dead_letter: Optional[Union[List[Any], Sink]] = None) -> "Pipeline":
+        """
+        Append a stage and return the pipeline, so calls can be chained.
+        With `fuse=True` fn runs in the previous stage's workers (its other settings are not used),
+        so it has to suit that stage's mode.
+        """
+        if fuse:
+            if not self._stages:
+                raise ValueError("the first stage has nothing to fuse with")
+            previous = self._stages[-1]
+            self._stages[-1] = previous._replace(fns=previous.fns + (fn,))
+            return self
+
+        if mode not in STAGE_MODES:
+            raise ValueError(f"mode must be one of {STAGE_MODES}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if retry is not None:
+            retry.validate()
+
+        stage_name = name if name is not None else f"Stage{len(self._stages)}"
+        self._stages.append(Stage(stage_name, (fn,), workers, mode, capacity or self._capacity, batch_size, retry, dead_letter))
+        return self
+
+    @property
+    def stages(self) -> List[Stage]:
+        """
+        The stages after fusing, in order.
+        """
+        return list(self._stages)
+
+    def run(self, timeout: Optional[float] = None) -> Union[List[Any], Sink]:
+        """
+        Start the source and every stage, wait until the last item has passed the last stage and return the destination.
+
+        With a timeout (seconds for the whole run), every queue is closed when the deadline passes, which wakes
+        all blocked workers, and TimeoutError is raised naming the first stage that had not finished.
+        Raises StageError when a stage without a dead-letter destination gave up on items, and the error of a
+        stage whose workers broke down (e.g. BrokenProcessPool).
+        """
+        if not self._stages:
+            raise ValueError("a pipeline needs at least one stage")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        sentinel = object() # never sent, the queues are closed instead
+        queues = [BoundedBlockingQueue[Any](capacity=stage.capacity, observer=self._observer) for stage in self._stages]
+        # each stage writes its results into the next stage's queue, one batch at a time
+        outputs: List[Union[List[Any], Sink]] = [StageLink(queue, upstream, flush_every=stage.batch_size)
+                                                  for stage, upstream, queue in zip(self._stages, queues, queues[1:])]
+        outputs.append(self._destination)
+
+        source = Producer(source=self._source, queue=queues[0], sentinel=sentinel, batch_size=self._stages[0].batch_size,
+                          observer=self._observer, send_sentinel=False, name="PipelineSourceThread")
+        # stages without a dead-letter destination collect their failed items here, to be raised at the end
+        dead_letters = [stage.dead_letter if stage.dead_letter is not None else [] for stage in self._stages]
+        executors: List[ProcessPoolExecutor] = []
+        workers = [self._start_workers(stage, queue, output, dead_letter, sentinel, executors)
+                   for stage, queue, output, dead_letter in zip(self._stages, queues, outputs, dead_letters)]
+        self._workers = workers
+        source.start()
+
+        try:
+            # close each queue once everything feeding it is done, starting with the source
+            finished = self._join([source], deadline)
+            for index in range(len(self._stages)):
+                queues[index].close()
+                if not finished:
+                    raise TimeoutError(f"{'source' if index == 0 else self._stages[index - 1].name} did not finish before the deadline")
+                finished = self._join(workers[index], deadline)
+                if finished and isinstance(outputs[index], Sink):
+                    outputs[index].flush()
+                if finished and isinstance(dead_letters[index], Sink):
+                    dead_letters[index].flush()
+            if not finished:
+                raise TimeoutError(f"{self._stages[-1].name} did not finish before the deadline")
+            # a failed stage closes its queue and so stops the stages before it, the last failure is the cause
+            for stage_workers in reversed(workers):
+                for worker in stage_workers:
+                    error = getattr(worker, "error", None)
+                    if error is not None:
+                        raise error
+        except BaseException:
+            # wake every worker still blocked on a queue and drop pending process batches
+            for queue in queues:
+                queue.close()
+            for executor in executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        for executor in executors:
+            executor.shutdown()
+        for stage, dead_letter in zip(self._stages, dead_letters):
+            if stage.dead_letter is None and dead_letter:
+                raise StageError(stage.name, dead_letter) from dead_letter[0].error
+        return self._destination
+
+    def processing_stats(self) -> Dict[str, ProcessingStats]:
+        """
+        Outcome counters of each stage's function calls in the last run, by stage name.
+        """
+        return {stage.name: ProcessingStats.combine(worker.stats() for worker in stage_workers)
+                for stage, stage_workers in zip(self._stages, self._workers)}
+
+    def _start_workers(self, stage: Stage, queue: BoundedBlockingQueue[Any], output: Union[List[Any], Sink],
+                       dead_letter: Union[List[Any], Sink], sentinel: Any, executors: List[ProcessPoolExecutor]) -> List[threading.Thread]:
+        """
+        Create and start the threads of one stage.
+        """
+        fn = stage.fns[0] if len(stage.fns) == 1 else Chain(stage.fns)
+        threads: List[threading.Thread]
+        if stage.mode == "thread":
+            threads = [Consumer(queue=queue, destination=output, sentinel=sentinel, batch_size=stage.batch_size, observer=self._observer,
+                                name=f"{stage.name}Thread-{i}", process_fn=fn, retry=stage.retry, dead_letter=dead_letter)
+                       for i in range(stage.workers)]
+        elif stage.mode == "process":
+            executor = ProcessPoolExecutor(max_workers=stage.workers)
+            executors.append(executor)
+            threads = [ProcessPoolConsumer(queue=queue, destination=output, sentinel=sentinel, process_fn=fn, executor=executor,
+                                           batch_size=stage.batch_size, max_pending=2 * stage.workers, observer=self._observer,
+                                           name=f"{stage.name}DispatcherThread", retry=stage.retry, dead_letter=dead_letter)]
+        else:
+            threads = [AsyncStageWorker(queue=queue, destination=output, fns=stage.fns, concurrency=stage.workers,
+                                        observer=self._observer, name=f"{stage.name}LoopThread", retry=stage.retry,
+                                        dead_letter=dead_letter)]
+
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _join(threads: Sequence[threading.Thread], deadline: Optional[float]) -> bool:
+        """
+        Join every thread, giving up at the deadline. Returns whether all of them finished.
+        """
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in threads)
+
+
+class StageLink(QueueSink):
+    """
+    QueueSink from one stage into the next stage's queue. Should that queue be closed early (the next stage failed,
+    or the deadline passed), the stage's own input queue is closed as well, so the failure travels back to the source
+    instead of leaving the stages before it blocked on full queues.
+    """
+
+    def __init__(self, queue: BoundedBlockingQueue[Any], upstream: BoundedBlockingQueue[Any], flush_every: int = 100) -> None:
+        super().__init__(queue, flush_every)
+        self._upstream = upstream
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        try:
+            super()._write_batch(batch)
+        except QueueClosedError:
+            self._upstream.close()
+            raise
+
+
+class Chain:
+    """
+    Applies several functions in order, the result of each feeding the next.
+    A class rather than a closure so fused stages can be pickled for process mode.
+    """
+
+    def __init__(self, fns: Sequence[Callable[[Any], Any]]) -> None:
+        self._fns = tuple(fns)
+
+    def __call__(self, item: Any) -> Any:
+        for fn in self._fns:
+            item = fn(item)
+        return item
+
+
+class AsyncStageWorker(threading.Thread):
+    """
+    Thread running an event loop that applies `fns` to the items of a BoundedBlockingQueue with up to
+    `concurrency` items in flight, for I/O-bound stages where one thread per call does not scale.
+    Every fn may be a plain function or a coroutine function.
+
+    Items are taken without blocking while the queue has any; only when it is empty does the loop wait for it
+    in a helper thread, alongside the calls in flight. Results are written to the destination from the loop,
+    so a full downstream queue pauses the whole stage. Stops once the queue is closed and drained.
+
+    Failed items follow the same retry and dead-letter rules as in Consumer; a retry takes one of the
+    `concurrency` slots once its backoff is over, and retries still waiting are finished before the thread ends.
+    If the loop itself fails, e.g. the destination raises, the error is kept in `error` and the queue is closed,
+    so the stages before it stop instead of blocking on a queue nobody empties any more.
+    """
+
+    def __init__(self, queue: BoundedBlockingQueue[Any], destination: Union[List[Any], Sink], fns: Sequence[Callable[[Any], Any]],
+                 concurrency: int, observer: Optional[EventHook] = None, name: str = "AsyncStageThread",
+                 retry: Optional[RetryPolicy] = None, dead_letter: Optional[Union[List[Any], Sink]] = None) -> None:
+        super().__init__(name=name)
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self._queue = queue
+        self._destination = destination
+        self._fns = tuple(fns)
+        self._concurrency = concurrency
+        self._observer = observer
+        self._failures = FailureHandler(NO_RETRY if retry is None else retry, dead_letter, observer)
+        self.error: Optional[BaseException] = None
+
+    def stats(self) -> ProcessingStats:
+        """
+        Outcome counters of this stage's calls.
+        """
+        return self._failures.stats()
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except QueueClosedError:
+            pass # the next stage's queue was closed
+        except Exception as error:
+            self.error = error
+            self._queue.close()
+
+    async def _serve(self) -> None:
+        in_flight: Dict["asyncio.Future[Any]", Tuple[Any, int]] = {} # call -> (item, attempts before this one)
+        fetch: Optional["asyncio.Future[List[Any]]"] = None # a blocking get_many in a helper thread, at most one
+        reserved = 0 # slots promised to the items the fetch will return
+        closed = False
+        failures = self._failures
+
+        while not closed or in_flight or failures.pending:
+            free = self._concurrency - len(in_flight) - reserved
+            # retries whose backoff is over go first
+            if free and failures.pending:
+                for item, attempts in failures.due(free):
+                    self._start(in_flight, item, attempts)
+                free = self._concurrency - len(in_flight) - reserved
+            if not closed and free and fetch is None:
+                try:
+                    items = self._take(free)
+                except QueueClosedError:
+                    closed = True
+                    continue
+                if items:
+                    for item in items:
+                        self._start(in_flight, item, 0)
+                    continue
+                fetch = asyncio.ensure_future(asyncio.to_thread(self._queue.get_many, free))
+                reserved = free
+
+            waiting = set(in_flight) | ({fetch} if fetch is not None else set())
+            if not waiting:
+                # closed and drained, only retries in their backoff are left
+                await asyncio.sleep(failures.wait_time() or 0.0)
+                continue
+            # with a slot to spare, wake up when the next retry is due
+            timeout = failures.wait_time() if len(in_flight) + reserved < self._concurrency else None
+            done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if fetch is not None and fetch in done:
+                done.discard(fetch)
+                try:
+                    for item in fetch.result():
+                        self._start(in_flight, item, 0)
+                except QueueClosedError:
+                    closed = True
+                fetch = None
+                reserved = 0
+            for task in done:
+                item, attempts = in_flight.pop(task)
+                try:
+                    result = task.result()
+                except Exception as error:
+                    failures.failed(item, error, attempts + 1)
+                    continue
+                failures.succeeded += 1
+                self._deliver(result)
+
+    def _start(self, in_flight: Dict["asyncio.Future[Any]", Tuple[Any, int]], item: Any, attempts: int) -> None:
+        in_flight[asyncio.ensure_future(self._apply(item))] = (item, attempts)
+
+    def _take(self, max_items: int) -> List[Any]:
+        """
+        Take up to `max_items` items that are available right now.
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        items = []
+        missing = object()
+        while len(items) < max_items:
+            try:
+                item = self._queue.try_get(missing)
+            except QueueClosedError:
+                if items:
+                    break # handed out first, the next call sees the closed queue again
+                raise
+            if item is missing:
+                break
+            items.append(item)
+        return items
+
+    async def _apply(self, item: Any) -> Any:
+        for fn in self._fns:
+            item = fn(item)
+            if inspect.isawaitable(item):
+                item = await item
+        return item
+
+    def _deliver(self, result: Any) -> None:
+        if self._observer is not None:
+            self._observer(make_event(EventType.CONSUMED, result))
+        self._destination.append(result)
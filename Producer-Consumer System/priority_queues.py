@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple, TypeVar, Union
+
+from bounded_blocking_queue import BoundedBlockingQueue
+from events import EventHook
+from metrics import QueueMetrics
+
+T = TypeVar("T")
+
+
+class PriorityBlockingQueue(BoundedBlockingQueue[T]):
+    """
+    BoundedBlockingQueue that hands out the item with the lowest `key(item)` first instead of the oldest,
+    so urgent items overtake a bulk backlog. Items with equal keys keep FIFO order.
+
+    Backed by a binary heap: put and get are O(log n). The key defaults to the item itself;
+    for (priority, payload) tuples pass `key=lambda item: item[0]` so payloads are never compared.
+    """
+
+    def __init__(self, capacity: int, key: Optional[Callable[[T], Any]] = None, observer: Optional[EventHook] = None,
+                 metrics: Optional[QueueMetrics] = None) -> None:
+        super().__init__(capacity, observer, metrics)
+        self._key = key
+        self._heap: List[Tuple[Any, int, float, T]] = [] # (priority, insertion order, put time with metrics, item)
+        self._counter = itertools.count() # tie breaker, keeps equal keys in FIFO order
+
+    def _qsize(self) -> int:
+        return len(self._heap)
+
+    def _has_room(self, item: T) -> bool:
+        return len(self._heap) < self._capacity
+
+    def _push(self, item: T) -> None:
+        priority = item if self._key is None else self._key(item)
+        stamp = time.monotonic() if self._metrics is not None else 0.0
+        heapq.heappush(self._heap, (priority, next(self._counter), stamp, item))
+
+    def _push_many(self, batch: List[T], start: int) -> int:
+        chunk = batch[start:start + self._capacity - len(self._heap)]
+        for item in chunk:
+            self._push(item)
+        return len(chunk)
+
+    def _pop(self) -> T:
+        _, _, stamp, item = heapq.heappop(self._heap)
+        if self._metrics is not None:
+            self._metrics.record_latency(time.monotonic() - stamp)
+        return item
+
+    def _pop_many(self, count: int) -> List[T]:
+        return [self._pop() for _ in range(count)]
+
+
+class WeightedFairQueue(BoundedBlockingQueue[T]):
+    """
+    BoundedBlockingQueue split into lanes, so one kind of traffic can neither starve nor crowd out another.
+
+    `lane_of(item)` names the lane of every item. Each lane is FIFO with its own capacity (`lane_capacity`,
+    one number for all lanes or one per lane), so a full bulk lane blocks only bulk producers.
+    Consumers take from the non-empty lanes in proportion to their `weights`, using smooth weighted
+    round-robin: with weights {"urgent": 3, "bulk": 1} a backlogged queue hands out urgent, urgent, bulk, urgent, ...
+
+    Producers of each lane wait on their own condition, so freeing a slot only wakes a producer that can use it.
+
+    set_capacity (e.g. from autoscaler.Autoscaler) changes the total capacity and splits it over the lanes
+    in proportion to the lane capacities the queue was created with.
+    """
+
+    def __init__(self, weights: Dict[Hashable, int], lane_of: Callable[[T], Hashable],
+                 lane_capacity: Union[int, Dict[Hashable, int]], observer: Optional[EventHook] = None,
+                 metrics: Optional[QueueMetrics] = None) -> None:
+        if not weights:
+            raise ValueError("at least one lane is required")
+        if any(weight < 1 for weight in weights.values()):
+            raise ValueError("lane weights must be at least 1")
+        capacities = dict.fromkeys(weights, lane_capacity) if isinstance(lane_capacity, int) else dict(lane_capacity)
+        if set(capacities) != set(weights):
+            raise ValueError("lane_capacity must name exactly the lanes in weights")
+        if any(capacity < 1 for capacity in capacities.values()):
+            raise ValueError("lane capacities must be at least 1")
+
+        super().__init__(sum(capacities.values()), observer, metrics)
+        self._lane_of = lane_of
+        self._weights = dict(weights)
+        self._lane_capacity = capacities
+        self._lane_shares = dict(capacities) # proportions kept by set_capacity
+        self._lanes: Dict[Hashable, Deque[T]] = {lane: deque() for lane in weights}
+        self._lane_stamps: Dict[Hashable, Deque[float]] = {lane: deque() for lane in weights} # put times, only kept with metrics
+        self._credit: Dict[Hashable, int] = dict.fromkeys(weights, 0) # smooth weighted round-robin state
+        self._lane_not_full = {lane: threading.Condition(self._lock) for lane in weights} # producers of a lane wait here
+        self._size = 0
+
+    def set_capacity(self, capacity: int) -> None:
+        """
+        Change the total capacity while the queue is in use, split over the lanes in proportion to their
+        capacities at construction. Every lane keeps at least one slot, so with more lanes than `capacity`
+        the total ends up at the number of lanes. A lane shrunk below its size keeps its items; growing a lane
+        wakes its waiting producers.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        with self._lock:
+            capacities = self._split(capacity)
+            for lane, lane_capacity in capacities.items():
+                if lane_capacity > self._lane_capacity[lane]:
+                    self._lane_not_full[lane].notify_all()
+            self._lane_capacity = capacities
+            self._capacity = sum(capacities.values())
+
+    def lane_capacity(self, lane: Hashable) -> int:
+        """
+        Return the current capacity of one lane.
+        """
+        with self._lock:
+            return self._lane_capacity[lane]
+
+    def _split(self, capacity: int) -> Dict[Hashable, int]:
+        """
+        Lane capacities adding up to `capacity` (largest remainder method), at least one per lane.
+        """
+        total = sum(self._lane_shares.values())
+        exact = {lane: capacity * share / total for lane, share in self._lane_shares.items()}
+        capacities = {lane: max(1, int(value)) for lane, value in exact.items()}
+        remaining = capacity - sum(capacities.values())
+        for lane in sorted(exact, key=lambda lane: exact[lane] - int(exact[lane]), reverse=True)[:max(0, remaining)]:
+            capacities[lane] += 1
+        return capacities
+
+    def lane_size(self, lane: Hashable) -> int:
+        """
+        Return the current number of items in one lane.
+        """
+        with self._lock:
+            return len(self._lanes[lane])
+
+    def _lane(self, item: T) -> Hashable:
+        lane = self._lane_of(item)
+        if lane not in self._lanes:
+            raise ValueError(f"unknown lane {lane!r}")
+        return lane
+
+    def _qsize(self) -> int:
+        return self._size
+
+    def _has_room(self, item: T) -> bool:
+        lane = self._lane(item)
+        return len(self._lanes[lane]) < self._lane_capacity[lane]
+
+    def _push(self, item: T) -> None:
+        lane = self._lane(item)
+        self._lanes[lane].append(item)
+        if self._metrics is not None:
+            self._lane_stamps[lane].append(time.monotonic())
+        self._size += 1
+
+    def _push_many(self, batch: List[T], start: int) -> int:
+        added = 0
+        for item in batch[start:]:
+            if not self._has_room(item):
+                break
+            self._push(item)
+            added += 1
+        return added
+
+    def _pop(self) -> T:
+        # smooth weighted round-robin over the lanes that have items
+        active = [lane for lane, items in self._lanes.items() if items]
+        for lane in active:
+            self._credit[lane] += self._weights[lane]
+        chosen = max(active, key=self._credit.__getitem__)
+        self._credit[chosen] -= sum(self._weights[lane] for lane in active)
+
+        self._size -= 1
+        item = self._lanes[chosen].popleft()
+        if self._metrics is not None:
+            self._metrics.record_latency(time.monotonic() - self._lane_stamps[chosen].popleft())
+        if not self._lanes[chosen]:
+            # an idle lane does not bank credit for later
+            self._credit[chosen] = 0
+        return item
+
+    def _pop_many(self, count: int) -> List[T]:
+        return [self._pop() for _ in range(count)]
+
+    def _not_full_for(self, item: T) -> threading.Condition:
+        return self._lane_not_full[self._lane(item)]
+
+    def _notify_room(self, items: List[T]) -> None:
+        for item in items:
+            self._lane_not_full[self._lane_of(item)].notify()
+
+    def _notify_room_left(self, batch: List[T]) -> None:
+        # producers wait per lane, only those of the batch's lanes can have been passed over
+        for lane in {self._lane_of(item) for item in batch}:
+            if len(self._lanes[lane]) < self._lane_capacity[lane]:
+                self._lane_not_full[lane].notify()
+
+    def _notify_all_producers(self) -> None:
+        for condition in self._lane_not_full.values():
+            condition.notify_all()
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, List, NamedTuple, Optional, Tuple, Union
+
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from events import EventHook, EventType, make_event
+from ordering import ReorderBuffer
+from retry import NO_RETRY, FailureHandler, ProcessingStats, RetryPolicy
+from sinks import Sink
+
+
+class Failed(NamedTuple):
+    """
+    Stands in for the result of an item whose process_fn raised inside a worker process.
+    """
+
+    error: BaseException
+
+
+def apply_batch(process_fn: Callable[[Any], Any], batch: List[Any]) -> List[Any]:
+    """
+    Run the processing function over a batch inside a worker process.
+    Module level so it can be pickled for a process pool.
+    An item that raises becomes a Failed result, so one bad item does not fail the whole batch.
+    """
+    results = []
+    for item in batch:
+        try:
+            results.append(process_fn(item))
+        except Exception as error:
+            results.append(Failed(error))
+    return results
+
+
+class ProcessPoolConsumer(threading.Thread):
+    """
+    Consumer thread that hands the processing of items to an executor, usually a ProcessPoolExecutor,
+    so CPU-bound work is not capped at one core by the GIL.
+
+    The thread only dispatches: it takes batches from the queue, submits them to the executor and
+    writes the results to the destination in the order the items were taken from the queue.
+    At most `max_pending` batches are in flight, so a slow pool leaves items in the bounded queue
+    and producers are blocked just like with a slow thread consumer.
+
+    Failed items follow the same retry and dead-letter rules as in Consumer. A retried item is submitted
+    again in a batch of its own once its backoff is over, so its result lands after items taken later.
+    """
+
+    def __init__(self, queue: BoundedBlockingQueue[Any], destination: Union[List[Any], Sink], sentinel: Any, process_fn: Callable[[Any], Any],
+                 executor: Executor, batch_size: int = 1, max_pending: int = 2,
+                 observer: Optional[EventHook] = None, name: str = "ProcessPoolConsumerThread",
+                 retry: Optional[RetryPolicy] = None, dead_letter: Optional[Union[List[Any], Sink]] = None) -> None:
+        super().__init__(name=name)
+        # batches must hold at least one item, otherwise nothing is ever consumed
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        # at least one batch has to be in flight to make progress
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self._queue = queue
+        self._destination = destination
+        self._sentinel = sentinel
+        self._process_fn = process_fn
+        self._executor = executor
+        self._batch_size = batch_size
+        self._max_pending = max_pending
+        self._observer = observer
+        # in-flight batches with the attempts their items have had before this one
+        self._pending: Deque[Tuple["Future[List[Any]]", List[Any], int]] = deque()
+        self._failures = FailureHandler(NO_RETRY if retry is None else retry, dead_letter, observer)
+        # why the dispatcher stopped early, e.g. BrokenProcessPool once a worker process died; None while all is well
+        self.error: Optional[BaseException] = None
+
+    def stats(self) -> ProcessingStats:
+        """
+        Outcome counters of the process_fn calls made for this consumer.
+        """
+        return self._failures.stats()
+
+    # run the dispatcher thread
+    def run(self) -> None:
+        """
+        Dispatcher thread reads batches from the shared queue and submits them to the executor,
+        until it encounters the sentinel or the queue is closed and drained, which signals stop.
+        Outstanding batches and retries are drained before returning.
+
+        If dispatching fails, e.g. the executor raises BrokenProcessPool on submit, the error is kept in `error`
+        and the queue is closed, so producers stop instead of blocking on a queue nobody empties any more.
+        """
+        try:
+            self._dispatch()
+        except Exception as error:
+            self.error = error
+            self._queue.close()
+            # producers may also be waiting for the reorder window to move
+            if isinstance(self._destination, ReorderBuffer):
+                self._destination.close_window()
+
+    def _dispatch(self) -> None:
+        failures = self._failures
+        while True:
+            try:
+                if failures.pending:
+                    # submit the retries that are due, otherwise wait for new items only until the next one is due
+                    if self._submit_retries():
+                        continue
+                    batch = self._queue.get_many(self._batch_size, timeout=failures.wait_time(), stop=self._is_sentinel)
+                else:
+                    batch = self._queue.get_many(self._batch_size, stop=self._is_sentinel)
+            except QueueClosedError:
+                self._finish()
+                return
+
+            # Sentinel means no more real data; get_many stopped there, the items behind it are someone else's
+            if batch and batch[-1] == self._sentinel:
+                self._submit(batch[:-1])
+                self._finish()
+                if self._observer is not None:
+                    self._observer(make_event(EventType.SENTINEL_RECEIVED))
+                return
+
+            self._submit(batch)
+
+    def _is_sentinel(self, item: Any) -> bool:
+        return item == self._sentinel
+
+    def _submit(self, batch: List[Any], attempts: int = 0) -> None:
+        if not batch:
+            return
+        # wait for the oldest batches first, which keeps results in input order
+        self._drain(self._max_pending - 1)
+        self._pending.append((self._executor.submit(apply_batch, self._process_fn, batch), batch, attempts))
+
+    def _submit_retries(self) -> bool:
+        """
+        Submit the retries whose backoff is over, grouped by attempt count. Returns whether there were any.
+        """
+        retries = self._failures.due(self._batch_size)
+        for attempts in sorted({attempts for _, attempts in retries}):
+            self._submit([item for item, item_attempts in retries if item_attempts == attempts], attempts)
+        return bool(retries)
+
+    def _finish(self) -> None:
+        """
+        Collect every pending batch and process the remaining retries once they are due.
+        """
+        self._drain(0)
+        failures = self._failures
+        while failures.pending:
+            time.sleep(failures.wait_time() or 0.0)
+            self._submit_retries()
+            self._drain(0)
+
+    def _drain(self, keep: int) -> None:
+        """
+        Collect finished batches, oldest first, until at most `keep` are still pending.
+        """
+        failures = self._failures
+        while len(self._pending) > keep:
+            future, batch, attempts = self._pending.popleft()
+            try:
+                results = future.result()
+            except Exception as error:
+                # the batch never ran to completion, e.g. it could not be pickled or the worker died
+                results = [Failed(error)] * len(batch)
+
+            succeeded = []
+            for item, result in zip(batch, results):
+                if isinstance(result, Failed):
+                    failures.failed(item, result.error, attempts + 1)
+                else:
+                    succeeded.append(result)
+            failures.succeeded += len(succeeded)
+            if self._observer is not None:
+                for result in succeeded:
+                    self._observer(make_event(EventType.CONSUMED, result))
+            self._destination.extend(succeeded)
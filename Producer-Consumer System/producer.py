@@ -1,35 +1,129 @@
 import threading
 import time
-from typing import Any, Iterable
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional
 
-from bounded_blocking_queue import BoundedBlockingQueue
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from events import EventHook, EventType, make_event
+from ordering import ReorderBuffer
+from rate_limiter import RateLimiter
+
+
+class SharedIterator(Iterator[Any]):
+    """
+    Thread-safe wrapper around an iterable, so several producers can draw from one source.
+    Every item is handed out exactly once.
+    With numbered=True it hands out (seq, item) pairs, numbered in source order under the same lock,
+    for producers in ordered mode. next_batch takes a whole batch under one lock, so its numbers are consecutive.
+    """
+
+    def __init__(self, source: Iterable[Any], numbered: bool = False) -> None:
+        self._iterator = enumerate(source) if numbered else iter(source)
+        self.numbered = numbered
+        self._lock = threading.Lock()
+
+    def __next__(self) -> Any:
+        with self._lock:
+            return next(self._iterator)
+
+    def next_batch(self, max_items: int) -> List[Any]:
+        """
+        Up to `max_items` consecutive items, an empty list once the source is exhausted.
+        """
+        with self._lock:
+            return list(islice(self._iterator, max_items))
 
 
 class Producer(threading.Thread):
     """
     Producer thread class.
+
+    With a `reorder` buffer (ordered mode) every item is queued as a (seq, item) pair, numbered in source order,
+    and only once it fits into the buffer's max_skew window. A SharedIterator(numbered=True) source is already
+    numbered, so producers sharing it hand out one sequence.
+
+    A `rate_limiter` (see rate_limiter.py) paces the producer to a rate instead of the fixed delay_seconds sleep,
+    taking one permit per item and a whole batch's worth at once with batch_size > 1. Share one limiter between
+    producers to cap their combined rate.
     """
 
-    def __init__(self, source: Iterable[Any], queue: BoundedBlockingQueue[Any], sentinel: Any, delay_seconds: float = 0.0) -> None:
-        super().__init__(name="ProducerThread")
+    def __init__(self, source: Iterable[Any], queue: BoundedBlockingQueue[Any], sentinel: Any, delay_seconds: float = 0.0, batch_size: int = 1,
+                 observer: Optional[EventHook] = None, send_sentinel: bool = True, name: str = "ProducerThread",
+                 reorder: Optional[ReorderBuffer] = None, rate_limiter: Optional[RateLimiter] = None) -> None:
+        super().__init__(name=name)
+        # batches must hold at least one item, otherwise nothing is ever produced
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        # a whole batch has to fit into the window at once
+        if reorder is not None and batch_size > reorder.max_skew:
+            raise ValueError("batch_size must not exceed the max_skew of the reorder buffer")
+
+        if reorder is not None and not getattr(source, "numbered", False):
+            source = enumerate(source)
         self._source = source
+        self._reorder = reorder
+        self._rate_limiter = rate_limiter
         self._queue = queue
         self._sentinel = sentinel
         self._delay_seconds = delay_seconds
+        self._batch_size = batch_size
+        self._observer = observer
+        # with several producers the sentinel is sent once by whoever coordinates them
+        self._send_sentinel = send_sentinel
 
     #run the producer thread
     def run(self) -> None:
         """
         Producer thread reads items from the source iterable and places them into the shared queue,
-        until it encounters the sentinel, which signals stop.
+        then sends the sentinel, which signals stop.
+        With batch_size > 1, items are handed over to the queue in batches via put_many.
+        Stops early, without error, if the queue gets closed (shutdown).
         """
-        for item in self._source:
-            print(f"Producing item ---- {item}")
-            self._queue.put(item)
-            if self._delay_seconds > 0:
-                time.sleep(self._delay_seconds)
+        try:
+            self._produce()
+        except QueueClosedError:
+            pass
+
+    def _produce(self) -> None:
+        observer = self._observer
+        reorder = self._reorder
+        rate_limiter = self._rate_limiter
+        if self._batch_size == 1:
+            for item in self._source:
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
+                if reorder is not None:
+                    reorder.wait_for_window(item[0])
+                if observer is not None:
+                    observer(make_event(EventType.PRODUCED, item))
+                self._queue.put(item)
+                if self._delay_seconds > 0:
+                    time.sleep(self._delay_seconds)
+        else:
+            source_iter = iter(self._source)
+            shared = isinstance(self._source, SharedIterator)
+            while True:
+                # from a shared source the batch is taken in one go: with items of other producers in between,
+                # every producer could be waiting for the window on a batch that ends beyond it
+                batch = self._source.next_batch(self._batch_size) if shared else list(islice(source_iter, self._batch_size))
+                if not batch:
+                    break
+                if rate_limiter is not None:
+                    rate_limiter.acquire(len(batch))
+                if reorder is not None:
+                    # sequence numbers are consecutive within a batch, so the last one decides
+                    reorder.wait_for_window(batch[-1][0])
+                if observer is not None:
+                    for item in batch:
+                        observer(make_event(EventType.PRODUCED, item))
+                self._queue.put_many(batch)
+                # keep the per-item pacing of the single-item path
+                if self._delay_seconds > 0:
+                    time.sleep(self._delay_seconds * len(batch))
 
         # Indicate that production has finished
-        print("Producer finished, sending sentinel")
-        self._queue.put(self._sentinel)
+        if self._send_sentinel:
+            if observer is not None:
+                observer(make_event(EventType.SENTINEL_SENT))
+            self._queue.put(self._sentinel)
 
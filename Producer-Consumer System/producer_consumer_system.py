@@ -1,38 +1,269 @@
-from typing import Any, Iterable, List
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Union
 
+from autoscaler import AutoscalePolicy, Autoscaler
 from bounded_blocking_queue import BoundedBlockingQueue
 from consumer import Consumer
-from producer import Producer
+from events import EventHook
+from metrics import QueueMetrics
+from ordering import ReorderBuffer, Sequenced, SequencedDeadLetters
+from process_consumer import ProcessPoolConsumer
+from producer import Producer, SharedIterator
+from rate_limiter import RateLimiter
+from retry import ProcessingStats, RetryPolicy
+from sinks import Sink
+from spsc_queue import SPSCQueue
+
+CONSUMER_MODES = ("thread", "process")
 
 
 class ProducerConsumerSystem:
     """
-    System class that ties together the producer, consumer, and bounded blocking queue
+    System class that ties together the producers, consumers, and bounded blocking queue
+
+    consumer_mode selects how the consumer stage runs:
+    - "thread": num_consumers Consumer threads, each applying process_fn (if given) to its items
+    - "process": one dispatcher thread feeding a ProcessPoolExecutor of num_consumers worker processes,
+      for CPU-bound process_fn; results reach the destination in input order
+
+    With one producer and a single consumer thread (thread mode with num_consumers=1, or the process mode
+    dispatcher) the queue is an SPSCQueue ring buffer, otherwise a BoundedBlockingQueue.
+    Pass `queue` to use another ordering instead, e.g. a PriorityBlockingQueue or WeightedFairQueue
+    (see priority_queues.py); `capacity` is then ignored and the queue keeps its own observer and metrics.
+
+    Pass a metrics.QueueMetrics as `metrics` to record throughput, blocked time, queue occupancy and item
+    latency; read it with metrics.snapshot() or export it with metrics.write_prometheus / serve_prometheus.
+
+    Pass an autoscaler.AutoscalePolicy as `autoscale` to let an Autoscaler thread grow and shrink the queue
+    capacity and the number of consumer threads with the load while run() is in progress. `capacity` and
+    `num_consumers` are then the starting point, clamped into the policy bounds; the queue is always a
+    BoundedBlockingQueue, and metrics are recorded (into a new QueueMetrics when `metrics` is None)
+    because the autoscaler reads them. Autoscaling needs consumer_mode="thread" and no injected `queue`.
+
+    An item whose process_fn raises does not stop its consumer: it is retried under `retry` (a retry.RetryPolicy,
+    no retries by default) and written to `dead_letter` as a retry.DeadLetter once it is out of attempts or
+    rejected with retry.Reject. processing_stats() reports the successes, failures and error rate.
+
+    With several consumers the order of the results is nondeterministic. ordered=True restores input order:
+    producers tag every item with a sequence number and an ordering.ReorderBuffer in front of the destination
+    writes the results in sequence. Producers stay at most `max_skew` items ahead of the oldest unfinished item,
+    which bounds the buffer. Consumers, observers and an injected `queue` then see (seq, item) pairs.
+
+    Pass a rate_limiter.TokenBucket or LeakyBucket as `rate_limiter` to cap the combined rate of all producers.
+
+    The source is never materialized, so it may be a generator or an unbounded iterator.
+    Results go to a list by default; pass a `sink` (see sinks.py) to bound memory or write them out in batches.
     """
 
-    def __init__(self, source: Iterable[Any], capacity: int = 5, producer_delay: float = 0.0, consumer_delay: float = 0.0) -> None:
-        self._source_data: List[Any] = list(source) # source data
-        self._destination_data: List[Any] = [] # destination data
-        self._queue = BoundedBlockingQueue[Any](capacity=capacity) # bounded blocking queue (shared queue that consumer and producer use)
-        self._sentinel = object() # sentinel object which marks the end of input stream
+    def __init__(self, source: Iterable[Any], capacity: int = 5, producer_delay: float = 0.0, consumer_delay: float = 0.0, batch_size: int = 1,
+                 observer: Optional[EventHook] = None, num_producers: int = 1, num_consumers: int = 1,
+                 process_fn: Optional[Callable[[Any], Any]] = None, consumer_mode: str = "thread", max_pending: int = 2,
+                 sink: Optional[Sink] = None, queue: Optional[BoundedBlockingQueue[Any]] = None,
+                 metrics: Optional[QueueMetrics] = None, autoscale: Optional[AutoscalePolicy] = None,
+                 retry: Optional[RetryPolicy] = None, dead_letter: Optional[Union[List[Any], Sink]] = None,
+                 ordered: bool = False, max_skew: int = 1024, rate_limiter: Optional[RateLimiter] = None) -> None:
+        # every pool needs at least one worker, otherwise the system never finishes
+        if num_producers < 1:
+            raise ValueError("num_producers must be at least 1")
+        if num_consumers < 1:
+            raise ValueError("num_consumers must be at least 1")
+        if consumer_mode not in CONSUMER_MODES:
+            raise ValueError(f"consumer_mode must be one of {CONSUMER_MODES}")
+        # worker processes need a function to run on the items
+        if consumer_mode == "process" and process_fn is None:
+            raise ValueError("process mode requires a process_fn")
+        if retry is not None:
+            retry.validate()
+        # producers hand over whole batches, which have to fit into the reorder window
+        if ordered and batch_size > max_skew:
+            raise ValueError("batch_size must not exceed max_skew")
+        if autoscale is not None:
+            if consumer_mode != "thread" or queue is not None:
+                raise ValueError("autoscale needs consumer_mode='thread' and a queue created by the system")
+            autoscale.validate()
+            capacity = min(max(capacity, autoscale.min_capacity), autoscale.max_capacity)
+            num_consumers = min(max(num_consumers, autoscale.min_consumers), autoscale.max_consumers)
+            if metrics is None:
+                metrics = QueueMetrics()
+
+        # source data, consumed lazily by the producers: generators and unbounded iterators work,
+        # and memory stays bounded by the queue capacity instead of the input size
+        self._source_data: Iterable[Any] = source
+        self._destination_data: Union[List[Any], Sink] = [] if sink is None else sink # destination data or sink
+        # bounded blocking queue (shared queue that consumers and producers use);
+        # with a single thread on each side the lock-free ring buffer fast path is enough
+        single_consumer_thread = consumer_mode == "process" or num_consumers == 1
+        self._queue: Union[BoundedBlockingQueue[Any], SPSCQueue[Any]]
+        if queue is not None:
+            self._queue = queue
+        elif num_producers == 1 and single_consumer_thread and autoscale is None:
+            self._queue = SPSCQueue[Any](capacity=capacity, observer=observer, metrics=metrics)
+        else:
+            self._queue = BoundedBlockingQueue[Any](capacity=capacity, observer=observer, metrics=metrics)
+        # sentinel object for the workers' end-of-stream protocol; the system itself ends the stream by closing the queue
+        self._sentinel = object()
+        # observer receives blocked/produced/consumed/closed events, nothing is reported when it is None
+        self._observer = observer
+        # ordered mode: consumers work on (seq, item) pairs and write them to the reorder buffer,
+        # which passes the results on to the destination in input order
+        self._reorder: Optional[ReorderBuffer] = None
+        self._consumer_destination = self._destination_data
+        if ordered:
+            self._reorder = ReorderBuffer(self._destination_data, max_skew)
+            self._consumer_destination = self._reorder
+            # a dead-lettered item must not hold back the items after it
+            dead_letter = SequencedDeadLetters(self._reorder, dead_letter)
+            if process_fn is not None:
+                process_fn = Sequenced(process_fn)
+        # failed items are retried by the consumer that took them, then dead-lettered
+        self._retry = retry
+        self._dead_letter = dead_letter
+
+        # producers draw from one shared iterator, so each source item is produced exactly once
+        producer_source: Iterable[Any] = self._source_data if num_producers == 1 else SharedIterator(self._source_data, numbered=ordered)
 
         # producer and consumer threads creation
-        self._producer = Producer(source=self._source_data, queue=self._queue, sentinel=self._sentinel, delay_seconds=producer_delay)
-        self._consumer = Consumer(queue=self._queue, destination=self._destination_data, sentinel=self._sentinel, delay_seconds=consumer_delay)
+        # batch_size > 1 moves items through the queue in batches (one lock round-trip per batch)
+        # producers do not send sentinels themselves: run() closes the queue once all producers are done
+        self._producers = [
+            Producer(source=producer_source, queue=self._queue, sentinel=self._sentinel, delay_seconds=producer_delay, batch_size=batch_size,
+                     observer=observer, send_sentinel=False, name=self._thread_name("ProducerThread", i, num_producers),
+                     reorder=self._reorder, rate_limiter=rate_limiter)
+            for i in range(num_producers)
+        ]
+        self._batch_size = batch_size
+        self._process_fn = process_fn
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._num_workers: Optional[int] = None # worker processes in process mode
+        if consumer_mode == "process":
+            # the pool and its dispatcher are created by run(), which also shuts the pool down
+            self._num_workers = num_consumers
+            self._max_pending = max_pending
+            self._consumers: List[Union[Consumer, ProcessPoolConsumer]] = []
+        else:
+            self._consumer_delay = consumer_delay
+            # an autoscaled pool may grow, so its threads are always numbered
+            numbered = num_consumers if autoscale is None else autoscale.max_consumers
+            self._consumers = [self._make_consumer(self._thread_name("ConsumerThread", i, numbered)) for i in range(num_consumers)]
+
+        # the autoscaler only starts and retires Consumer threads, so it is created for thread mode only
+        self._autoscaler: Optional[Autoscaler] = None
+        if autoscale is not None:
+            self._autoscaler = Autoscaler(queue=self._queue, metrics=metrics, policy=autoscale, consumers=num_consumers,
+                                          start_consumer=self._start_consumer, retire_consumer=self._retire_consumer, observer=observer)
+
+    def _make_consumer(self, name: str) -> Consumer:
+        return Consumer(queue=self._queue, destination=self._consumer_destination, sentinel=self._sentinel, delay_seconds=self._consumer_delay,
+                        batch_size=self._batch_size, observer=self._observer, name=name, process_fn=self._process_fn,
+                        retry=self._retry, dead_letter=self._dead_letter)
 
-    def run(self) -> None:
+    def _start_consumer(self) -> None:
+        """
+        Start one more consumer thread (called by the autoscaler).
+        """
+        consumer = self._make_consumer(f"ConsumerThread-{len(self._consumers)}")
+        consumer.start()
+        self._consumers.append(consumer)
+
+    def _retire_consumer(self) -> None:
+        """
+        Retire the most recently started consumer that is still working (called by the autoscaler).
+        """
+        for consumer in reversed(self._consumers):
+            if isinstance(consumer, Consumer) and not consumer.retired and consumer.is_alive():
+                consumer.retire()
+                return
+
+    @staticmethod
+    def _thread_name(prefix: str, index: int, count: int) -> str:
+        return prefix if count == 1 else f"{prefix}-{index}"
+
+    def run(self, timeout: Optional[float] = None) -> None:
         """
         Start producer and consumer threads and wait for them to finish.
+        Once every producer is done the queue is closed: each consumer drains the remaining items
+        and stops exactly once, after all items have been taken.
+
+        With a timeout (seconds for the whole run), the queue is closed when the deadline passes,
+        which wakes every blocked producer and consumer, and TimeoutError is raised if any worker
+        has not finished by then (e.g. stuck inside process_fn). Consumers keep draining what was
+        already queued in the background.
+
+        In process mode the worker pool lives for the duration of run() and is shut down however run() ends.
+        If the dispatcher fails (e.g. BrokenProcessPool after a worker process died), the queue is closed
+        and its error is raised here once the producers have stopped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        finished = False
+
+        try:
+            if self._num_workers is not None:
+                # worker processes are only started on the first submitted batch
+                self._executor = ProcessPoolExecutor(max_workers=self._num_workers)
+                # up to max_pending batches per worker in flight keeps every process busy while results are collected
+                self._consumers.append(
+                    ProcessPoolConsumer(queue=self._queue, destination=self._consumer_destination, sentinel=self._sentinel,
+                                        process_fn=self._process_fn, executor=self._executor, batch_size=self._batch_size,
+                                        max_pending=self._max_pending * self._num_workers, observer=self._observer,
+                                        retry=self._retry, dead_letter=self._dead_letter))
+
+            for producer in self._producers:
+                producer.start()
+            for consumer in self._consumers:
+                consumer.start()
+            if self._autoscaler is not None:
+                self._autoscaler.start()
+
+            try:
+                producers_done = self._join(self._producers, deadline)
+            finally:
+                # the consumer pool stops changing before it is joined
+                if self._autoscaler is not None:
+                    self._autoscaler.stop()
+                    self._autoscaler.join()
+                # Indicate that production has finished (or that the deadline passed)
+                self._queue.close()
+                if self._reorder is not None:
+                    self._reorder.close_window()
+
+            if not producers_done:
+                raise TimeoutError("producers did not finish before the deadline, queue closed")
+            if not self._join(self._consumers, deadline):
+                raise TimeoutError("consumers did not finish before the deadline, queue closed")
+            for consumer in self._consumers:
+                if isinstance(consumer, ProcessPoolConsumer) and consumer.error is not None:
+                    raise consumer.error
+
+            # buffered sinks may still hold the last partial batch
+            if isinstance(self._destination_data, Sink):
+                self._destination_data.flush()
+            if isinstance(self._dead_letter, Sink):
+                self._dead_letter.flush()
+            finished = True
+        finally:
+            if self._executor is not None:
+                # after a missed deadline or an error, pending batches are cancelled instead of waited for
+                self._executor.shutdown(wait=finished, cancel_futures=not finished)
+
+    @staticmethod
+    def _join(threads: List[threading.Thread], deadline: Optional[float]) -> bool:
         """
-        self._producer.start()
-        self._consumer.start()
+        Join every thread, giving up at the deadline. Returns whether all of them finished.
+        """
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in threads)
 
-        self._producer.join()
-        self._consumer.join()
+    def processing_stats(self) -> ProcessingStats:
+        """
+        Outcome counters of process_fn over all consumers, including retired ones.
+        """
+        return ProcessingStats.combine(consumer.stats() for consumer in self._consumers)
 
     def queue_size(self) -> int:
         """
         Convenience method for current queue size (mostly for debugging).
         """
         return self._queue.size()
-
@@ -0,0 +1,113 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+
+class RateLimiter(ABC):
+    """
+    Paces callers to a rate in items per second. Thread-safe, so one limiter can be shared by several
+    producers to cap their combined rate.
+
+    Limiters reserve against the clock instead of sleeping a fixed delay per item: a caller that slept too long
+    (timer resolution, scheduling) is not slowed down any further, so the rate does not drift under load.
+    Waits shorter than `granularity` seconds are not slept right away but added up and slept off together,
+    which keeps the number of sleep calls low at high rates; the price is a lead of up to `granularity`.
+
+    `clock` and `sleep` default to time.monotonic and time.sleep; tests pass a fake clock to check rates exactly.
+    """
+
+    def __init__(self, rate: float, granularity: float = 0.0005, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if granularity < 0:
+            raise ValueError("granularity must not be negative")
+        self._rate = rate
+        self._granularity = granularity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self, count: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until `count` items may go, e.g. a whole batch at once.
+        With a timeout, returns False right away, without reserving anything, if that would take longer.
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with self._lock:
+            wait = self._reserve(count, self._clock(), timeout)
+        if wait is None:
+            return False
+        if wait >= self._granularity:
+            self._sleep(wait)
+        return True
+
+    def try_acquire(self, count: int = 1) -> bool:
+        """
+        Take `count` items' worth of the rate if that needs no waiting.
+        """
+        return self.acquire(count, timeout=0.0)
+
+    @abstractmethod
+    def _reserve(self, count: int, now: float, timeout: Optional[float]) -> Optional[float]:
+        """
+        Reserve `count` items and return the seconds to wait before they may go,
+        or None (reserving nothing) if that is longer than `timeout`. Called with the lock held.
+        """
+
+
+class TokenBucket(RateLimiter):
+    """
+    Token bucket: refills at `rate` tokens per second up to `burst` tokens, every item takes one.
+    After a quiet period up to `burst` items go at once; the long-run rate is `rate`.
+    A request for more tokens than are left runs the bucket into debt, so batches larger than `burst` still work.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, granularity: float = 0.0005,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        super().__init__(rate, granularity, clock, sleep)
+        # by default a tenth of a second's worth of items may go at once
+        self._burst = rate / 10 if burst is None else burst
+        if self._burst < 0:
+            raise ValueError("burst must not be negative")
+        self._tokens = self._burst # the bucket starts full
+        self._updated = clock()
+
+    def _reserve(self, count: int, now: float, timeout: Optional[float]) -> Optional[float]:
+        tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        wait = max(0.0, (count - tokens) / self._rate)
+        if timeout is not None and wait > timeout:
+            return None
+        self._tokens = tokens - count # negative while callers wait for their tokens
+        self._updated = now
+        return wait
+
+
+class LeakyBucket(RateLimiter):
+    """
+    Leaky bucket (as a meter): items leave at an even spacing of 1 / `rate` seconds, with no bursts.
+    A caller that falls behind the schedule by up to `tolerance` seconds, e.g. after oversleeping,
+    may catch up; anything later than that is not made up.
+    """
+
+    def __init__(self, rate: float, tolerance: float = 0.002, granularity: float = 0.0005,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        super().__init__(rate, granularity, clock, sleep)
+        if tolerance < 0:
+            raise ValueError("tolerance must not be negative")
+        self._tolerance = tolerance
+        self._next = clock() # when the next item is scheduled to leave
+
+    def _reserve(self, count: int, now: float, timeout: Optional[float]) -> Optional[float]:
+        start = max(self._next, now - self._tolerance)
+        wait = max(0.0, start - now)
+        if timeout is not None and wait > timeout:
+            return None
+        self._next = start + count / self._rate
+        return wait
@@ -0,0 +1,156 @@
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from events import EventHook, EventType, make_event
+from sinks import Sink
+
+
+class Reject(Exception):
+    """
+    Raise from a process_fn to reject an item for good: it goes to the dead-letter destination without retries.
+    Any other exception is a failed attempt that is retried under the RetryPolicy.
+    """
+
+
+class RetryPolicy(NamedTuple):
+    """
+    How often and when failed items are processed again. Attempt n (n >= 1 failures so far) waits
+    initial_backoff * multiplier ** (n - 1), capped at max_backoff, then randomly stretched or shrunk
+    by up to `jitter` of that so items that failed together do not all come back at the same moment.
+    """
+
+    max_attempts: int = 3 # attempts in total, including the first
+    initial_backoff: float = 0.01
+    multiplier: float = 2.0
+    max_backoff: float = 1.0
+    jitter: float = 0.1
+
+    def validate(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if self.initial_backoff < 0 or self.max_backoff < 0:
+            raise ValueError("backoff must not be negative")
+        if self.multiplier < 1:
+            raise ValueError("multiplier must be at least 1")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+    def backoff(self, failures: int) -> float:
+        """
+        Seconds to wait before the next attempt after `failures` failed ones.
+        """
+        delay = min(self.max_backoff, self.initial_backoff * self.multiplier ** (failures - 1))
+        return delay * (1 + self.jitter * (2 * random.random() - 1))
+
+
+# no retries: a failed item is dead-lettered after its first attempt
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class DeadLetter(NamedTuple):
+    """
+    An item that could not be processed, written to the dead-letter destination.
+    """
+
+    item: Any
+    error: BaseException # the exception of the last attempt
+    attempts: int
+
+
+class ProcessingStats(NamedTuple):
+    """
+    Outcome counters of the consumers' process_fn calls.
+    """
+
+    succeeded: int # items processed successfully
+    failed_attempts: int # calls that raised, retried or not
+    retried: int # attempts scheduled again after a failure
+    dead_lettered: int # items given up on
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Share of process_fn calls that raised.
+        """
+        calls = self.succeeded + self.failed_attempts
+        return self.failed_attempts / calls if calls else 0.0
+
+    @staticmethod
+    def combine(stats: Iterable["ProcessingStats"]) -> "ProcessingStats":
+        return ProcessingStats(*(sum(values) for values in zip(ProcessingStats(0, 0, 0, 0), *stats)))
+
+
+class FailureHandler:
+    """
+    Failure bookkeeping of one consumer: failed items wait in a heap ordered by when they are due again,
+    so the consumer keeps taking new items during the backoff instead of sleeping on the failed one.
+    Items out of attempts (or rejected) go to `dead_letter` as DeadLetter records, or are dropped when it is None;
+    either way they are counted and reported to the observer.
+
+    Owned by a single consumer thread, so it takes no lock and the counters have one writer.
+    """
+
+    def __init__(self, policy: RetryPolicy = NO_RETRY, dead_letter: Optional[Union[List[Any], Sink]] = None,
+                 observer: Optional[EventHook] = None) -> None:
+        policy.validate()
+        self._policy = policy
+        self._dead_letter = dead_letter
+        self._observer = observer
+        self._waiting: List[Tuple[float, int, Any, int]] = [] # (due time, tie breaker, item, attempts so far)
+        self._counter = itertools.count()
+        self.succeeded = 0
+        self._failed_attempts = 0
+        self._retried = 0
+        self._dead_lettered = 0
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of items waiting for a retry.
+        """
+        return len(self._waiting)
+
+    def failed(self, item: Any, error: BaseException, attempts: int) -> None:
+        """
+        `item` raised `error` on its `attempts`-th attempt: schedule it again or give up on it.
+        """
+        self._failed_attempts += 1
+        if self._observer is not None:
+            self._observer(make_event(EventType.ITEM_FAILED, item))
+
+        if isinstance(error, Reject) or attempts >= self._policy.max_attempts:
+            self._dead_lettered += 1
+            if self._observer is not None:
+                self._observer(make_event(EventType.DEAD_LETTERED, item))
+            if self._dead_letter is not None:
+                self._dead_letter.append(DeadLetter(item, error, attempts))
+            return
+
+        self._retried += 1
+        due = time.monotonic() + self._policy.backoff(attempts)
+        heapq.heappush(self._waiting, (due, next(self._counter), item, attempts))
+
+    def due(self, max_items: int) -> List[Tuple[Any, int]]:
+        """
+        Remove and return up to `max_items` (item, attempts so far) pairs whose backoff is over.
+        """
+        now = time.monotonic()
+        ready = []
+        while self._waiting and self._waiting[0][0] <= now and len(ready) < max_items:
+            _, _, item, attempts = heapq.heappop(self._waiting)
+            ready.append((item, attempts))
+        return ready
+
+    def wait_time(self) -> Optional[float]:
+        """
+        Seconds until the next retry is due (0 if one is due now), None if nothing is waiting.
+        """
+        if not self._waiting:
+            return None
+        return max(0.0, self._waiting[0][0] - time.monotonic())
+
+    def stats(self) -> ProcessingStats:
+        return ProcessingStats(self.succeeded, self._failed_attempts, self._retried, self._dead_lettered)
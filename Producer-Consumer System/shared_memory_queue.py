@@ -0,0 +1,382 @@
+import multiprocessing
+import os
+import pickle
+import struct
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from bounded_blocking_queue import QueueClosedError
+from events import EventHook, EventType, make_event
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, without it arrays are simply pickled like any other object
+    np = None
+
+# queue header: head (items taken), tail (items put), reclaim (slots given back to producers), closed flag
+_HEADER = struct.Struct("<qqqq")
+# slot header: payload kind, ndim, dtype string, payload size in bytes, shape (up to 8 dimensions)
+_SLOT_HEADER = struct.Struct("<BB16sq8q")
+_MAX_NDIM = 8
+_ALIGNMENT = 64
+
+# payload kinds
+_BYTES = 0
+_NDARRAY = 1
+_PICKLED = 2
+
+# slot states, kept in one byte per slot after the queue header
+_EMPTY = 0
+_FILLED = 1
+_READING = 2
+_RELEASED = 3
+
+# how often blocked calls wake up to notice close()
+_POLL_INTERVAL = 0.05
+
+
+class SharedMemoryQueue:
+    """
+    Bounded blocking queue between processes, backed by one multiprocessing.shared_memory block
+    split into `capacity` fixed-size slots of `slot_size` payload bytes. Same API as BoundedBlockingQueue.
+
+    Bytes-like objects and NumPy arrays are copied straight into a slot and never pickled:
+    - get() returns a private copy and frees the slot at once
+    - get_view() is a context manager that yields a memoryview / ndarray over the slot itself (zero-copy);
+      the slot is given back to producers when the block exits, and the view must not be used after that
+    Any other object is pickled into its slot. A payload larger than `slot_size` raises ValueError.
+
+    Slots are reused in ring order, so a slot whose view is released early only becomes free once every
+    older slot has been released as well.
+
+    The queue object is passed to child processes like a multiprocessing.Queue (as a Process/pool argument);
+    every process attaches to the same block. The creating process calls unlink() when all are done.
+    The observer is not sent along, events are only reported in the process that set it.
+    Blocked calls poll for close() every 50 ms.
+    """
+
+    def __init__(self, capacity: int, slot_size: int, observer: Optional[EventHook] = None) -> None:
+        # we want to ensure that the holding capacity of queue is positive to run any operation on it
+        if capacity < 0:
+            raise ValueError("capacity must be positive to operate on queue, exiting...")
+        # forbid deadlocks
+        if capacity == 0:
+            raise ValueError("Capacity is 0, queue will be stuck in a deadlock, exiting...")
+        if slot_size < 1:
+            raise ValueError("slot_size must be at least 1")
+
+        self._capacity = capacity
+        self._slot_size = slot_size
+        self._slot_stride = _align(_SLOT_HEADER.size + slot_size)
+        self._slots_offset = _align(_HEADER.size + capacity)
+        self._shm = shared_memory.SharedMemory(create=True, size=self._slots_offset + capacity * self._slot_stride)
+        self._shm.buf[:self._slots_offset] = bytes(self._slots_offset)
+        self._owner_pid = os.getpid() # only the creating process destroys the block, forked children inherit this object
+
+        self._free = multiprocessing.Semaphore(capacity) # free slots, producers wait here
+        self._filled = multiprocessing.Semaphore(0) # filled slots, consumers wait here
+        self._put_lock = multiprocessing.Lock() # held while a slot is written, so slots fill in ring order
+        self._get_lock = multiprocessing.Lock() # guards head, reclaim and the slot states
+        self._observer = observer
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_shm"] = self._shm.name
+        state["_observer"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=state["_shm"])
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> None:
+        """
+        Copy an item into the next free slot.
+        Blocked as long as every slot is taken, for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError if the queue is or gets closed.
+        """
+        header, payload = self._encode(item)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self._free.acquire(block=False):
+            if self._observer is not None:
+                self._observer(make_event(EventType.PRODUCER_BLOCKED, size=self.size()))
+            if not self._acquire_free(deadline):
+                raise TimeoutError("timed out waiting for space in the queue")
+        self._write(header, payload)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Remove and return a copy of the oldest item, freeing its slot.
+        Blocked as long as the queue is empty, for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        index = self._take(timeout)
+        try:
+            return self._decode(index, copy=True)
+        finally:
+            self._release(index)
+
+    @contextmanager
+    def get_view(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Remove the oldest item and yield it without copying: a memoryview for bytes-like items,
+        an ndarray over the slot for NumPy arrays (unpickled objects are copies either way).
+        The slot is given back when the block exits; do not keep the view past that point
+        (a memoryview is released, an ndarray has to be dropped before unlink()).
+        """
+        index = self._take(timeout)
+        value = self._decode(index, copy=False)
+        try:
+            yield value
+        finally:
+            # a released memoryview raises on use instead of showing the next item written to the slot
+            if isinstance(value, memoryview):
+                value.release()
+            del value
+            self._release(index)
+
+    def try_put(self, item: Any) -> bool:
+        """
+        Put an item only if a slot is free right now.
+        Returns False instead of blocking when the queue is full; raises QueueClosedError if it is closed.
+        """
+        header, payload = self._encode(item)
+        if self.closed:
+            raise QueueClosedError("put on a closed queue")
+        if not self._free.acquire(block=False):
+            return False
+        self._write(header, payload)
+        return True
+
+    def try_get(self, default: Any = None) -> Any:
+        """
+        Remove and return a copy of the oldest item only if one is available right now, otherwise return `default`.
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if not self._filled.acquire(block=False):
+            if self.closed:
+                raise QueueClosedError("get on a closed and drained queue")
+            return default
+        index = self._claim()
+        try:
+            return self._decode(index, copy=True)
+        finally:
+            self._release(index)
+
+    def put_many(self, items: Iterable[Any], timeout: Optional[float] = None) -> int:
+        """
+        Put a batch of items, one slot each, blocking while the queue is full for at most `timeout` seconds in total.
+        Returns the number of items put, which is less than len(items) only if the timeout expired.
+        Raises QueueClosedError if the queue is or gets closed before the whole batch is in.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+        for item in items:
+            try:
+                self.put(item, None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                break
+            put_count += 1
+        return put_count
+
+    def get_many(self, max_items: int, timeout: Optional[float] = None, stop: Optional[Callable[[Any], bool]] = None) -> List[Any]:
+        """
+        Remove and return copies of up to `max_items` items.
+        Blocked as long as the queue is empty, for at most `timeout` seconds if given.
+        Returns whatever is available once at least one item is in the queue, or an empty list on timeout.
+        With `stop`, the batch ends after the first item for which stop(item) is true and the items behind it
+        stay queued (e.g. a consumer stopping at its sentinel).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+
+        try:
+            items = [self.get(timeout)]
+        except TimeoutError:
+            return []
+
+        missing = object()
+        while len(items) < max_items and (stop is None or not stop(items[-1])):
+            try:
+                item = self.try_get(missing)
+            except QueueClosedError:
+                break
+            if item is missing:
+                break
+            items.append(item)
+        return items
+
+    def close(self) -> None:
+        """
+        Close the queue in every attached process. Further puts raise QueueClosedError;
+        gets still return the remaining items and raise QueueClosedError once the queue is drained.
+        Blocked calls notice within the poll interval. Closing twice is a no-op.
+        """
+        with self._get_lock:
+            head, tail, reclaim, closed = _HEADER.unpack_from(self._shm.buf, 0)
+            if closed:
+                return
+            _HEADER.pack_into(self._shm.buf, 0, head, tail, reclaim, 1)
+        if self._observer is not None:
+            self._observer(make_event(EventType.QUEUE_CLOSED, size=tail - head))
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether close() has been called in any attached process.
+        """
+        return bool(_HEADER.unpack_from(self._shm.buf, 0)[3])
+
+    def size(self) -> int:
+        """
+        Return the current number of items in the queue.
+        """
+        head, tail, _, _ = _HEADER.unpack_from(self._shm.buf, 0)
+        return tail - head
+
+    def unlink(self) -> None:
+        """
+        Detach from the shared memory block; the creating process also destroys it.
+        Every view from get_view must have been dropped before.
+        """
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedMemoryQueue":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.unlink()
+
+    def _encode(self, item: Any) -> tuple:
+        """
+        Return the slot header fields and a byte view of the payload.
+        """
+        if np is not None and isinstance(item, np.ndarray) and not item.dtype.hasobject \
+                and item.ndim <= _MAX_NDIM and len(item.dtype.str) <= 16:
+            array = np.ascontiguousarray(item)
+            payload = memoryview(array.reshape(-1).view(np.uint8))
+            shape = list(array.shape) + [0] * (_MAX_NDIM - array.ndim)
+            header = (_NDARRAY, array.ndim, array.dtype.str.encode("ascii"), array.nbytes, *shape)
+        elif isinstance(item, (bytes, bytearray, memoryview)):
+            payload = memoryview(item)
+            payload = payload.cast("B") if payload.c_contiguous else memoryview(payload.tobytes())
+            header = (_BYTES, 0, b"", payload.nbytes) + (0,) * _MAX_NDIM
+        else:
+            payload = memoryview(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL))
+            header = (_PICKLED, 0, b"", payload.nbytes) + (0,) * _MAX_NDIM
+
+        if payload.nbytes > self._slot_size:
+            raise ValueError(f"item of {payload.nbytes} bytes does not fit into a slot of {self._slot_size} bytes")
+        return header, payload
+
+    def _write(self, header: tuple, payload: memoryview) -> None:
+        """
+        Copy the payload into the slot at the tail and publish it; a free slot has been acquired already.
+        """
+        with self._put_lock:
+            head, tail, reclaim, closed = _HEADER.unpack_from(self._shm.buf, 0)
+            if closed:
+                self._free.release()
+                raise QueueClosedError("put on a closed queue")
+
+            index = tail % self._capacity
+            offset = self._slots_offset + index * self._slot_stride
+            _SLOT_HEADER.pack_into(self._shm.buf, offset, *header)
+            start = offset + _SLOT_HEADER.size
+            self._shm.buf[start:start + payload.nbytes] = payload
+            self._shm.buf[_HEADER.size + index] = _FILLED
+
+            with self._get_lock:
+                head, _, reclaim, closed = _HEADER.unpack_from(self._shm.buf, 0)
+                _HEADER.pack_into(self._shm.buf, 0, head, tail + 1, reclaim, closed)
+        self._filled.release()
+
+    def _take(self, timeout: Optional[float]) -> int:
+        """
+        Wait for a filled slot and claim the oldest one; returns its index.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self._filled.acquire(block=False):
+            if self._observer is not None:
+                self._observer(make_event(EventType.CONSUMER_BLOCKED, size=self.size()))
+            while not self._filled.acquire(timeout=_slice(deadline)):
+                if self.closed:
+                    # a put may have completed right before closing
+                    if self._filled.acquire(block=False):
+                        break
+                    raise QueueClosedError("get on a closed and drained queue")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError("timed out waiting for an item in the queue")
+        return self._claim()
+
+    def _claim(self) -> int:
+        with self._get_lock:
+            head, tail, reclaim, closed = _HEADER.unpack_from(self._shm.buf, 0)
+            _HEADER.pack_into(self._shm.buf, 0, head + 1, tail, reclaim, closed)
+            index = head % self._capacity
+            self._shm.buf[_HEADER.size + index] = _READING
+        return index
+
+    def _release(self, index: int) -> None:
+        """
+        Mark a read slot as released and give every released slot at the front of the ring back to producers.
+        """
+        with self._get_lock:
+            self._shm.buf[_HEADER.size + index] = _RELEASED
+            head, tail, reclaim, closed = _HEADER.unpack_from(self._shm.buf, 0)
+            freed = 0
+            while reclaim < head and self._shm.buf[_HEADER.size + reclaim % self._capacity] == _RELEASED:
+                self._shm.buf[_HEADER.size + reclaim % self._capacity] = _EMPTY
+                reclaim += 1
+                freed += 1
+            _HEADER.pack_into(self._shm.buf, 0, head, tail, reclaim, closed)
+        for _ in range(freed):
+            self._free.release()
+
+    def _decode(self, index: int, copy: bool) -> Any:
+        offset = self._slots_offset + index * self._slot_stride
+        kind, ndim, dtype, nbytes, *shape = _SLOT_HEADER.unpack_from(self._shm.buf, offset)
+        start = offset + _SLOT_HEADER.size
+        view = self._shm.buf[start:start + nbytes]
+
+        if kind == _PICKLED:
+            with view:
+                return pickle.loads(view)
+        if kind == _NDARRAY and np is not None:
+            array = np.frombuffer(view, dtype=np.dtype(dtype.rstrip(b"\0").decode("ascii"))).reshape(shape[:ndim])
+            return array.copy() if copy else array
+        if copy:
+            with view:
+                return bytes(view)
+        return view
+
+    def _acquire_free(self, deadline: Optional[float]) -> bool:
+        """
+        Wait for a free slot until `deadline`; returns False on timeout, raises QueueClosedError when closed.
+        """
+        while not self._free.acquire(timeout=_slice(deadline)):
+            if self.closed:
+                raise QueueClosedError("put on a closed queue")
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+
+def _align(size: int) -> int:
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _slice(deadline: Optional[float]) -> float:
+    """
+    Length of the next wait: one poll interval, or less if the deadline comes first.
+    """
+    if deadline is None:
+        return _POLL_INTERVAL
+    return max(0.0, min(_POLL_INTERVAL, deadline - time.monotonic()))
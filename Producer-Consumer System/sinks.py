@@ -0,0 +1,170 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, List, Optional
+
+from bounded_blocking_queue import BoundedBlockingQueue
+
+
+class Sink(ABC):
+    """
+    Write-only destination for consumed items.
+    Consumers only ever call `append` / `extend` on their destination, so a plain list and a Sink are interchangeable.
+    Sinks may be shared by several consumers and must be thread-safe.
+    Subclasses implement `extend`.
+    """
+
+    def append(self, item: Any) -> None:
+        self.extend((item,))
+
+    @abstractmethod
+    def extend(self, items: Iterable[Any]) -> None:
+        """
+        Take a batch of items.
+        """
+
+    def flush(self) -> None:
+        """
+        Write out anything buffered.
+        """
+
+    def close(self) -> None:
+        """
+        Flush and release resources; the sink must not be used afterwards.
+        """
+        self.flush()
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class BufferedSink(Sink):
+    """
+    Sink that collects items in a buffer and writes them out `flush_every` items at a time,
+    so the cost of the underlying write (I/O, callback, lock) is paid once per batch.
+    Subclasses implement `_write_batch`.
+    """
+
+    def __init__(self, flush_every: int = 100) -> None:
+        # a batch must hold at least one item, otherwise nothing is ever written
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1")
+        self._flush_every = flush_every
+        self._buffer: List[Any] = []
+        self._lock = threading.Lock()
+
+    def extend(self, items: Iterable[Any]) -> None:
+        with self._lock:
+            self._buffer.extend(items)
+            # write out every full batch, keep the remainder for later
+            while len(self._buffer) >= self._flush_every:
+                batch = self._buffer[:self._flush_every]
+                del self._buffer[:self._flush_every]
+                self._write_batch(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._write_batch(batch)
+
+    @abstractmethod
+    def _write_batch(self, batch: List[Any]) -> None:
+        """
+        Write one batch to the underlying target; called with the sink lock held.
+        """
+
+
+class ListSink(Sink):
+    """
+    Sink that stores every item in a list, like the plain list destination.
+    Memory grows with the number of items, prefer a bounded sink for long runs.
+    """
+
+    def __init__(self, items: Optional[List[Any]] = None) -> None:
+        self.items: List[Any] = [] if items is None else items
+
+    def append(self, item: Any) -> None:
+        self.items.append(item)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        self.items.extend(items)
+
+
+class RingBufferSink(Sink):
+    """
+    Sink that keeps only the most recent `maxlen` items, so memory stays bounded on long runs.
+    """
+
+    def __init__(self, maxlen: int) -> None:
+        if maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self._items: Deque[Any] = deque(maxlen=maxlen)
+
+    def append(self, item: Any) -> None:
+        self._items.append(item)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        self._items.extend(items)
+
+    def items(self) -> List[Any]:
+        """
+        Return a snapshot of the kept items, oldest first.
+        """
+        return list(self._items)
+
+
+class CallbackSink(BufferedSink):
+    """
+    Sink that calls `callback` with batches of up to `flush_every` items.
+    """
+
+    def __init__(self, callback: Callable[[List[Any]], None], flush_every: int = 100) -> None:
+        super().__init__(flush_every)
+        self._callback = callback
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._callback(batch)
+
+
+class JsonlFileSink(BufferedSink):
+    """
+    Sink that writes every item as one JSON line to a file, in buffered batches of `flush_every` lines.
+    Items that are not JSON serializable are written through `default` (str by default).
+    """
+
+    def __init__(self, path: str, flush_every: int = 1000, mode: str = "w", default: Callable[[Any], Any] = str) -> None:
+        if mode not in ("w", "a"):
+            raise ValueError("mode must be 'w' or 'a'")
+        super().__init__(flush_every)
+        self._file = open(path, mode, encoding="utf-8")
+        self._default = default
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._file.write("".join(json.dumps(item, default=self._default) + "\n" for item in batch))
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+class QueueSink(BufferedSink):
+    """
+    Sink that forwards items to a downstream BoundedBlockingQueue with put_many, `flush_every` items at a time.
+    A full downstream queue blocks the flush, so backpressure reaches the consumers feeding this sink.
+    """
+
+    def __init__(self, queue: BoundedBlockingQueue[Any], flush_every: int = 100) -> None:
+        super().__init__(flush_every)
+        self._queue = queue
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._queue.put_many(batch)
@@ -0,0 +1,377 @@
+import mmap
+import os
+import pickle
+import struct
+import time
+import zlib
+from collections import deque
+from typing import Any, Deque, List, Optional, Set, Tuple, TypeVar
+
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from events import EventHook
+from metrics import QueueMetrics
+
+T = TypeVar("T")
+
+# record header: payload length, CRC-32 of the payload, sequence number
+_RECORD = struct.Struct("<IIq")
+_SEGMENT_SUFFIX = ".seg"
+_CHECKPOINT = "checkpoint"
+# log pages already written or read are dropped from the process 1 MB at a time (the data stays in the file),
+# so a large spill does not show up as resident memory; not available on every platform
+_EVICT_BYTES = 1 << 20
+_MADV_DONTNEED = getattr(mmap, "MADV_DONTNEED", None)
+
+
+class _Segment:
+    """
+    One preallocated, memory-mapped log file holding records [0, end).
+    """
+
+    def __init__(self, path: str, first_seq: int, size: Optional[int] = None) -> None:
+        if size is not None:
+            # a sparse file of zeros, filled through the mapping
+            with open(path, "wb") as file:
+                file.truncate(size)
+        self.path = path
+        self.first_seq = first_seq
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.size = len(self.map)
+        self.end = 0 # offset after the last valid record
+        self.evicted = {"write": 0, "read": 0} # offsets below which written / read pages were dropped
+
+    def evict(self, side: str, upto: int) -> None:
+        """
+        Drop the whole pages between the last eviction on this side and `upto` from the mapping.
+        """
+        start = self.evicted[side]
+        upto -= upto % mmap.PAGESIZE
+        if _MADV_DONTNEED is None or upto - start < _EVICT_BYTES:
+            return
+        self.map.madvise(_MADV_DONTNEED, start, upto - start)
+        self.evicted[side] = upto
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+
+class SegmentLog:
+    """
+    Append-only log of byte records in memory-mapped segment files of `segment_bytes` each, named after the
+    sequence number of their first record. Appends and reads are plain memory copies; the OS writes the pages back,
+    so records survive a crash of the process (checkpoint(sync=True) also makes them survive a power loss).
+
+    A read cursor walks the records in order. `checkpoint(watermark)` stores the sequence number below which
+    every record has been acknowledged and deletes segments that hold only such records. Opening an existing
+    directory replays it: records from the checkpoint on are unread again, up to the first torn record
+    (checked by CRC). Not thread-safe; SpillingQueue uses it under its lock.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int) -> None:
+        if segment_bytes < _RECORD.size + 1:
+            raise ValueError("segment_bytes is too small for a record")
+
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._segment_bytes = segment_bytes
+        self._segments: List[_Segment] = [] # oldest first
+        self._writable: Optional[_Segment] = None # segment being appended to; recovered segments are never appended to
+        self._read_index = 0 # read cursor: segment index and offset
+        self._read_offset = 0
+        self._unread = 0
+        self.next_seq = 0 # sequence number for the next record
+        self.first_unacked = 0 # lowest sequence number that may still be unacknowledged
+        self._recover()
+
+    @property
+    def unread(self) -> int:
+        """
+        The number of records after the read cursor.
+        """
+        return self._unread
+
+    def append(self, seq: int, payload: bytes, read: bool = False) -> None:
+        """
+        Append a record. With `read=True` (only allowed when nothing is unread) the cursor moves past it at once,
+        for records that are handed out from memory and only logged for recovery.
+        """
+        size = _RECORD.size + len(payload)
+        segment = self._writable
+        if segment is None or segment.end + size > segment.size:
+            segment = self._roll(seq, size)
+
+        _RECORD.pack_into(segment.map, segment.end, len(payload), zlib.crc32(payload), seq)
+        segment.map[segment.end + _RECORD.size:segment.end + size] = payload
+        segment.end += size
+        segment.evict("write", segment.end)
+        self.next_seq = seq + 1
+        if read:
+            self._read_index = len(self._segments) - 1
+            self._read_offset = segment.end
+        else:
+            self._unread += 1
+
+    def read(self) -> Tuple[int, bytes]:
+        """
+        Return the sequence number and payload of the record at the cursor and move past it.
+        Only call it while `unread` is positive.
+        """
+        while True:
+            segment = self._segments[self._read_index]
+            if self._read_offset < segment.end:
+                length, _, seq = _RECORD.unpack_from(segment.map, self._read_offset)
+                start = self._read_offset + _RECORD.size
+                self._read_offset = start + length
+                self._unread -= 1
+                payload = segment.map[start:start + length]
+                segment.evict("read", self._read_offset)
+                return seq, payload
+            self._read_index += 1
+            self._read_offset = 0
+
+    def checkpoint(self, watermark: int, sync: bool = False) -> None:
+        """
+        Record that every sequence number below `watermark` is acknowledged (atomically, via rename),
+        and delete the segments that hold nothing else. With `sync`, segments and checkpoint are flushed to the device.
+        """
+        # a segment is done once the next one starts at or below the watermark and the cursor has left it
+        while len(self._segments) > 1 and self._segments[1].first_seq <= watermark and self._read_index > 0:
+            segment = self._segments.pop(0)
+            segment.close()
+            os.remove(segment.path)
+            self._read_index -= 1
+
+        if sync:
+            for segment in self._segments:
+                segment.map.flush()
+        path = os.path.join(self._directory, _CHECKPOINT)
+        with open(path + ".tmp", "w", encoding="ascii") as file:
+            file.write(str(watermark))
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+
+    def close(self) -> None:
+        """
+        Unmap every segment; the files stay for the next run.
+        """
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+        self._writable = None
+
+    def _roll(self, seq: int, size: int) -> _Segment:
+        path = os.path.join(self._directory, f"{seq:020d}{_SEGMENT_SUFFIX}")
+        segment = _Segment(path, seq, max(self._segment_bytes, size))
+        self._segments.append(segment)
+        self._writable = segment
+        return segment
+
+    def _recover(self) -> None:
+        """
+        Open the segments left by an earlier run and put the cursor on the first unacknowledged record.
+        """
+        checkpoint_path = os.path.join(self._directory, _CHECKPOINT)
+        watermark = 0
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="ascii") as file:
+                watermark = int(file.read() or 0)
+
+        names = []
+        for name in sorted(os.listdir(self._directory)):
+            if not name.endswith(_SEGMENT_SUFFIX):
+                continue
+            if os.path.getsize(os.path.join(self._directory, name)):
+                names.append(name)
+            else:
+                os.remove(os.path.join(self._directory, name)) # created by a crashed run before it was sized
+        cursor: Optional[Tuple[int, int, int]] = None # segment index, offset and seq of the first unacknowledged record
+        last_seq = watermark - 1
+        for index, name in enumerate(names):
+            segment = _Segment(os.path.join(self._directory, name), int(name[:-len(_SEGMENT_SUFFIX)]))
+            self._segments.append(segment)
+            offset = 0
+            while offset + _RECORD.size <= segment.size:
+                length, crc, seq = _RECORD.unpack_from(segment.map, offset)
+                start = offset + _RECORD.size
+                if not length or start + length > segment.size or zlib.crc32(segment.map[start:start + length]) != crc:
+                    break # end of the segment, or a record torn by a crash
+                if seq >= watermark:
+                    if cursor is None:
+                        cursor = (index, offset, seq)
+                    self._unread += 1
+                last_seq = max(last_seq, seq)
+                offset = start + length
+            segment.end = offset
+
+        self.next_seq = last_seq + 1
+        if cursor is not None:
+            self._read_index, self._read_offset, self.first_unacked = cursor
+        else:
+            self._read_index = max(0, len(self._segments) - 1)
+            self._read_offset = self._segments[-1].end if self._segments else 0
+            self.first_unacked = self.next_seq
+
+
+class SpillingQueue(BoundedBlockingQueue[T]):
+    """
+    BoundedBlockingQueue that keeps up to `memory_capacity` items in memory and spills the rest, up to `capacity`
+    in total, to a SegmentLog in `directory`, so producers keep going through a burst without holding it all in RAM.
+    Items stay in FIFO order: once anything is on disk, new items are appended to the log until it has been read
+    back. Spilled items are pickled.
+
+    Every item gets a sequence number. get / get_many / try_get acknowledge the item as they hand it out;
+    get_unacked returns (seq, item) instead, and the item only counts as done once ack(seq) is called.
+    Acknowledgements are checkpointed every `checkpoint_every` items, by checkpoint() and by release().
+    Creating a SpillingQueue on a directory an earlier run left behind replays every logged item that was not
+    acknowledged by the last checkpoint, so processing is at-least-once: an item may be seen twice, never lost.
+
+    Only spilled items are logged by default; with `durable=True` every item is written to the log as well
+    (memory then only saves the read back), so items held in memory also survive a crash of the process.
+    Call release() when done with the queue to write the final checkpoint and unmap the log.
+    """
+
+    def __init__(self, capacity: int, directory: str, memory_capacity: int, segment_bytes: int = 16 * 1024 * 1024,
+                 durable: bool = False, checkpoint_every: int = 1024, observer: Optional[EventHook] = None,
+                 metrics: Optional[QueueMetrics] = None) -> None:
+        super().__init__(capacity, observer, metrics)
+        if not 1 <= memory_capacity <= capacity:
+            raise ValueError("memory_capacity must be between 1 and capacity")
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+
+        self._memory_capacity = memory_capacity
+        self._durable = durable
+        self._checkpoint_every = checkpoint_every
+        self._log = SegmentLog(directory, segment_bytes)
+        self._memory: Deque[Tuple[int, T]] = deque() # (seq, item), always older than anything in the log
+        self._next_seq = self._log.next_seq
+        # acknowledgement state: every seq below the watermark is done, plus the ones acked out of order above it
+        self._watermark = self._log.first_unacked
+        self._acked_ahead: Set[int] = set()
+        self._acks_since_checkpoint = 0
+        if metrics is not None:
+            # replayed items have no put time of their own
+            self._stamps.extend([time.monotonic()] * self._log.unread)
+
+    def spilled(self) -> int:
+        """
+        Return the number of items waiting in the log on disk.
+        """
+        with self._lock:
+            return self._log.unread
+
+    def get_unacked(self, timeout: Optional[float] = None) -> Tuple[int, T]:
+        """
+        Like get, but returns (seq, item) and leaves the item unacknowledged: call ack(seq) once it is processed.
+        Items not acknowledged by the time the process stops are replayed by the next SpillingQueue on this directory.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            if not self._qsize() and not self._wait_for_items(deadline):
+                raise TimeoutError("timed out waiting for an item in the queue")
+            if not self._qsize():
+                raise QueueClosedError("get on a closed and drained queue")
+
+            seq, item = self._pop_entry()
+            self._notify_room([item])
+            if self._metrics is not None:
+                self._metrics.record_get(1, self._qsize() + 1)
+            return seq, item
+
+    def ack(self, seq: int) -> None:
+        """
+        Acknowledge an item returned by get_unacked. Acknowledging twice is a no-op.
+        """
+        with self._lock:
+            self._ack(seq)
+
+    def checkpoint(self, sync: bool = False) -> None:
+        """
+        Persist the acknowledgements now and delete fully acknowledged segments.
+        With `sync`, the log and the checkpoint are flushed to the device, not just to the OS.
+        """
+        with self._lock:
+            self._checkpoint(sync)
+
+    def release(self) -> None:
+        """
+        Write a final checkpoint and unmap the log. Unacknowledged and unread items stay on disk for the next run;
+        the queue must not be used afterwards.
+        """
+        with self._lock:
+            self._checkpoint(sync=False)
+            self._log.close()
+
+    def __enter__(self) -> "SpillingQueue[T]":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def _ack(self, seq: int) -> None:
+        if seq == self._watermark:
+            self._watermark += 1
+            while self._watermark in self._acked_ahead:
+                self._acked_ahead.remove(self._watermark)
+                self._watermark += 1
+        elif seq > self._watermark:
+            self._acked_ahead.add(seq)
+        else:
+            return
+
+        self._acks_since_checkpoint += 1
+        if self._acks_since_checkpoint >= self._checkpoint_every:
+            self._checkpoint(sync=False)
+
+    def _checkpoint(self, sync: bool) -> None:
+        self._log.checkpoint(self._watermark, sync)
+        self._acks_since_checkpoint = 0
+
+    # Storage hooks: memory first, then the log. Called with the lock held.
+
+    def _qsize(self) -> int:
+        return len(self._memory) + self._log.unread
+
+    def _has_room(self, item: T) -> bool:
+        return len(self._memory) + self._log.unread < self._capacity
+
+    def _push(self, item: T) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        # memory only while nothing is waiting on disk, which keeps FIFO order
+        in_memory = not self._log.unread and len(self._memory) < self._memory_capacity
+        if in_memory:
+            self._memory.append((seq, item))
+        if self._durable or not in_memory:
+            self._log.append(seq, pickle.dumps(item, pickle.HIGHEST_PROTOCOL), read=in_memory)
+        if self._metrics is not None:
+            self._stamps.append(time.monotonic())
+
+    def _push_many(self, batch: List[T], start: int) -> int:
+        chunk = batch[start:start + self._capacity - self._qsize()]
+        for item in chunk:
+            self._push(item)
+        return len(chunk)
+
+    def _pop_entry(self) -> Tuple[int, T]:
+        if self._memory:
+            seq, item = self._memory.popleft()
+        else:
+            seq, payload = self._log.read()
+            item = pickle.loads(payload)
+        if self._metrics is not None:
+            self._metrics.record_latency(time.monotonic() - self._stamps.popleft())
+        return seq, item
+
+    def _pop(self) -> T:
+        seq, item = self._pop_entry()
+        self._ack(seq)
+        return item
+
+    def _pop_many(self, count: int) -> List[T]:
+        return [self._pop() for _ in range(count)]
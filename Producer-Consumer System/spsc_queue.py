@@ -0,0 +1,301 @@
+import threading
+import time
+from typing import Any, Callable, Generic, Iterable, List, Optional, TypeVar
+
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from events import EventHook, EventType, make_event
+from metrics import QueueMetrics
+
+T = TypeVar("T")
+
+
+class SPSCQueue(Generic[T]):
+    """
+    Bounded queue for exactly one producer thread and one consumer thread, with the same API as
+    BoundedBlockingQueue (put/get, put_many/get_many, try_put/try_get, close, timeouts).
+
+    Items live in a preallocated ring of `capacity` slots. The producer only ever writes `_tail`
+    and the consumer only ever writes `_head`, so a transfer needs no lock: the item is stored in its slot
+    before the counter that publishes it is advanced, and both are single atomic stores under the GIL.
+
+    A side that cannot proceed first spins briefly (yielding the GIL to the other side), then parks on a
+    Condition. The lock is only taken to park and to wake a parked side, so while both sides keep up
+    with each other the queue never touches it.
+
+    Only one thread may put and one thread may get at a time; close() may be called from any thread.
+    """
+
+    def __init__(self, capacity: int, observer: Optional[EventHook] = None, spin: int = 100, metrics: Optional[QueueMetrics] = None) -> None:
+        # we want to ensure that the holding capacity of queue is positive to run any operation on it
+        if capacity < 0:
+            raise ValueError("capacity must be positive to operate on queue, exiting...")
+        # forbid deadlocks
+        if capacity == 0:
+            raise ValueError("Capacity is 0, queue will be stuck in a deadlock, exiting...")
+
+        self._capacity = capacity
+        self._buffer: List[Any] = [None] * capacity # preallocated ring, slot = counter % capacity
+        self._head = 0 # number of items taken so far, written by the consumer only
+        self._tail = 0 # number of items put so far, written by the producer only
+        self._closed = False
+        self._spin = spin # polls before parking
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock) # a parked producer waits here for free space
+        self._not_empty = threading.Condition(self._lock) # a parked consumer waits here for items
+        self._producer_parked = False
+        self._consumer_parked = False
+        self._observer = observer
+        self._metrics = metrics
+        # put time of the item in every slot, only kept with metrics
+        self._stamps: Optional[List[float]] = [0.0] * capacity if metrics is not None else None
+
+    def put(self, item: T, timeout: Optional[float] = None) -> None:
+        """
+        Producer puts an item into the queue.
+        Blocked as long as the queue is full, for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError if the queue is or gets closed.
+        """
+        if self._tail - self._head >= self._capacity and not self._await_room(timeout):
+            raise TimeoutError("timed out waiting for space in the queue")
+        if self._closed:
+            raise QueueClosedError("put on a closed queue")
+
+        # single-item fast path of _publish
+        tail = self._tail
+        self._buffer[tail % self._capacity] = item
+        if self._stamps is not None:
+            self._stamps[tail % self._capacity] = time.monotonic()
+        self._tail = tail + 1
+        if self._consumer_parked:
+            with self._not_empty:
+                self._not_empty.notify()
+        if self._metrics is not None:
+            self._metrics.record_put(1)
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Consumer removes and returns an item from the queue.
+        Blocked as long as the queue is empty, for at most `timeout` seconds if given (then raises TimeoutError).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if self._head == self._tail and not self._await_items(timeout):
+            raise TimeoutError("timed out waiting for an item in the queue")
+
+        # single-item fast path of _take
+        head = self._head
+        if head == self._tail:
+            raise QueueClosedError("get on a closed and drained queue")
+        index = head % self._capacity
+        item = self._buffer[index]
+        self._buffer[index] = None # do not keep taken items alive
+        stamp = self._stamps[index] if self._stamps is not None else 0.0
+        self._head = head + 1
+        if self._producer_parked:
+            with self._not_full:
+                self._not_full.notify()
+        if self._metrics is not None:
+            self._metrics.record_get(1, self._tail - head, time.monotonic() - stamp)
+        return item
+
+    def try_put(self, item: T) -> bool:
+        """
+        Put an item only if there is room right now.
+        Returns False instead of blocking when the queue is full; raises QueueClosedError if it is closed.
+        """
+        if self._closed:
+            raise QueueClosedError("put on a closed queue")
+        if self._tail - self._head >= self._capacity:
+            return False
+
+        self._publish([item])
+        return True
+
+    def try_get(self, default: Any = None) -> Any:
+        """
+        Remove and return an item only if one is available right now, otherwise return `default`.
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if self._head == self._tail and not self._closed:
+            return default
+        return self._take(1)[0]
+
+    def put_many(self, items: Iterable[T], timeout: Optional[float] = None) -> int:
+        """
+        Producer puts a batch of items into the queue, filling all free slots at once each time there is room.
+        Blocks while the queue is full, for at most `timeout` seconds in total if given.
+        Returns the number of items put, which is less than len(items) only if the timeout expired.
+        Raises QueueClosedError if the queue is or gets closed before the whole batch is in.
+        """
+        batch = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+
+        while put_count < len(batch):
+            if self._tail - self._head >= self._capacity and not self._await_room(self._remaining(deadline)):
+                return put_count
+            if self._closed:
+                raise QueueClosedError("put on a closed queue")
+
+            room = self._capacity - (self._tail - self._head)
+            chunk = batch[put_count:put_count + room]
+            self._publish(chunk)
+            put_count += len(chunk)
+
+        return put_count
+
+    def get_many(self, max_items: int, timeout: Optional[float] = None, stop: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """
+        Consumer removes and returns up to `max_items` available items at once.
+        Blocked as long as the queue is empty, for at most `timeout` seconds if given.
+        Returns whatever is available once at least one item is in the queue, or an empty list on timeout.
+        With `stop`, the batch ends after the first item for which stop(item) is true and the items behind it
+        stay queued (e.g. a consumer stopping at its sentinel).
+        Raises QueueClosedError once the queue is closed and empty.
+        """
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+
+        if self._head == self._tail and not self._await_items(timeout):
+            return []
+
+        return self._take(max_items, stop)
+
+    def close(self) -> None:
+        """
+        Close the queue and wake the producer and consumer.
+        Further puts raise QueueClosedError; gets still return the remaining items and raise
+        QueueClosedError once the queue is drained. Closing twice is a no-op.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._observer is not None:
+                self._observer(make_event(EventType.QUEUE_CLOSED, size=self._tail - self._head))
+            self._not_full.notify_all()
+            self._not_empty.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether close() has been called.
+        """
+        return self._closed
+
+    def size(self) -> int:
+        """
+        Return the current number of items in the queue.
+        """
+        return self._tail - self._head
+
+    def _publish(self, items: List[T]) -> None:
+        """
+        Producer side: copy the items into their slots (at most two slices, as the ring may wrap),
+        then make them visible with one store to `_tail`. The caller checked that they fit.
+        """
+        count = len(items)
+        start = self._tail % self._capacity
+        first = min(count, self._capacity - start)
+        self._buffer[start:start + first] = items[:first]
+        if first < count:
+            self._buffer[:count - first] = items[first:]
+        if self._stamps is not None:
+            now = time.monotonic()
+            self._stamps[start:start + first] = [now] * first
+            self._stamps[:count - first] = [now] * (count - first)
+        self._tail += count
+        # the consumer sets its flag before its last check for items, so it either sees the new tail or gets woken up here
+        if self._consumer_parked:
+            with self._not_empty:
+                self._not_empty.notify()
+        if self._metrics is not None:
+            self._metrics.record_put(count)
+
+    def _take(self, max_items: int, stop: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """
+        Consumer side: copy out up to `max_items` items (at most two slices), up to and including the first one
+        matching `stop` if given, clear their slots, then free them with one store to `_head`.
+        Raises QueueClosedError if there is nothing left to take.
+        """
+        count = min(max_items, self._tail - self._head)
+        if count == 0:
+            raise QueueClosedError("get on a closed and drained queue")
+        if stop is not None:
+            # published slots belong to the consumer until `_head` moves, so they can be looked at in place
+            for offset in range(count):
+                if stop(self._buffer[(self._head + offset) % self._capacity]):
+                    count = offset + 1
+                    break
+
+        start = self._head % self._capacity
+        first = min(count, self._capacity - start)
+        items = self._buffer[start:start + first]
+        self._buffer[start:start + first] = [None] * first # do not keep taken items alive
+        if first < count:
+            items += self._buffer[:count - first]
+            self._buffer[:count - first] = [None] * (count - first)
+        if self._stamps is not None:
+            stamps = self._stamps[start:start + first] + self._stamps[:count - first]
+        self._head += count
+        if self._producer_parked:
+            with self._not_full:
+                self._not_full.notify()
+        if self._metrics is not None:
+            now = time.monotonic()
+            for stamp in stamps:
+                self._metrics.record_latency(now - stamp)
+            self._metrics.record_get(count, self._tail - self._head + count)
+        return items
+
+    def _await_room(self, timeout: Optional[float]) -> bool:
+        return self._await(lambda: self._tail - self._head < self._capacity or self._closed,
+                           self._not_full, "_producer_parked", EventType.PRODUCER_BLOCKED, timeout,
+                           None if self._metrics is None else self._metrics.record_producer_blocked)
+
+    def _await_items(self, timeout: Optional[float]) -> bool:
+        return self._await(lambda: self._head != self._tail or self._closed,
+                           self._not_empty, "_consumer_parked", EventType.CONSUMER_BLOCKED, timeout,
+                           None if self._metrics is None else self._metrics.record_consumer_blocked)
+
+    def _await(self, ready: Callable[[], bool], condition: threading.Condition, parked_flag: str,
+               blocked_event: EventType, timeout: Optional[float], record_blocked: Optional[Callable[[float], None]]) -> bool:
+        """
+        Spin, then park on `condition` until `ready()` holds or the timeout expires.
+        Returns whether `ready()` holds. The time spent here is reported to `record_blocked` if given.
+        """
+        if record_blocked is None:
+            return self._spin_then_park(ready, condition, parked_flag, blocked_event, timeout)
+
+        blocked_at = time.monotonic()
+        try:
+            return self._spin_then_park(ready, condition, parked_flag, blocked_event, timeout)
+        finally:
+            record_blocked(time.monotonic() - blocked_at)
+
+    def _spin_then_park(self, ready: Callable[[], bool], condition: threading.Condition, parked_flag: str,
+                        blocked_event: EventType, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for _ in range(self._spin):
+            if ready():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            # hand the GIL to the other side, which is the only one that can make us ready
+            time.sleep(0)
+
+        with condition:
+            setattr(self, parked_flag, True)
+            try:
+                while not ready():
+                    if self._observer is not None:
+                        self._observer(make_event(blocked_event, size=self._tail - self._head))
+                    if not BoundedBlockingQueue._wait(condition, deadline):
+                        return False
+            finally:
+                setattr(self, parked_flag, False)
+        return True
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
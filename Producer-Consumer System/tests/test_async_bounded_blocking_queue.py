@@ -0,0 +1,122 @@
+import unittest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from async_bounded_blocking_queue import AsyncBoundedBlockingQueue
+from bounded_blocking_queue import QueueClosedError
+
+
+class TestAsyncBoundedBlockingQueue(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncBoundedBlockingQueue"""
+
+    def test_init_zero_capacity_raises_error(self):
+        """Test that zero capacity raises ValueError"""
+        with self.assertRaises(ValueError):
+            AsyncBoundedBlockingQueue[int](capacity=0)
+
+    async def test_put_and_get_multiple_items(self):
+        """Test putting and getting items in FIFO order"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=5)
+        for item in [1, 2, 3]:
+            await queue.put(item)
+        self.assertEqual(queue.size(), 3)
+
+        self.assertEqual([await queue.get() for _ in range(3)], [1, 2, 3])
+        self.assertEqual(queue.size(), 0)
+
+    async def test_put_waits_when_full(self):
+        """Test that put waits until a get frees space"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=1)
+        await queue.put(1)
+
+        put_task = asyncio.ensure_future(queue.put(2))
+        await asyncio.sleep(0.05)
+        self.assertFalse(put_task.done())
+
+        self.assertEqual(await queue.get(), 1)
+        await asyncio.wait_for(put_task, 1.0)
+        self.assertEqual(await queue.get(), 2)
+
+    async def test_put_many_and_get_many(self):
+        """Test batch variants, including a batch larger than the capacity"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=3)
+        consumed = []
+
+        async def consume():
+            while len(consumed) < 10:
+                consumed.extend(await queue.get_many(2))
+
+        consumer = asyncio.ensure_future(consume())
+        self.assertEqual(await queue.put_many(range(10)), 10)
+        await asyncio.wait_for(consumer, 1.0)
+
+        self.assertEqual(consumed, list(range(10)))
+
+    async def test_timeouts(self):
+        """Test that batch operations give up at the timeout"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=2)
+        self.assertEqual(await queue.get_many(5, timeout=0.05), [])
+        self.assertEqual(await queue.put_many([1, 2, 3], timeout=0.05), 2)
+
+    async def test_put_and_get_timeouts(self):
+        """Test that single-item put and get raise TimeoutError when the timeout expires"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=1)
+        with self.assertRaises(TimeoutError):
+            await queue.get(timeout=0.05)
+
+        await queue.put(1)
+        with self.assertRaises(TimeoutError):
+            await queue.put(2, timeout=0.05)
+        self.assertEqual(queue.size(), 1)
+
+    async def test_try_put_and_try_get(self):
+        """Test that the non-waiting variants report a full or empty queue instead of waiting"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=1)
+        self.assertIsNone(await queue.try_get())
+        self.assertTrue(await queue.try_put(1))
+        self.assertFalse(await queue.try_put(2))
+        self.assertEqual(await queue.try_get(), 1)
+        self.assertEqual(await queue.try_get(default=-1), -1)
+
+    async def test_close_wakes_waiters_and_drains(self):
+        """Test that close wakes a waiting consumer and lets the remaining items drain first"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=2)
+        get_task = asyncio.ensure_future(queue.get())
+        await asyncio.sleep(0.05)
+
+        await queue.close()
+        with self.assertRaises(QueueClosedError):
+            await asyncio.wait_for(get_task, 1.0)
+        with self.assertRaises(QueueClosedError):
+            await queue.put(1)
+
+        queue = AsyncBoundedBlockingQueue[int](capacity=2)
+        await queue.put_many([1, 2])
+        await queue.close()
+        await queue.close()
+        self.assertTrue(queue.closed)
+        self.assertEqual(await queue.get_many(5), [1, 2])
+        with self.assertRaises(QueueClosedError):
+            await queue.try_get()
+
+    async def test_cancelled_waiter_passes_wakeup_on(self):
+        """Test that cancelling a woken-up consumer does not strand the other waiting consumer"""
+        queue = AsyncBoundedBlockingQueue[int](capacity=5)
+
+        first = asyncio.ensure_future(queue.get())
+        second = asyncio.ensure_future(queue.get())
+        await asyncio.sleep(0.01)
+
+        # the put wakes `first`, which is cancelled before it can take the item
+        await queue.put(7)
+        first.cancel()
+
+        self.assertEqual(await asyncio.wait_for(second, 1.0), 7)
+        self.assertTrue(first.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from async_producer_consumer_system import AsyncProducerConsumerSystem
+
+
+async def async_range(count):
+    """Async source yielding 0..count-1"""
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield i
+
+
+class TestAsyncProducerConsumerSystem(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncProducerConsumerSystem, AsyncProducer and AsyncConsumer"""
+
+    async def test_system_processes_sync_source(self):
+        """Test that all items of a plain iterable reach the destination in order"""
+        system = AsyncProducerConsumerSystem(source=range(50), capacity=4)
+        await system.run()
+
+        self.assertEqual(system._destination_data, list(range(50)))
+        self.assertEqual(system.queue_size(), 0)
+
+    async def test_system_with_async_source_and_async_sink(self):
+        """Test an async iterable source feeding an async sink through a worker pool"""
+        received = []
+
+        async def sink(item):
+            await asyncio.sleep(0)
+            received.append(item)
+
+        system = AsyncProducerConsumerSystem(source=async_range(100), capacity=8, batch_size=5,
+                                             num_producers=3, num_consumers=4, destination=sink)
+        await system.run()
+
+        self.assertEqual(sorted(received), list(range(100)))
+
+    async def test_system_applies_async_process_fn(self):
+        """Test that coroutine process functions are awaited"""
+        async def double(x):
+            return x * 2
+
+        system = AsyncProducerConsumerSystem(source=[1, 2, 3], process_fn=double)
+        await system.run()
+
+        self.assertEqual(system._destination_data, [2, 4, 6])
+
+    async def test_cancelling_run_cancels_all_workers(self):
+        """Test that cancelling run() stops every worker task instead of leaking them"""
+        async def endless():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        system = AsyncProducerConsumerSystem(source=endless(), capacity=2, consumer_delay=0.01, num_consumers=2)
+        run_task = asyncio.ensure_future(system.run())
+        await asyncio.sleep(0.05)
+
+        tasks_before = asyncio.all_tasks()
+        run_task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await run_task
+
+        # only the test's own task is left
+        leftover = [task for task in tasks_before if not task.done() and task is not asyncio.current_task()]
+        self.assertEqual(leftover, [])
+
+    async def test_invalid_worker_counts(self):
+        """Test that empty worker pools are rejected"""
+        with self.assertRaises(ValueError):
+            AsyncProducerConsumerSystem(source=[], num_consumers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import time
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from autoscaler import AutoscalePolicy, Autoscaler, ScalingAction
+from bounded_blocking_queue import BoundedBlockingQueue
+from events import EventType, RingBufferCollector, format_event
+from metrics import QueueMetrics
+from producer_consumer_system import ProducerConsumerSystem
+
+
+class TestAutoscaler(unittest.TestCase):
+    """Test cases for Autoscaler, driven tick by tick"""
+
+    def make_autoscaler(self, policy, capacity=4, consumers=1):
+        self.metrics = QueueMetrics()
+        self.queue = BoundedBlockingQueue[int](capacity=capacity, metrics=self.metrics)
+        self.calls = []
+        self.collector = RingBufferCollector()
+        return Autoscaler(queue=self.queue, metrics=self.metrics, policy=policy, consumers=consumers,
+                          start_consumer=lambda: self.calls.append("start"), retire_consumer=lambda: self.calls.append("retire"),
+                          observer=self.collector)
+
+    def test_invalid_policy(self):
+        """Test that inconsistent bounds and thresholds are rejected"""
+        for policy in (AutoscalePolicy(min_consumers=3, max_consumers=2), AutoscalePolicy(min_capacity=0),
+                       AutoscalePolicy(low_watermark=0.8, high_watermark=0.5), AutoscalePolicy(growth=1.0)):
+            with self.assertRaises(ValueError):
+                policy.validate()
+
+    def test_sustained_pressure_scales_up(self):
+        """Test that consumers and capacity grow only after scale_up_after pressured ticks"""
+        autoscaler = self.make_autoscaler(AutoscalePolicy(min_capacity=4, max_capacity=6, max_consumers=4, scale_up_after=2))
+        self.queue.put_many([1, 2, 3])
+
+        self.assertIsNone(autoscaler.tick())
+        self.assertEqual(autoscaler.tick(), ScalingAction(consumers=2, capacity=6, reason="pressure"))
+        self.assertEqual(self.calls, ["start"])
+        self.assertEqual(self.queue.capacity, 6)
+
+        # capacity is capped at max_capacity, consumers keep growing
+        self.queue.put_many([4, 5])
+        autoscaler.tick()
+        self.assertEqual(autoscaler.tick(), ScalingAction(consumers=4, capacity=6, reason="pressure"))
+        self.assertEqual(autoscaler.consumers, 4)
+        self.assertEqual([event.type for event in self.collector.events()], [EventType.SCALED] * 2)
+
+    def test_hysteresis_between_watermarks(self):
+        """Test that a tick between the watermarks breaks a pressure streak"""
+        autoscaler = self.make_autoscaler(AutoscalePolicy(min_capacity=4, scale_up_after=2, high_watermark=0.75, low_watermark=0.25))
+        self.queue.put_many([1, 2, 3])
+        autoscaler.tick()
+        self.queue.get()  # 2 of 4: neither pressure nor slack
+        autoscaler.tick()
+        self.queue.put(4)
+        self.assertIsNone(autoscaler.tick())
+        self.assertEqual(self.calls, [])
+
+    def test_sustained_slack_scales_down_one_consumer_at_a_time(self):
+        """Test that an idle queue retires one consumer and shrinks capacity down to the bounds"""
+        autoscaler = self.make_autoscaler(AutoscalePolicy(min_capacity=2, min_consumers=1, scale_down_after=3), capacity=8, consumers=2)
+
+        actions = [autoscaler.tick() for _ in range(9)]
+        self.assertEqual([action for action in actions if action is not None], [
+            ScalingAction(consumers=1, capacity=4, reason="slack"),
+            ScalingAction(consumers=1, capacity=2, reason="slack"),
+        ])
+        self.assertEqual(self.calls, ["retire"])
+
+    def test_blocked_producers_count_as_pressure(self):
+        """Test that producer blocked time triggers scaling even when occupancy is low at the tick"""
+        autoscaler = self.make_autoscaler(AutoscalePolicy(min_capacity=4, scale_up_after=1, blocked_share=0.01))
+        autoscaler.tick()
+        self.metrics.record_producer_blocked(1.0)
+
+        action = autoscaler.tick()
+        self.assertEqual(action.reason, "pressure")
+        self.assertIn("2 consumers, capacity 8", format_event(self.collector.events()[-1]))
+
+
+class TestAutoscaledSystem(unittest.TestCase):
+    """Test cases for ProducerConsumerSystem with autoscale"""
+
+    def test_burst_adds_consumers_and_keeps_every_item(self):
+        """Test that a backlog grows the consumer pool and every item still arrives exactly once"""
+        def slow(item):
+            time.sleep(0.002)
+            return item
+
+        policy = AutoscalePolicy(max_consumers=4, min_capacity=8, max_capacity=64, interval=0.01, scale_up_after=1, scale_down_after=5)
+        system = ProducerConsumerSystem(source=range(300), capacity=8, process_fn=slow, autoscale=policy)
+        system.run(timeout=10.0)
+
+        self.assertEqual(sorted(system._destination_data), list(range(300)))
+        self.assertGreater(len(system._consumers), 1)
+        self.assertIsInstance(system._queue, BoundedBlockingQueue)
+        self.assertFalse(system._autoscaler.is_alive())
+
+    def test_invalid_autoscale_configuration(self):
+        """Test that autoscaling is refused for process mode and injected queues"""
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=[], consumer_mode="process", process_fn=abs, autoscale=AutoscalePolicy())
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=[], queue=BoundedBlockingQueue[int](capacity=4), autoscale=AutoscalePolicy())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from bounded_blocking_queue import BoundedBlockingQueue
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
 
 
 class TestBoundedBlockingQueue(unittest.TestCase):
@@ -163,6 +163,172 @@ class TestBoundedBlockingQueue(unittest.TestCase):
         queue_none.put(None)
         self.assertIsNone(queue_none.get())
 
+    def test_put_many_and_get_many(self):
+        """Test moving a batch of items in and out of the queue"""
+        queue = BoundedBlockingQueue[int](capacity=5)
+
+        self.assertEqual(queue.put_many([1, 2, 3]), 3)
+        self.assertEqual(queue.size(), 3)
+
+        self.assertEqual(queue.get_many(2), [1, 2])
+        self.assertEqual(queue.get_many(10), [3])  # returns what is available
+        self.assertEqual(queue.size(), 0)
+
+    def test_put_many_larger_than_capacity(self):
+        """Test that put_many blocks until a consumer frees space for the rest of the batch"""
+        queue = BoundedBlockingQueue[int](capacity=3)
+        items = list(range(10))
+        consumed = []
+
+        def consumer():
+            while len(consumed) < len(items):
+                consumed.extend(queue.get_many(2))
+
+        thread = threading.Thread(target=consumer)
+        thread.start()
+
+        self.assertEqual(queue.put_many(items), len(items))
+        thread.join(timeout=2.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(consumed, items)
+
+    def test_put_many_timeout_returns_partial_count(self):
+        """Test that put_many stops at the timeout and reports how many items fit"""
+        queue = BoundedBlockingQueue[int](capacity=2)
+
+        start_time = time.time()
+        self.assertEqual(queue.put_many([1, 2, 3, 4], timeout=0.1), 2)
+        self.assertGreaterEqual(time.time() - start_time, 0.1)
+        self.assertEqual(queue.size(), 2)
+
+    def test_get_many_stops_after_matching_item(self):
+        """Test that get_many with stop ends the batch at the first matching item and leaves the rest queued"""
+        queue = BoundedBlockingQueue[int](capacity=10)
+        queue.put_many([1, 2, 0, 3, 0])
+        self.assertEqual(queue.get_many(10, stop=lambda item: item == 0), [1, 2, 0])
+        self.assertEqual(queue.get_many(1, stop=lambda item: item == 0), [3])
+        self.assertEqual(queue.get_many(10), [0])
+
+    def test_get_many_timeout_returns_empty_list(self):
+        """Test that get_many on an empty queue returns [] after the timeout"""
+        queue = BoundedBlockingQueue[int](capacity=2)
+        self.assertEqual(queue.get_many(5, timeout=0.05), [])
+
+    def test_get_many_invalid_max_items(self):
+        """Test that get_many rejects a non-positive batch size"""
+        queue = BoundedBlockingQueue[int](capacity=2)
+        with self.assertRaises(ValueError):
+            queue.get_many(0)
+
+    def test_put_and_get_timeout(self):
+        """Test that put on a full queue and get on an empty queue raise TimeoutError"""
+        queue = BoundedBlockingQueue[int](capacity=1)
+
+        with self.assertRaises(TimeoutError):
+            queue.get(timeout=0.05)
+
+        queue.put(1, timeout=0.05)
+        start_time = time.time()
+        with self.assertRaises(TimeoutError):
+            queue.put(2, timeout=0.05)
+        self.assertGreaterEqual(time.time() - start_time, 0.05)
+        self.assertEqual(queue.get(timeout=0.05), 1)
+
+    def test_try_put_and_try_get(self):
+        """Test the non-blocking variants"""
+        queue = BoundedBlockingQueue[int](capacity=1)
+
+        self.assertIsNone(queue.try_get())
+        self.assertEqual(queue.try_get(default=-1), -1)
+        self.assertTrue(queue.try_put(1))
+        self.assertFalse(queue.try_put(2))
+        self.assertEqual(queue.try_get(), 1)
+
+    def test_close_wakes_blocked_consumer(self):
+        """Test that close wakes a consumer blocked on an empty queue with QueueClosedError"""
+        queue = BoundedBlockingQueue[int](capacity=2)
+        errors = []
+
+        def get_item():
+            try:
+                queue.get()
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=get_item)
+        thread.start()
+        time.sleep(0.05)
+        queue.close()
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(queue.closed)
+
+    def test_close_wakes_blocked_producer(self):
+        """Test that close wakes a producer blocked on a full queue with QueueClosedError"""
+        queue = BoundedBlockingQueue[int](capacity=1)
+        queue.put(1)
+        errors = []
+
+        def put_item():
+            try:
+                queue.put_many([2, 3])
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=put_item)
+        thread.start()
+        time.sleep(0.05)
+        queue.close()
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_closed_queue_drains_then_raises(self):
+        """Test that a closed queue rejects puts but still hands out the remaining items"""
+        queue = BoundedBlockingQueue[int](capacity=5)
+        queue.put_many([1, 2, 3])
+        queue.close()
+        queue.close()  # closing twice is fine
+
+        with self.assertRaises(QueueClosedError):
+            queue.put(4)
+        with self.assertRaises(QueueClosedError):
+            queue.try_put(4)
+
+        self.assertEqual(queue.get(), 1)
+        self.assertEqual(queue.get_many(5), [2, 3])
+        with self.assertRaises(QueueClosedError):
+            queue.get()
+        with self.assertRaises(QueueClosedError):
+            queue.get_many(5)
+        with self.assertRaises(QueueClosedError):
+            queue.try_get()
+
+    def test_set_capacity(self):
+        """Test that growing wakes a blocked producer and shrinking keeps the queued items"""
+        queue = BoundedBlockingQueue[int](capacity=1)
+        queue.put(1)
+
+        thread = threading.Thread(target=queue.put, args=(2,))
+        thread.start()
+        time.sleep(0.05)
+        queue.set_capacity(3)
+        thread.join(timeout=1.0)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(queue.capacity, 3)
+
+        queue.set_capacity(1)
+        self.assertEqual(queue.size(), 2)
+        self.assertFalse(queue.try_put(3))
+        self.assertEqual(queue.get_many(5), [1, 2])
+        self.assertTrue(queue.try_put(3))
+        with self.assertRaises(ValueError):
+            queue.set_capacity(0)
+
 
 if __name__ == "__main__":
     unittest.main()
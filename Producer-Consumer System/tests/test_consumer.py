@@ -3,11 +3,13 @@ import threading
 import time
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from bounded_blocking_queue import BoundedBlockingQueue
 from consumer import Consumer
+from spsc_queue import SPSCQueue
 
 
 class TestConsumer(unittest.TestCase):
@@ -59,6 +61,29 @@ class TestConsumer(unittest.TestCase):
         self.assertEqual(destination, [1, 2])
         self.assertEqual(queue.size(), 1)  # Item 3 still in queue
 
+    def test_retired_consumer_stops_after_current_item(self):
+        """Test that a retired consumer finishes its item and leaves the rest in the queue"""
+        queue = BoundedBlockingQueue[int](capacity=5)
+        destination = []
+        started = threading.Event()
+
+        def slow(item):
+            started.set()
+            time.sleep(0.1)
+            return item
+
+        queue.put_many([1, 2, 3])
+        consumer = Consumer(queue=queue, destination=destination, sentinel=object(), process_fn=slow)
+        consumer.start()
+        started.wait(timeout=1.0)
+        consumer.retire()
+        consumer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertTrue(consumer.retired)
+        self.assertEqual(destination, [1])
+        self.assertEqual(queue.size(), 2)
+
     def test_consumer_blocks_when_queue_empty(self):
         """Test that consumer blocks when queue is empty"""
         queue = BoundedBlockingQueue[int](capacity=5)
@@ -105,6 +130,58 @@ class TestConsumer(unittest.TestCase):
         self.assertGreaterEqual(elapsed, 0.2)
         self.assertEqual(destination, [1, 2])
 
+    def test_consumer_with_batch_size(self):
+        """Test that a batching consumer consumes all items in order"""
+        queue = BoundedBlockingQueue[int](capacity=20)
+        destination = []
+        sentinel = object()
+
+        items = list(range(10))
+        queue.put_many(items)
+        queue.put(sentinel)
+
+        consumer = Consumer(queue=queue, destination=destination, sentinel=sentinel, delay_seconds=0.0, batch_size=4)
+        consumer.start()
+        consumer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(destination, items)
+        self.assertEqual(queue.size(), 0)
+
+    def test_batched_consumer_leaves_items_after_sentinel_queued(self):
+        """Test that a batch ends at the sentinel, leaving the items behind it queued in their order"""
+        queue = BoundedBlockingQueue[int](capacity=10)
+        destination = []
+        sentinel = object()
+
+        queue.put_many([1, 2, sentinel, 3, 4])
+
+        consumer = Consumer(queue=queue, destination=destination, sentinel=sentinel, delay_seconds=0.0, batch_size=10)
+        consumer.start()
+        consumer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(destination, [1, 2])
+        self.assertEqual(queue.get_many(10), [3, 4])
+
+    def test_batched_consumer_never_puts_on_spsc_queue(self):
+        """Test that the consumer of an SPSCQueue stays a pure consumer when it stops at the sentinel"""
+        queue = SPSCQueue[int](capacity=10)
+        destination = []
+        sentinel = object()
+
+        queue.put_many([1, 2, sentinel, 3])
+
+        with patch.object(queue, "put_many", side_effect=AssertionError("consumer put items")), \
+                patch.object(queue, "put", side_effect=AssertionError("consumer put an item")):
+            consumer = Consumer(queue=queue, destination=destination, sentinel=sentinel, delay_seconds=0.0, batch_size=10)
+            consumer.start()
+            consumer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(destination, [1, 2])
+        self.assertEqual(queue.get(), 3)
+
     # def test_consumer_preserves_order(self):
     #     """Test that consumer preserves order of items"""
     #     queue = BoundedBlockingQueue[int](capacity=10)
@@ -0,0 +1,83 @@
+import unittest
+import logging
+import threading
+import time
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from events import EventType, LoggingObserver, RingBufferCollector, make_event
+from producer_consumer_system import ProducerConsumerSystem
+
+
+class TestEvents(unittest.TestCase):
+    """Test cases for event observers"""
+
+    def test_ring_buffer_keeps_most_recent_events(self):
+        """Test that the ring buffer drops the oldest events once full"""
+        collector = RingBufferCollector(maxlen=3)
+        for i in range(5):
+            collector(make_event(EventType.PRODUCED, i))
+
+        self.assertEqual([event.item for event in collector.events()], [2, 3, 4])
+
+        collector.clear()
+        self.assertEqual(collector.events(), [])
+
+    def test_ring_buffer_invalid_maxlen(self):
+        """Test that a non-positive ring buffer size is rejected"""
+        with self.assertRaises(ValueError):
+            RingBufferCollector(maxlen=0)
+
+    def test_logging_observer_writes_messages(self):
+        """Test that the logging adapter logs the familiar messages"""
+        logger = logging.getLogger("test_events")
+        observer = LoggingObserver(logger=logger, level=logging.INFO)
+
+        with self.assertLogs(logger, level=logging.INFO) as logs:
+            observer(make_event(EventType.PRODUCED, 7))
+            observer(make_event(EventType.CONSUMER_BLOCKED, size=0))
+            observer(make_event(EventType.SENTINEL_RECEIVED))
+
+        self.assertEqual(logs.output, [
+            "INFO:test_events:Producing item ---- 7",
+            "INFO:test_events:Queue is empty, Consumer is waiting for an item. Current size: 0",
+            "INFO:test_events:Consumer received sentinel, stopping",
+        ])
+
+    def test_queue_reports_blocked_consumer(self):
+        """Test that the queue reports a consumer blocking on an empty queue"""
+        collector = RingBufferCollector()
+        queue = BoundedBlockingQueue[int](capacity=1, observer=collector)
+
+        thread = threading.Thread(target=queue.get)
+        thread.start()
+        time.sleep(0.1)
+        queue.put(1)
+        thread.join(timeout=1.0)
+
+        events = collector.events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].type, EventType.CONSUMER_BLOCKED)
+        self.assertEqual(events[0].size, 0)
+
+    def test_system_reports_all_events(self):
+        """Test that producer and consumer report every item and the queue reports closing"""
+        collector = RingBufferCollector()
+        source = [1, 2, 3]
+        system = ProducerConsumerSystem(source=source, capacity=5, observer=collector)
+
+        system.run()
+
+        events = collector.events()
+        produced = [event.item for event in events if event.type is EventType.PRODUCED]
+        consumed = [event.item for event in events if event.type is EventType.CONSUMED]
+        self.assertEqual(produced, source)
+        self.assertEqual(consumed, source)
+        self.assertEqual(sum(event.type is EventType.QUEUE_CLOSED for event in events), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
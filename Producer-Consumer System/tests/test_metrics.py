@@ -0,0 +1,148 @@
+import unittest
+import tempfile
+import threading
+import time
+import sys
+import urllib.request
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from metrics import Histogram, QueueMetrics
+from priority_queues import PriorityBlockingQueue
+from producer_consumer_system import ProducerConsumerSystem
+from spsc_queue import SPSCQueue
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for Histogram"""
+
+    def test_buckets_and_percentiles(self):
+        """Test bucket counting and bucket-resolution percentiles"""
+        histogram = Histogram([1, 2, 4])
+        for value in [0.5, 1, 1.5, 3, 3, 10]:
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot.counts, (2, 1, 2, 1))
+        self.assertEqual(snapshot.count, 6)
+        self.assertEqual(snapshot.percentile(0.5), 2)
+        self.assertEqual(snapshot.percentile(1.0), 10)
+        self.assertAlmostEqual(snapshot.mean(), 19 / 6)
+
+    def test_invalid_bounds(self):
+        """Test that unsorted or empty bounds are rejected"""
+        with self.assertRaises(ValueError):
+            Histogram([2, 1])
+        with self.assertRaises(ValueError):
+            Histogram([])
+
+
+class TestQueueMetrics(unittest.TestCase):
+    """Test cases for QueueMetrics recorded by the queues"""
+
+    def test_queue_records_counts_occupancy_and_latency(self):
+        """Test that every put and get is counted, with one latency sample per item"""
+        metrics = QueueMetrics()
+        queue = BoundedBlockingQueue[int](capacity=10, metrics=metrics)
+        queue.put(1)
+        queue.put_many([2, 3, 4])
+        queue.get()
+        queue.get_many(10)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot.items_put, 4)
+        self.assertEqual(snapshot.items_got, 4)
+        self.assertEqual(snapshot.queue_size, 0)
+        self.assertEqual(snapshot.occupancy.count, 2)  # sampled at every get
+        self.assertEqual(snapshot.occupancy.max, 4)
+        self.assertEqual(snapshot.latency.count, 4)
+        self.assertGreater(snapshot.put_rate, 0)
+
+    def test_blocked_time_is_recorded(self):
+        """Test that time spent waiting on a full and on an empty queue is measured"""
+        metrics = QueueMetrics()
+        queue = BoundedBlockingQueue[int](capacity=1, metrics=metrics)
+        queue.put(1)
+
+        thread = threading.Thread(target=queue.put, args=(2,))
+        thread.start()
+        time.sleep(0.1)
+        queue.get()
+        thread.join(timeout=1.0)
+        queue.get()
+        with self.assertRaises(TimeoutError):
+            queue.get(timeout=0.05)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot.producer_blocked_count, 1)
+        self.assertGreaterEqual(snapshot.producer_blocked_seconds, 0.05)
+        self.assertEqual(snapshot.consumer_blocked_count, 1)
+        self.assertGreaterEqual(snapshot.consumer_blocked_seconds, 0.04)
+        self.assertGreaterEqual(snapshot.latency.max, 0.05)
+
+    def test_spsc_and_priority_queues_record_latency(self):
+        """Test that the other queue kinds record one latency sample per item as well"""
+        for queue_class in (SPSCQueue, PriorityBlockingQueue):
+            metrics = QueueMetrics()
+            queue = queue_class(capacity=4, metrics=metrics)
+            queue.put_many([3, 1, 2])
+            queue.get()
+            queue.get_many(5)
+
+            snapshot = metrics.snapshot()
+            self.assertEqual((snapshot.items_put, snapshot.items_got, snapshot.latency.count), (3, 3, 3), queue_class.__name__)
+
+    def test_system_records_metrics(self):
+        """Test that the system passes its metrics to the queue it creates"""
+        for num_consumers in (1, 3):
+            metrics = QueueMetrics()
+            system = ProducerConsumerSystem(source=range(100), capacity=4, num_consumers=num_consumers, metrics=metrics)
+            system.run()
+
+            snapshot = metrics.snapshot()
+            self.assertEqual(snapshot.items_put, 100)
+            self.assertEqual(snapshot.items_got, 100)
+            self.assertEqual(snapshot.latency.count, 100)
+            self.assertLessEqual(snapshot.occupancy.max, 4)
+
+    def test_prometheus_text(self):
+        """Test the Prometheus text exposition format"""
+        metrics = QueueMetrics(occupancy_buckets=[0, 1, 2], latency_buckets=[0.5])
+        queue = BoundedBlockingQueue[int](capacity=2, metrics=metrics)
+        queue.put_many([1, 2])
+        queue.get()
+
+        text = metrics.prometheus_text(prefix="pc", labels={"queue": "main"})
+        self.assertIn("# TYPE pc_items_put_total counter\n", text)
+        self.assertIn('pc_items_put_total{queue="main"} 2\n', text)
+        self.assertIn('pc_items_got_total{queue="main"} 1\n', text)
+        self.assertIn("# TYPE pc_queue_occupancy histogram\n", text)
+        self.assertIn('pc_queue_occupancy_bucket{queue="main",le="1"} 0\n', text)
+        self.assertIn('pc_queue_occupancy_bucket{queue="main",le="2"} 1\n', text)
+        self.assertIn('pc_item_latency_seconds_count{queue="main"} 1\n', text)
+
+    def test_prometheus_file_and_http_exporters(self):
+        """Test writing the metrics to a file and serving them over HTTP"""
+        metrics = QueueMetrics()
+        metrics.record_put(3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "queue.prom"
+            metrics.write_prometheus(str(path))
+            self.assertIn("producer_consumer_items_put_total 3\n", path.read_text())
+
+        server = metrics.serve_prometheus(port=0)
+        try:
+            host, port = server.server_address[:2]
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("producer_consumer_items_put_total 3\n", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
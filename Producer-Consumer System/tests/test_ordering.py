@@ -0,0 +1,194 @@
+import unittest
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue, QueueClosedError
+from ordering import ReorderBuffer, Sequenced
+from producer import Producer, SharedIterator
+from producer_consumer_system import ProducerConsumerSystem
+from retry import RetryPolicy
+from sinks import CallbackSink
+
+
+def jittery_square(x):
+    """Module level so it can be sent to worker processes; uneven service times shuffle the completion order"""
+    time.sleep(random.random() * 0.002)
+    return x * x
+
+
+def fail_on_multiples_of_ten(x):
+    if x % 10 == 0:
+        raise ValueError("poison")
+    return x
+
+
+class TestReorderBuffer(unittest.TestCase):
+    """Test cases for ReorderBuffer"""
+
+    def test_writes_items_in_sequence(self):
+        """Test that early items are held back until the gap before them is filled"""
+        destination = []
+        buffer = ReorderBuffer(destination, max_skew=10)
+
+        buffer.extend([(2, "c"), (1, "b")])
+        self.assertEqual((destination, buffer.pending(), buffer.next_seq), ([], 2, 0))
+        buffer.append((0, "a"))
+        self.assertEqual((destination, buffer.pending(), buffer.next_seq), (["a", "b", "c"], 0, 3))
+
+    def test_skip_releases_the_items_after_a_gap(self):
+        """Test that a skipped sequence number stops holding back later items"""
+        destination = []
+        buffer = ReorderBuffer(destination, max_skew=10)
+        buffer.extend([(0, "a"), (2, "c")])
+        buffer.skip(1)
+        self.assertEqual(destination, ["a", "c"])
+
+    def test_window_bounds_how_far_producers_run_ahead(self):
+        """Test that wait_for_window blocks until the oldest items are written"""
+        buffer = ReorderBuffer([], max_skew=3)
+        self.assertTrue(buffer.wait_for_window(2))
+        self.assertFalse(buffer.wait_for_window(3, timeout=0.05))
+
+        threading.Timer(0.05, buffer.append, args=((0, "a"),)).start()
+        self.assertTrue(buffer.wait_for_window(3, timeout=2.0))
+
+    def test_close_window_wakes_waiting_producers(self):
+        """Test that close_window raises QueueClosedError in waiting producers"""
+        buffer = ReorderBuffer([], max_skew=1)
+        threading.Timer(0.05, buffer.close_window).start()
+        with self.assertRaises(QueueClosedError):
+            buffer.wait_for_window(5)
+
+    def test_flush_reaches_the_destination(self):
+        """Test that flushing the buffer flushes a buffered destination"""
+        batches = []
+        buffer = ReorderBuffer(CallbackSink(batches.append, flush_every=100), max_skew=10)
+        buffer.extend([(1, "b"), (0, "a")])
+        self.assertEqual(batches, [])
+        buffer.flush()
+        self.assertEqual(batches, [["a", "b"]])
+
+    def test_invalid_max_skew(self):
+        """Test that at least one item must be allowed in flight"""
+        with self.assertRaises(ValueError):
+            ReorderBuffer([], max_skew=0)
+
+    def test_sequenced_keeps_the_sequence_number(self):
+        """Test the process_fn wrapper"""
+        self.assertEqual(Sequenced(str)((4, 2)), (4, "2"))
+
+
+class TestOrderedProducer(unittest.TestCase):
+    """Test cases for sequence tagging in Producer"""
+
+    def test_producer_tags_items(self):
+        """Test that an ordered producer queues (seq, item) pairs"""
+        queue = BoundedBlockingQueue[int](capacity=10)
+        buffer = ReorderBuffer([], max_skew=10)
+        producer = Producer(source="abc", queue=queue, sentinel=None, send_sentinel=False, reorder=buffer)
+        producer.start()
+        producer.join(timeout=2.0)
+        self.assertEqual(queue.get_many(10), [(0, "a"), (1, "b"), (2, "c")])
+
+    def test_shared_numbered_source_is_numbered_once(self):
+        """Test that producers sharing a numbered iterator hand out one sequence"""
+        queue = BoundedBlockingQueue[int](capacity=100)
+        buffer = ReorderBuffer([], max_skew=100)
+        source = SharedIterator(range(50), numbered=True)
+        producers = [Producer(source=source, queue=queue, sentinel=None, batch_size=4, send_sentinel=False, reorder=buffer) for _ in range(3)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join(timeout=2.0)
+        self.assertEqual(sorted(queue.get_many(100)), [(i, i) for i in range(50)])
+
+    def test_producer_waits_for_the_window(self):
+        """Test that a producer stops max_skew items ahead of the reorder buffer"""
+        queue = BoundedBlockingQueue[int](capacity=100)
+        buffer = ReorderBuffer([], max_skew=5)
+        producer = Producer(source=range(20), queue=queue, sentinel=None, send_sentinel=False, reorder=buffer)
+        producer.start()
+        time.sleep(0.05)
+        self.assertEqual(queue.size(), 5)
+
+        buffer.extend(queue.get_many(2))
+        time.sleep(0.05)
+        self.assertEqual(queue.size(), 5)
+        buffer.close_window()
+        producer.join(timeout=2.0)
+        self.assertFalse(producer.is_alive())
+
+    def test_batch_larger_than_window(self):
+        """Test that a batch has to fit into the window"""
+        with self.assertRaises(ValueError):
+            Producer(source=[], queue=BoundedBlockingQueue[int](capacity=10), sentinel=None, batch_size=8, reorder=ReorderBuffer([], max_skew=4))
+
+
+class TestOrderedSystem(unittest.TestCase):
+    """Test cases for ordered mode in ProducerConsumerSystem"""
+
+    def test_thread_consumers_keep_input_order(self):
+        """Test input order with several producers, consumers and batch sizes"""
+        for batch_size in (1, 8):
+            system = ProducerConsumerSystem(source=range(400), capacity=16, num_producers=2, num_consumers=4, batch_size=batch_size,
+                                            process_fn=jittery_square, ordered=True, max_skew=32)
+            system.run(timeout=30.0)
+            self.assertEqual(system._destination_data, [x * x for x in range(400)])
+            self.assertEqual(system._reorder.pending(), 0)
+
+    def test_process_consumers_keep_input_order(self):
+        """Test ordered mode in process mode"""
+        system = ProducerConsumerSystem(source=range(200), capacity=16, num_consumers=2, batch_size=4, process_fn=jittery_square,
+                                        consumer_mode="process", ordered=True, max_skew=64)
+        system.run(timeout=30.0)
+        self.assertEqual(system._destination_data, [x * x for x in range(200)])
+
+    def test_retries_and_dead_letters_keep_order(self):
+        """Test that retried items keep their place and dead-lettered ones do not hold back the rest"""
+        dead = []
+        system = ProducerConsumerSystem(source=range(100), capacity=8, num_consumers=3, process_fn=fail_on_multiples_of_ten, ordered=True,
+                                        max_skew=16, retry=RetryPolicy(max_attempts=2, initial_backoff=0.001), dead_letter=dead)
+        system.run(timeout=30.0)
+        self.assertEqual(system._destination_data, [x for x in range(100) if x % 10])
+        self.assertEqual(sorted(letter.item for letter in dead), list(range(0, 100, 10)))
+
+    def test_without_process_fn_items_pass_through_in_order(self):
+        """Test that the sequence numbers are removed again when nothing is processed"""
+        system = ProducerConsumerSystem(source=range(300), capacity=4, num_consumers=3, batch_size=2, ordered=True, max_skew=8)
+        system.run(timeout=30.0)
+        self.assertEqual(system._destination_data, list(range(300)))
+
+    def test_batched_producers_sharing_the_window(self):
+        """Test that several batched producers filling the whole window between them do not wait on each other"""
+        def slow_source():
+            for i in range(400):
+                sum(range(20_000)) # CPU-bound, so the producers take their items in turns
+                yield i
+
+        for _ in range(2):
+            system = ProducerConsumerSystem(source=slow_source(), capacity=64, num_producers=4, num_consumers=2, batch_size=8,
+                                            ordered=True, max_skew=8)
+            system.run(timeout=10.0)
+            self.assertEqual(system._destination_data, list(range(400)))
+
+    def test_shared_numbered_source_hands_out_consecutive_batches(self):
+        """Test that next_batch numbers a batch in one go"""
+        source = SharedIterator("abcde", numbered=True)
+        self.assertEqual(source.next_batch(3), [(0, "a"), (1, "b"), (2, "c")])
+        self.assertEqual(next(source), (3, "d"))
+        self.assertEqual(source.next_batch(3), [(4, "e")])
+        self.assertEqual(source.next_batch(3), [])
+
+    def test_batch_size_larger_than_max_skew(self):
+        """Test that the system checks the batch size against the window"""
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=range(3), batch_size=16, ordered=True, max_skew=8)
+
+
+if __name__ == "__main__":
+    unittest.main()
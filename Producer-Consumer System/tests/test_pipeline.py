@@ -0,0 +1,180 @@
+import unittest
+import asyncio
+import threading
+import time
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from pipeline import Chain, Pipeline, StageError
+from retry import ProcessingStats, RetryPolicy
+from sinks import ListSink
+
+
+def square(x):
+    """Module level so it can be sent to worker processes"""
+    return x * x
+
+
+def increment(x):
+    """Module level so it can be sent to worker processes"""
+    return x + 1
+
+
+def fail_on_tens(x):
+    """Module level so it can be sent to worker processes"""
+    if x % 10 == 0:
+        raise ValueError(x)
+    return x
+
+
+class TestPipeline(unittest.TestCase):
+    """Test cases for Pipeline"""
+
+    def test_thread_stages(self):
+        """Test that every item passes every stage exactly once"""
+        results = Pipeline(range(200), capacity=4).stage(square, workers=3).stage(increment, workers=2, batch_size=8).run(timeout=10.0)
+        self.assertEqual(sorted(results), sorted(x * x + 1 for x in range(200)))
+
+    def test_fused_stages(self):
+        """Test that fused stages share the previous stage's workers and queue"""
+        pipeline = Pipeline(range(50)).stage(square, workers=2).stage(increment, fuse=True).stage(str, fuse=True)
+        self.assertEqual(len(pipeline.stages), 1)
+        self.assertEqual(sorted(pipeline.run(timeout=10.0)), sorted(str(x * x + 1) for x in range(50)))
+        self.assertEqual(Chain([square, increment])(3), 10)
+
+    def test_process_stage(self):
+        """Test a stage running in worker processes between thread stages, with a fused picklable chain"""
+        pipeline = (Pipeline(range(100), capacity=8)
+                    .stage(increment)
+                    .stage(square, mode="process", workers=2, batch_size=10)
+                    .stage(increment, fuse=True)
+                    .stage(str))
+        self.assertEqual(sorted(pipeline.run(timeout=30.0), key=int), [str((x + 1) ** 2 + 1) for x in range(100)])
+
+    def test_async_stage_overlaps_waits(self):
+        """Test that an async stage keeps up to `workers` coroutines in flight, mixed with sync functions"""
+        async def fetch(x):
+            await asyncio.sleep(0.05)
+            return x
+
+        started = time.monotonic()
+        results = Pipeline(range(100)).stage(fetch, mode="async", workers=50).stage(square, fuse=True).run(timeout=10.0)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(sorted(results), [x * x for x in range(100)])
+        self.assertLess(elapsed, 1.0)  # 100 sequential sleeps would take 5 s
+
+    def test_backpressure_reaches_the_source(self):
+        """Test that a slow last stage stops the source from running ahead of it"""
+        pulled = []
+        done = []
+        lead = []
+
+        def source():
+            for i in range(60):
+                pulled.append(i)
+                lead.append(len(pulled) - len(done))
+                yield i
+
+        def slow(x):
+            time.sleep(0.002)
+            done.append(x)
+            return x
+
+        Pipeline(source(), capacity=2).stage(increment).stage(slow).run(timeout=10.0)
+        # two queues of 2, an item in each stage's hands and one waiting in the source thread
+        self.assertLessEqual(max(lead), 7)
+
+    def test_sink_is_flushed(self):
+        """Test that the last stage writes to a sink"""
+        sink = ListSink()
+        result = Pipeline(range(10), sink=sink).stage(square, batch_size=4).run(timeout=10.0)
+        self.assertIs(result, sink)
+        self.assertEqual(sorted(sink.items), [x * x for x in range(10)])
+
+    def test_timeout_closes_every_queue(self):
+        """Test that a stuck stage makes run raise TimeoutError and releases the stages before it"""
+        release = threading.Event()
+
+        def stuck(x):
+            release.wait(5.0)
+            return x
+
+        pipeline = Pipeline(range(100), capacity=2).stage(increment, name="parse").stage(stuck, name="write")
+        with self.assertRaises(TimeoutError):
+            pipeline.run(timeout=0.2)
+        release.set()
+
+    def test_async_stage_survives_failures(self):
+        """Test that failing calls in an async stage are dead-lettered instead of stopping the stage"""
+        async def bad(x):
+            return fail_on_tens(x)
+
+        dead_letters = []
+        pipeline = Pipeline(range(1000), capacity=4).stage(increment).stage(bad, mode="async", workers=2, dead_letter=dead_letters)
+        results = pipeline.run(timeout=10.0)
+        self.assertEqual(sorted(results), [x + 1 for x in range(1000) if (x + 1) % 10])
+        self.assertEqual(sorted(record.item for record in dead_letters), list(range(10, 1001, 10)))
+        self.assertEqual(pipeline.processing_stats()["Stage1"], ProcessingStats(900, 100, 0, 100))
+
+    def test_async_stage_retries(self):
+        """Test that an async stage retries failed items under the stage's policy"""
+        calls = {}
+
+        async def flaky(x):
+            calls[x] = calls.get(x, 0) + 1
+            if calls[x] < 3:
+                raise ConnectionError(x)
+            return x
+
+        retry = RetryPolicy(max_attempts=3, initial_backoff=0.001)
+        pipeline = Pipeline(range(50)).stage(flaky, mode="async", workers=8, retry=retry)
+        self.assertEqual(sorted(pipeline.run(timeout=10.0)), list(range(50)))
+        self.assertEqual(pipeline.processing_stats()["Stage0"], ProcessingStats(50, 100, 100, 0))
+
+    def test_failed_items_without_dead_letter_raise(self):
+        """Test that run raises StageError when a stage without a dead-letter destination gave up on items"""
+        for mode in ("thread", "async"):
+            pipeline = Pipeline(range(100)).stage(fail_on_tens, mode=mode, name="check")
+            with self.assertRaises(StageError) as raised:
+                pipeline.run(timeout=10.0)
+            self.assertEqual(raised.exception.stage, "check")
+            self.assertEqual(len(raised.exception.dead_letters), 10)
+            self.assertIsInstance(raised.exception.__cause__, ValueError)
+
+    def test_process_stage_dead_letters(self):
+        """Test that a process stage writes failed items to its dead-letter destination"""
+        dead_letters = ListSink()
+        pipeline = Pipeline(range(100)).stage(fail_on_tens, mode="process", workers=2, batch_size=8, dead_letter=dead_letters)
+        self.assertEqual(sorted(pipeline.run(timeout=30.0)), [x for x in range(100) if x % 10])
+        self.assertEqual(sorted(record.item for record in dead_letters.items), list(range(0, 100, 10)))
+
+    def test_broken_stage_stops_the_stages_before_it(self):
+        """Test that a stage whose worker breaks down stops the whole pipeline and run raises its error"""
+        class BrokenSink(ListSink):
+            def append(self, item):
+                raise OSError("disk full")
+
+        for mode in ("thread", "async"):
+            pipeline = Pipeline(range(1000), capacity=4, sink=BrokenSink()).stage(increment, mode=mode).stage(square, mode="async")
+            with self.assertRaises(OSError):
+                pipeline.run(timeout=10.0)
+
+    def test_invalid_stages(self):
+        """Test that bad stage settings are rejected"""
+        with self.assertRaises(ValueError):
+            Pipeline(range(3)).stage(square, fuse=True)
+        with self.assertRaises(ValueError):
+            Pipeline(range(3)).stage(square, mode="fiber")
+        with self.assertRaises(ValueError):
+            Pipeline(range(3)).stage(square, workers=0)
+        with self.assertRaises(ValueError):
+            Pipeline(range(3)).stage(square, retry=RetryPolicy(max_attempts=0))
+        with self.assertRaises(ValueError):
+            Pipeline(range(3)).run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+import threading
+import time
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from autoscaler import AutoscalePolicy, Autoscaler, ScalingAction
+from bounded_blocking_queue import QueueClosedError
+from metrics import QueueMetrics
+from priority_queues import PriorityBlockingQueue, WeightedFairQueue
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def lane_of(item):
+    return item[0]
+
+
+class TestPriorityBlockingQueue(unittest.TestCase):
+    """Test cases for PriorityBlockingQueue"""
+
+    def test_lowest_key_first_and_fifo_for_ties(self):
+        """Test that items come out by priority, in insertion order within one priority"""
+        queue = PriorityBlockingQueue(capacity=10, key=lambda item: item[0])
+        for item in [(2, "a"), (1, "b"), (2, "c"), (0, "d"), (1, "e")]:
+            queue.put(item)
+
+        self.assertEqual([queue.get()[1] for _ in range(5)], ["d", "b", "e", "a", "c"])
+
+    def test_batches_respect_capacity(self):
+        """Test that put_many stops at capacity and get_many hands out the most urgent items"""
+        queue = PriorityBlockingQueue[int](capacity=3)
+        self.assertEqual(queue.put_many([5, 3, 4, 1], timeout=0.05), 3)
+        self.assertFalse(queue.try_put(1))
+        self.assertEqual(queue.get_many(2), [3, 4])
+        self.assertEqual(queue.size(), 1)
+
+    def test_blocked_producer_is_woken(self):
+        """Test that a producer blocked on a full queue continues once an item is taken"""
+        queue = PriorityBlockingQueue[int](capacity=1)
+        queue.put(2)
+
+        thread = threading.Thread(target=queue.put, args=(1,))
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(queue.get(), 2)
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(queue.get(), 1)
+
+    def test_system_with_priority_queue(self):
+        """Test that ProducerConsumerSystem works with an injected priority queue"""
+        source = [(i % 3, i) for i in range(60)]
+        queue = PriorityBlockingQueue(capacity=4, key=lambda item: item[0])
+        system = ProducerConsumerSystem(source=source, queue=queue, num_consumers=2)
+
+        system.run()
+
+        self.assertEqual(sorted(system._destination_data, key=lambda item: item[1]), source)
+        self.assertIs(system._queue, queue)
+
+
+class TestWeightedFairQueue(unittest.TestCase):
+    """Test cases for WeightedFairQueue"""
+
+    def test_invalid_lanes(self):
+        """Test that empty lanes, bad weights and mismatched capacities are rejected"""
+        with self.assertRaises(ValueError):
+            WeightedFairQueue(weights={}, lane_of=lane_of, lane_capacity=1)
+        with self.assertRaises(ValueError):
+            WeightedFairQueue(weights={"a": 0}, lane_of=lane_of, lane_capacity=1)
+        with self.assertRaises(ValueError):
+            WeightedFairQueue(weights={"a": 1}, lane_of=lane_of, lane_capacity={"b": 1})
+
+        queue = WeightedFairQueue(weights={"a": 1}, lane_of=lane_of, lane_capacity=1)
+        with self.assertRaises(ValueError):
+            queue.put(("b", 1))
+
+    def test_lanes_are_served_by_weight(self):
+        """Test smooth weighted round-robin between backlogged lanes"""
+        queue = WeightedFairQueue(weights={"urgent": 3, "bulk": 1}, lane_of=lane_of, lane_capacity=10)
+        queue.put_many([("bulk", i) for i in range(6)])
+        queue.put_many([("urgent", i) for i in range(6)])
+
+        lanes = [item[0] for item in queue.get_many(8)]
+        self.assertEqual(lanes, ["urgent", "urgent", "bulk", "urgent"] * 2)
+        # once the urgent lane is empty, bulk gets everything
+        self.assertEqual([item[0] for item in queue.get_many(4)], ["bulk"] * 4)
+
+    def test_full_lane_only_blocks_its_own_producers(self):
+        """Test per-lane capacities: a full bulk lane does not stop urgent items"""
+        queue = WeightedFairQueue(weights={"urgent": 1, "bulk": 1}, lane_of=lane_of, lane_capacity={"urgent": 2, "bulk": 1})
+        queue.put(("bulk", 0))
+        self.assertFalse(queue.try_put(("bulk", 1)))
+        self.assertTrue(queue.try_put(("urgent", 0)))
+        self.assertEqual(queue.lane_size("urgent"), 1)
+        self.assertEqual(queue.size(), 2)
+
+    def test_taking_an_item_wakes_a_producer_of_that_lane(self):
+        """Test that a slot freed in one lane wakes the producer blocked on that lane"""
+        queue = WeightedFairQueue(weights={"urgent": 1, "bulk": 1}, lane_of=lane_of, lane_capacity=1)
+        queue.put(("urgent", 0))
+        queue.put(("bulk", 0))
+
+        threads = [threading.Thread(target=queue.put, args=((lane, 1),)) for lane in ("urgent", "bulk")]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        queue.get_many(2)
+        for thread in threads:
+            thread.join(timeout=1.0)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(sorted(queue.get_many(2)), [("bulk", 1), ("urgent", 1)])
+
+    def test_batch_passes_the_turn_on_within_its_lane(self):
+        """Test that a batch leaving room in its lane wakes that lane's producers, not the unused shared condition"""
+        queue = WeightedFairQueue(weights={"urgent": 1, "bulk": 1}, lane_of=lane_of, lane_capacity={"urgent": 4, "bulk": 1})
+        with patch.object(queue._not_full, "notify") as shared, patch.object(queue._lane_not_full["urgent"], "notify") as urgent, \
+                patch.object(queue._lane_not_full["bulk"], "notify") as bulk:
+            queue.put_many([("urgent", 0), ("urgent", 1), ("bulk", 0)])
+        shared.assert_not_called()
+        urgent.assert_called_once_with()
+        bulk.assert_not_called() # the bulk lane is full
+
+    def test_close_wakes_blocked_lane_producer(self):
+        """Test that close wakes producers waiting on a lane"""
+        queue = WeightedFairQueue(weights={"a": 1}, lane_of=lane_of, lane_capacity=1)
+        queue.put(("a", 0))
+        errors = []
+
+        def put_item():
+            try:
+                queue.put(("a", 1))
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=put_item)
+        thread.start()
+        time.sleep(0.05)
+        queue.close()
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_set_capacity_scales_lanes_in_proportion(self):
+        """Test that resizing splits the total capacity over the lanes like the initial lane capacities"""
+        queue = WeightedFairQueue(weights={"urgent": 3, "bulk": 1}, lane_of=lane_of, lane_capacity={"urgent": 6, "bulk": 2})
+        for capacity, urgent, bulk in ((16, 12, 4), (4, 3, 1), (9, 7, 2), (1, 1, 1)):
+            queue.set_capacity(capacity)
+            self.assertEqual((queue.lane_capacity("urgent"), queue.lane_capacity("bulk")), (urgent, bulk))
+            self.assertEqual(queue.capacity, urgent + bulk)
+        with self.assertRaises(ValueError):
+            queue.set_capacity(0)
+
+    def test_growing_wakes_blocked_lane_producer(self):
+        """Test that growing the capacity lets a producer blocked on a full lane go on"""
+        queue = WeightedFairQueue(weights={"a": 1, "b": 1}, lane_of=lane_of, lane_capacity=1)
+        queue.put(("a", 0))
+        thread = threading.Thread(target=queue.put, args=(("a", 1),))
+        thread.start()
+        time.sleep(0.05)
+        queue.set_capacity(4)
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(queue.lane_size("a"), 2)
+
+    def test_autoscaler_resizes_weighted_fair_queue(self):
+        """Test that an autoscaler can drive a weighted-fair queue"""
+        metrics = QueueMetrics()
+        queue = WeightedFairQueue(weights={"urgent": 3, "bulk": 1}, lane_of=lane_of, lane_capacity={"urgent": 3, "bulk": 1},
+                                  metrics=metrics)
+        queue.put_many([("urgent", 0), ("urgent", 1), ("urgent", 2), ("bulk", 0)])
+        autoscaler = Autoscaler(queue=queue, metrics=metrics, policy=AutoscalePolicy(min_capacity=4, max_capacity=8, scale_up_after=1),
+                                consumers=1, start_consumer=lambda: None, retire_consumer=lambda: None)
+
+        self.assertEqual(autoscaler.tick(), ScalingAction(consumers=2, capacity=8, reason="pressure"))
+        self.assertEqual((queue.lane_capacity("urgent"), queue.lane_capacity("bulk")), (6, 2))
+
+    def test_system_with_weighted_fair_queue(self):
+        """Test that ProducerConsumerSystem works with an injected weighted-fair queue"""
+        source = [("urgent" if i % 4 == 0 else "bulk", i) for i in range(80)]
+        queue = WeightedFairQueue(weights={"urgent": 4, "bulk": 1}, lane_of=lane_of, lane_capacity=3)
+        system = ProducerConsumerSystem(source=source, queue=queue, batch_size=4, num_producers=2, num_consumers=2)
+
+        system.run()
+
+        self.assertEqual(sorted(system._destination_data, key=lambda item: item[1]), source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import time
+import unittest
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from process_consumer import ProcessPoolConsumer
+from producer import Producer
+from producer_consumer_system import ProducerConsumerSystem
+
+
+def square(x):
+    """Module level so it can be sent to worker processes"""
+    return x * x
+
+
+def die(x):
+    """Ends the worker process, which breaks the pool"""
+    os._exit(1)
+
+
+def slow_square(x):
+    time.sleep(0.2)
+    return x * x
+
+
+class BrokenExecutor(Executor):
+    """An executor whose pool has already died"""
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("a worker process died")
+
+
+class TestProcessPoolConsumer(unittest.TestCase):
+    """Test cases for ProcessPoolConsumer"""
+
+    def test_results_are_in_input_order(self):
+        """Test that results reach the destination in queue order"""
+        queue = BoundedBlockingQueue[int](capacity=50)
+        destination = []
+        sentinel = object()
+
+        queue.put_many(list(range(20)))
+        queue.put(sentinel)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            consumer = ProcessPoolConsumer(queue=queue, destination=destination, sentinel=sentinel, process_fn=square,
+                                           executor=executor, batch_size=3, max_pending=4)
+            consumer.start()
+            consumer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(destination, [square(x) for x in range(20)])
+
+    def test_invalid_max_pending(self):
+        """Test that at least one batch must be allowed in flight"""
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            with self.assertRaises(ValueError):
+                ProcessPoolConsumer(queue=BoundedBlockingQueue[int](capacity=1), destination=[], sentinel=object(),
+                                    process_fn=square, executor=executor, max_pending=0)
+
+    def test_system_in_process_mode(self):
+        """Test that the process mode runs process_fn in worker processes and keeps input order"""
+        source = list(range(200))
+        system = ProducerConsumerSystem(source=source, capacity=8, batch_size=10, num_consumers=2,
+                                        process_fn=square, consumer_mode="process")
+
+        system.run()
+
+        self.assertEqual(system._destination_data, [square(x) for x in source])
+        self.assertEqual(system.queue_size(), 0)
+
+    def test_broken_pool_closes_the_queue(self):
+        """Test that a pool refusing work stops the dispatcher and unblocks the producer instead of leaving it stuck"""
+        queue = BoundedBlockingQueue[int](capacity=2)
+        sentinel = object()
+        producer = Producer(source=range(100), queue=queue, sentinel=sentinel, send_sentinel=False)
+        consumer = ProcessPoolConsumer(queue=queue, destination=[], sentinel=sentinel, process_fn=square,
+                                       executor=BrokenExecutor())
+        producer.start()
+        consumer.start()
+        consumer.join(timeout=3.0)
+        producer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertFalse(producer.is_alive())
+        self.assertTrue(queue.closed)
+        self.assertIsInstance(consumer.error, BrokenProcessPool)
+
+    def test_system_raises_when_a_worker_dies(self):
+        """Test that run() raises BrokenProcessPool instead of hanging when a worker process dies"""
+        system = ProducerConsumerSystem(source=range(1000), capacity=4, process_fn=die, consumer_mode="process")
+
+        with self.assertRaises(BrokenProcessPool):
+            system.run(timeout=30)
+
+    def test_system_creates_pool_in_run_and_always_shuts_it_down(self):
+        """Test that no pool exists before run() and that a run ending in an error still shuts it down"""
+        system = ProducerConsumerSystem(source=range(100), capacity=4, process_fn=slow_square, consumer_mode="process")
+        self.assertIsNone(system._executor)
+
+        with self.assertRaises(TimeoutError):
+            system.run(timeout=0.3)
+
+        self.assertTrue(system._executor._shutdown_thread)
+        system._consumers[0].join(timeout=5.0)
+        self.assertFalse(system._consumers[0].is_alive())
+
+    def test_system_process_mode_requires_function(self):
+        """Test that the process mode rejects a missing process_fn"""
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=[1], consumer_mode="process")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from bounded_blocking_queue import BoundedBlockingQueue
-from producer import Producer
+from producer import Producer, SharedIterator
 
 
 class TestProducer(unittest.TestCase):
@@ -114,6 +114,46 @@ class TestProducer(unittest.TestCase):
         producer.join(timeout=3.0)
         self.assertFalse(producer.is_alive(), "Producer thread did not complete")
 
+    def test_producer_with_batch_size(self):
+        """Test that a batching producer puts all items in order followed by the sentinel"""
+        queue = BoundedBlockingQueue[int](capacity=20)
+        sentinel = object()
+        source = list(range(10))
+
+        producer = Producer(source=source, queue=queue, sentinel=sentinel, delay_seconds=0.0, batch_size=4)
+        producer.start()
+        producer.join(timeout=2.0)
+
+        self.assertEqual(queue.get_many(20), source + [sentinel])
+
+    def test_producer_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected"""
+        with self.assertRaises(ValueError):
+            Producer(source=[], queue=BoundedBlockingQueue[int](capacity=1), sentinel=object(), batch_size=0)
+
+    def test_producers_share_one_source(self):
+        """Test that producers drawing from a SharedIterator produce each item exactly once"""
+        queue = BoundedBlockingQueue[int](capacity=1000)
+        sentinel = object()
+        source = SharedIterator(range(300))
+
+        producers = [Producer(source=source, queue=queue, sentinel=sentinel, send_sentinel=False) for _ in range(3)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join(timeout=2.0)
+
+        self.assertEqual(sorted(queue.get_many(1000)), list(range(300)))
+
+    def test_producer_without_sentinel(self):
+        """Test that send_sentinel=False leaves the sentinel to the caller"""
+        queue = BoundedBlockingQueue[int](capacity=5)
+        producer = Producer(source=[1, 2], queue=queue, sentinel=object(), send_sentinel=False)
+        producer.start()
+        producer.join(timeout=1.0)
+
+        self.assertEqual(queue.get_many(5), [1, 2])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,14 @@
 import unittest
+import threading
 import time
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
 from producer_consumer_system import ProducerConsumerSystem
+from spsc_queue import SPSCQueue
 
 
 class TestProducerConsumerSystem(unittest.TestCase):
@@ -146,6 +149,124 @@ class TestProducerConsumerSystem(unittest.TestCase):
         self.assertEqual(set(destination), set(range(10)))
         self.assertEqual(len(destination), 10)
 
+    def test_system_with_batch_size(self):
+        """Test that the system moves items in batches without losing any"""
+        source = list(range(100))
+        system = ProducerConsumerSystem(source=source, capacity=8, producer_delay=0.0, consumer_delay=0.0, batch_size=5)
+
+        system.run()
+
+        self.assertEqual(list(system._destination_data), source)
+        self.assertEqual(system.queue_size(), 0)
+
+    def test_system_with_multiple_producers_and_consumers(self):
+        """Test that a worker pool neither loses nor duplicates items"""
+        source = list(range(500))
+        system = ProducerConsumerSystem(source=source, capacity=4, num_producers=3, num_consumers=4)
+
+        system.run()
+
+        self.assertEqual(sorted(system._destination_data), source)
+        self.assertEqual(system.queue_size(), 0)
+        for thread in system._producers + system._consumers:
+            self.assertFalse(thread.is_alive())
+
+    def test_system_with_batched_worker_pool(self):
+        """Test that batching consumers in a pool all stop, even when one batch holds several sentinels"""
+        source = list(range(200))
+        system = ProducerConsumerSystem(source=source, capacity=16, batch_size=8, num_producers=2, num_consumers=3)
+
+        system.run()
+
+        self.assertEqual(sorted(system._destination_data), source)
+        self.assertEqual(system.queue_size(), 0)
+
+    def test_system_selects_spsc_queue_for_one_producer_and_one_consumer(self):
+        """Test that the ring buffer fast path is used only when each side has a single thread"""
+        self.assertIsInstance(ProducerConsumerSystem(source=[1])._queue, SPSCQueue)
+        self.assertIsInstance(ProducerConsumerSystem(source=[1], num_consumers=2)._queue, BoundedBlockingQueue)
+        self.assertIsInstance(ProducerConsumerSystem(source=[1], num_producers=2)._queue, BoundedBlockingQueue)
+
+    def test_system_invalid_worker_counts(self):
+        """Test that empty worker pools are rejected"""
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=[1], num_producers=0)
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=[1], num_consumers=0)
+
+    def test_system_applies_process_fn(self):
+        """Test that thread consumers apply process_fn to every item"""
+        system = ProducerConsumerSystem(source=[1, 2, 3], process_fn=lambda x: x * 10)
+
+        system.run()
+
+        self.assertEqual(system._destination_data, [10, 20, 30])
+
+    def test_system_invalid_consumer_mode(self):
+        """Test that an unknown consumer mode is rejected"""
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=[1], consumer_mode="fiber")
+
+    def test_system_with_generator_source(self):
+        """Test that a generator source is consumed completely"""
+        source = (i * 2 for i in range(1000))
+        system = ProducerConsumerSystem(source=source, capacity=5)
+
+        system.run()
+
+        self.assertEqual(list(system._destination_data), [i * 2 for i in range(1000)])
+
+    def test_system_reads_source_lazily(self):
+        """Test that the producer only runs ahead of the consumer by the queue capacity"""
+        capacity = 3
+        pulled = []
+        pulled_when_consuming = []
+
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        def record(item):
+            pulled_when_consuming.append(len(pulled))
+            return item
+
+        system = ProducerConsumerSystem(source=source(), capacity=capacity, process_fn=record)
+        system.run()
+
+        self.assertEqual(list(system._destination_data), list(range(100)))
+        # capacity items queued, plus the one taken by the consumer and one the producer is blocked on
+        self.assertLessEqual(pulled_when_consuming[0], capacity + 2)
+
+    def test_system_run_timeout_with_stuck_consumer(self):
+        """Test that run(timeout=) returns with TimeoutError instead of hanging on a stuck consumer"""
+        release = threading.Event()
+
+        def stuck(item):
+            release.wait()
+            return item
+
+        system = ProducerConsumerSystem(source=range(10), capacity=2, process_fn=stuck)
+
+        start_time = time.time()
+        with self.assertRaises(TimeoutError):
+            system.run(timeout=0.2)
+        self.assertLess(time.time() - start_time, 1.0)
+
+        # once unstuck, the consumer drains the closed queue and stops
+        release.set()
+        for thread in system._producers + system._consumers:
+            thread.join(timeout=2.0)
+            self.assertFalse(thread.is_alive())
+
+    def test_system_run_within_timeout(self):
+        """Test that a run finishing before the deadline behaves like run()"""
+        system = ProducerConsumerSystem(source=range(20), capacity=3)
+
+        system.run(timeout=5.0)
+
+        self.assertEqual(list(system._destination_data), list(range(20)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from producer import Producer, SharedIterator
+from producer_consumer_system import ProducerConsumerSystem
+from rate_limiter import LeakyBucket, RateLimiter, TokenBucket
+
+RATE = 100_000 # items/sec targets, checked against a fake clock
+ITEMS = 50_000 # half a second at RATE
+GRANULARITY = 0.0005 # the limiters' default
+
+# wall-clock checks run at lower rates and allow for the scheduler
+WALL_RATE = 10_000
+WALL_ITEMS = 2_000
+WALL_TOLERANCE = 0.25
+
+
+class FakeClock:
+    """Clock for the limiters that only moves when they sleep, so rates can be checked exactly"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TimedLeakyBucket(LeakyBucket):
+    """LeakyBucket that records when it was first acquired, so wall-clock rates are timed from there"""
+
+    first_acquire = None
+
+    def acquire(self, count=1, timeout=None):
+        if self.first_acquire is None:
+            self.first_acquire = time.monotonic()
+        return super().acquire(count, timeout)
+
+
+class TestRateLimiters(unittest.TestCase):
+    """Test cases for TokenBucket and LeakyBucket"""
+
+    def test_token_bucket_single_items_at_100k(self):
+        """Test the achieved rate when taking one token at a time, and that short waits are slept off together"""
+        clock = FakeClock()
+        limiter = TokenBucket(RATE, burst=100, clock=clock, sleep=clock.sleep)
+        for _ in range(ITEMS):
+            limiter.acquire()
+        # the first 100 items are the burst, the lead of the unslept waits is below the granularity
+        self.assertAlmostEqual(clock.now, (ITEMS - 100) / RATE, delta=GRANULARITY)
+        self.assertTrue(all(seconds >= GRANULARITY for seconds in clock.sleeps))
+        self.assertLessEqual(len(clock.sleeps), clock.now / GRANULARITY)
+
+    def test_leaky_bucket_batches_at_100k(self):
+        """Test the achieved rate when taking a batch at a time"""
+        clock = FakeClock()
+        limiter = LeakyBucket(RATE, clock=clock, sleep=clock.sleep)
+        for _ in range(ITEMS // 100):
+            limiter.acquire(100)
+        # the first batch leaves at once, every later one after its predecessor's 100 items
+        self.assertAlmostEqual(clock.now, (ITEMS - 100) / RATE, places=9)
+        self.assertEqual(len(clock.sleeps), ITEMS // 100 - 1)
+
+    def test_wall_clock_rate(self):
+        """Test the achieved rate against the real clock, timed from the first acquire"""
+        limiter = TimedLeakyBucket(WALL_RATE)
+        for _ in range(WALL_ITEMS // 10):
+            limiter.acquire(10)
+        achieved = (WALL_ITEMS - 10) / (time.monotonic() - limiter.first_acquire)
+        self.assertLess(abs(achieved - WALL_RATE) / WALL_RATE, WALL_TOLERANCE, f"{achieved:,.0f} items/sec")
+
+    def test_burst_goes_at_once_then_rate_applies(self):
+        """Test that a full bucket lets `burst` items through without waiting"""
+        clock = FakeClock()
+        limiter = TokenBucket(rate=1000, burst=50, clock=clock, sleep=clock.sleep)
+        self.assertTrue(all(limiter.try_acquire() for _ in range(50)))
+        self.assertFalse(limiter.try_acquire())
+        self.assertEqual(clock.now, 0.0)
+
+        self.assertTrue(limiter.acquire(20))
+        self.assertAlmostEqual(clock.now, 0.02)
+
+    def test_leaky_bucket_does_not_burst(self):
+        """Test that a leaky bucket spaces items evenly even after a quiet period"""
+        clock = FakeClock()
+        limiter = LeakyBucket(rate=1000, tolerance=0, clock=clock, sleep=clock.sleep)
+        clock.now = 0.05
+        self.assertTrue(limiter.try_acquire(5))
+        self.assertFalse(limiter.try_acquire())
+        self.assertFalse(limiter.acquire(timeout=0.001))
+        self.assertTrue(limiter.acquire(timeout=0.01))
+        self.assertAlmostEqual(clock.now, 0.055)
+
+    def test_batch_larger_than_burst(self):
+        """Test that a batch above the burst size waits for its tokens instead of failing"""
+        clock = FakeClock()
+        limiter = TokenBucket(rate=1000, burst=10, clock=clock, sleep=clock.sleep)
+        self.assertTrue(limiter.acquire(40))
+        self.assertAlmostEqual(clock.now, 0.03)
+
+    def test_invalid_arguments(self):
+        """Test argument validation"""
+        for make in (lambda: TokenBucket(0), lambda: TokenBucket(10, burst=-1), lambda: LeakyBucket(10, tolerance=-1),
+                     lambda: TokenBucket(10, granularity=-1)):
+            with self.assertRaises(ValueError):
+                make()
+        with self.assertRaises(ValueError):
+            TokenBucket(10).acquire(0)
+
+    def test_limiter_must_implement_reserve(self):
+        """Test that RateLimiter is abstract"""
+        with self.assertRaises(TypeError):
+            RateLimiter(10)
+
+
+class TestRateLimitedProducers(unittest.TestCase):
+    """Test cases for rate-limited producers"""
+
+    def test_producer_at_100k(self):
+        """Test a batched producer paced by a token bucket"""
+        clock = FakeClock()
+        queue = BoundedBlockingQueue[int](capacity=ITEMS)
+        producer = Producer(source=range(ITEMS), queue=queue, sentinel=None, batch_size=100, send_sentinel=False,
+                            rate_limiter=TokenBucket(RATE, burst=100, clock=clock, sleep=clock.sleep))
+        producer.start()
+        producer.join(timeout=5.0)
+        self.assertAlmostEqual(clock.now, (ITEMS - 100) / RATE, places=9)
+        self.assertEqual(queue.size(), ITEMS)
+
+    def test_shared_limiter_caps_the_combined_rate(self):
+        """Test that producers sharing one limiter reach the target together, not each"""
+        queue = BoundedBlockingQueue[int](capacity=WALL_ITEMS)
+        limiter = TimedLeakyBucket(WALL_RATE)
+        source = SharedIterator(range(WALL_ITEMS))
+        producers = [Producer(source=source, queue=queue, sentinel=None, batch_size=50, send_sentinel=False, rate_limiter=limiter)
+                     for _ in range(4)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join(timeout=5.0)
+        achieved = (WALL_ITEMS - 50) / (time.monotonic() - limiter.first_acquire)
+        self.assertLess(abs(achieved - WALL_RATE) / WALL_RATE, WALL_TOLERANCE, f"{achieved:,.0f} items/sec")
+        self.assertEqual(queue.size(), WALL_ITEMS)
+
+    def test_system_with_rate_limiter(self):
+        """Test that the system passes its limiter to every producer"""
+        system = ProducerConsumerSystem(source=range(2000), capacity=64, num_producers=2, num_consumers=2, batch_size=10,
+                                        rate_limiter=TokenBucket(rate=20_000, burst=10))
+        start = time.monotonic()
+        system.run(timeout=10.0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertEqual(sorted(system._destination_data), list(range(2000)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from consumer import Consumer
+from events import EventType
+from process_consumer import ProcessPoolConsumer
+from producer_consumer_system import ProducerConsumerSystem
+from retry import DeadLetter, FailureHandler, ProcessingStats, Reject, RetryPolicy
+
+
+def fail_on_seven(x):
+    """Module level so it can be sent to worker processes"""
+    if x == 7:
+        raise ValueError("poison")
+    return x * 10
+
+
+class Flaky:
+    """process_fn that fails the first `failures` attempts of every item in `items`"""
+
+    def __init__(self, items, failures=1):
+        self.items = set(items)
+        self.failures = failures
+        self.attempts = {}
+
+    def __call__(self, x):
+        self.attempts[x] = self.attempts.get(x, 0) + 1
+        if x in self.items and self.attempts[x] <= self.failures:
+            raise RuntimeError(f"attempt {self.attempts[x]} of {x}")
+        return x
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for RetryPolicy and FailureHandler"""
+
+    def test_backoff_grows_and_is_capped(self):
+        """Test exponential backoff with the max_backoff cap and no jitter"""
+        policy = RetryPolicy(initial_backoff=0.1, multiplier=3, max_backoff=0.5, jitter=0)
+        self.assertEqual([round(policy.backoff(n), 6) for n in (1, 2, 3)], [0.1, 0.3, 0.5])
+
+    def test_jitter_stays_within_bounds(self):
+        """Test that jitter stretches or shrinks the backoff by at most its share"""
+        policy = RetryPolicy(initial_backoff=1.0, jitter=0.2)
+        delays = [policy.backoff(1) for _ in range(200)]
+        self.assertTrue(all(0.8 <= delay <= 1.2 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_invalid_policy(self):
+        """Test validation of the policy fields"""
+        for policy in (RetryPolicy(max_attempts=0), RetryPolicy(multiplier=0.5), RetryPolicy(jitter=2), RetryPolicy(initial_backoff=-1)):
+            with self.assertRaises(ValueError):
+                policy.validate()
+
+    def test_handler_schedules_then_dead_letters(self):
+        """Test that an item is kept for retry until it runs out of attempts"""
+        events = []
+        dead = []
+        handler = FailureHandler(RetryPolicy(max_attempts=2, initial_backoff=0, jitter=0), dead, events.append)
+
+        handler.failed("x", ValueError("first"), 1)
+        self.assertEqual(handler.pending, 1)
+        self.assertEqual(handler.wait_time(), 0.0)
+        self.assertEqual(handler.due(10), [("x", 1)])
+
+        error = ValueError("second")
+        handler.failed("x", error, 2)
+        self.assertEqual(handler.pending, 0)
+        self.assertIsNone(handler.wait_time())
+        self.assertEqual(dead, [DeadLetter("x", error, 2)])
+        self.assertEqual([event.type for event in events], [EventType.ITEM_FAILED, EventType.ITEM_FAILED, EventType.DEAD_LETTERED])
+        self.assertEqual(handler.stats(), ProcessingStats(succeeded=0, failed_attempts=2, retried=1, dead_lettered=1))
+
+    def test_stats_error_rate_and_combine(self):
+        """Test the error rate and summing stats of several consumers"""
+        stats = ProcessingStats.combine([ProcessingStats(3, 1, 1, 0), ProcessingStats(5, 1, 0, 1)])
+        self.assertEqual(stats, ProcessingStats(8, 2, 1, 1))
+        self.assertAlmostEqual(stats.error_rate, 0.2)
+        self.assertEqual(ProcessingStats.combine([]).error_rate, 0.0)
+
+
+class TestConsumerFailures(unittest.TestCase):
+    """Test cases for failure handling in Consumer and ProcessPoolConsumer"""
+
+    def run_consumer(self, process_fn, items, batch_size=1, retry=None):
+        queue = BoundedBlockingQueue[int](capacity=100)
+        destination = []
+        dead = []
+        sentinel = object()
+        queue.put_many(list(items))
+        queue.put(sentinel)
+        consumer = Consumer(queue=queue, destination=destination, sentinel=sentinel, batch_size=batch_size,
+                            process_fn=process_fn, retry=retry, dead_letter=dead)
+        consumer.start()
+        consumer.join(timeout=3.0)
+        self.assertFalse(consumer.is_alive())
+        return consumer, destination, dead
+
+    def test_poison_item_is_dead_lettered_and_others_continue(self):
+        """Test that an item that always raises does not stop the consumer"""
+        for batch_size in (1, 4):
+            consumer, destination, dead = self.run_consumer(fail_on_seven, range(10), batch_size, RetryPolicy(initial_backoff=0.001))
+            self.assertEqual(destination, [x * 10 for x in range(10) if x != 7])
+            self.assertEqual([(letter.item, letter.attempts, str(letter.error)) for letter in dead], [(7, 3, "poison")])
+            self.assertEqual(consumer.stats(), ProcessingStats(succeeded=9, failed_attempts=3, retried=2, dead_lettered=1))
+
+    def test_retry_succeeds_on_second_attempt(self):
+        """Test that a transient failure is retried and its result delivered"""
+        for batch_size in (1, 4):
+            flaky = Flaky(items={2, 5})
+            consumer, destination, dead = self.run_consumer(flaky, range(8), batch_size, RetryPolicy(initial_backoff=0.001))
+            self.assertEqual(sorted(destination), list(range(8)))
+            self.assertEqual(dead, [])
+            self.assertEqual(flaky.attempts[2], 2)
+            self.assertEqual(consumer.stats().retried, 2)
+
+    def test_without_retry_policy_failures_are_dead_lettered_at_once(self):
+        """Test the default of a single attempt"""
+        flaky = Flaky(items={3})
+        consumer, destination, dead = self.run_consumer(flaky, range(5))
+        self.assertEqual(destination, [0, 1, 2, 4])
+        self.assertEqual([letter.item for letter in dead], [3])
+        self.assertEqual(flaky.attempts[3], 1)
+
+    def test_reject_skips_retries(self):
+        """Test that raising Reject dead-letters the item on its first attempt"""
+        def reject_odd(x):
+            if x % 2:
+                raise Reject("odd")
+            return x
+
+        consumer, destination, dead = self.run_consumer(reject_odd, range(6), retry=RetryPolicy(max_attempts=5))
+        self.assertEqual(destination, [0, 2, 4])
+        self.assertEqual([(letter.item, letter.attempts) for letter in dead], [(1, 1), (3, 1), (5, 1)])
+        self.assertEqual(consumer.stats().retried, 0)
+
+    def test_backoff_does_not_block_other_items(self):
+        """Test that the consumer keeps processing new items while a failed one waits out its backoff"""
+        flaky = Flaky(items={0})
+        started = time.monotonic()
+        consumer, destination, dead = self.run_consumer(flaky, range(20), retry=RetryPolicy(initial_backoff=0.2, jitter=0))
+
+        # the retried item comes last, after every other item went through during its backoff
+        self.assertEqual(destination, list(range(1, 20)) + [0])
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_process_pool_consumer_retries_and_dead_letters(self):
+        """Test failure handling in the process dispatcher"""
+        queue = BoundedBlockingQueue[int](capacity=50)
+        destination = []
+        dead = []
+        sentinel = object()
+        queue.put_many(list(range(12)))
+        queue.put(sentinel)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            consumer = ProcessPoolConsumer(queue=queue, destination=destination, sentinel=sentinel, process_fn=fail_on_seven,
+                                           executor=executor, batch_size=3, retry=RetryPolicy(max_attempts=2, initial_backoff=0.001), dead_letter=dead)
+            consumer.start()
+            consumer.join(timeout=3.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(destination, [x * 10 for x in range(12) if x != 7])
+        self.assertEqual([(letter.item, letter.attempts) for letter in dead], [(7, 2)])
+        self.assertEqual(consumer.stats(), ProcessingStats(succeeded=11, failed_attempts=2, retried=1, dead_lettered=1))
+
+
+class TestSystemFailures(unittest.TestCase):
+    """Test cases for retries and dead letters in ProducerConsumerSystem"""
+
+    def test_system_reports_processing_stats(self):
+        """Test that failures across several consumers are summed up"""
+        for consumer_mode in ("thread", "process"):
+            dead = []
+            system = ProducerConsumerSystem(source=range(100), capacity=10, num_consumers=3, batch_size=4, process_fn=fail_on_seven,
+                                            consumer_mode=consumer_mode, retry=RetryPolicy(max_attempts=2, initial_backoff=0.001), dead_letter=dead)
+            system.run(timeout=30.0)
+
+            self.assertEqual(sorted(system._destination_data), [x * 10 for x in range(100) if x != 7])
+            self.assertEqual([letter.item for letter in dead], [7])
+            stats = system.processing_stats()
+            self.assertEqual(stats, ProcessingStats(succeeded=99, failed_attempts=2, retried=1, dead_lettered=1))
+            self.assertAlmostEqual(stats.error_rate, 2 / 101)
+
+    def test_invalid_retry_policy(self):
+        """Test that the system validates the retry policy up front"""
+        with self.assertRaises(ValueError):
+            ProducerConsumerSystem(source=range(3), retry=RetryPolicy(max_attempts=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+import multiprocessing
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import QueueClosedError
+from shared_memory_queue import SharedMemoryQueue
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def produce_arrays(queue, count):
+    """Child process: send `count` arrays filled with their index, then close the queue"""
+    for i in range(count):
+        queue.put(np.full((4, 256), i, dtype=np.float64))
+    queue.close()
+
+
+def produce_bytes(queue, count):
+    """Child process: send `count` byte strings, then close the queue"""
+    for i in range(count):
+        queue.put(bytes([i]) * 1000)
+    queue.close()
+
+
+class TestSharedMemoryQueue(unittest.TestCase):
+    """Test cases for SharedMemoryQueue"""
+
+    def setUp(self):
+        self.queue = SharedMemoryQueue(capacity=2, slot_size=8192)
+        self.addCleanup(self.queue.unlink)
+
+    def test_init_invalid_arguments(self):
+        """Test that zero capacity and empty slots are rejected"""
+        with self.assertRaises(ValueError):
+            SharedMemoryQueue(capacity=0, slot_size=16)
+        with self.assertRaises(ValueError):
+            SharedMemoryQueue(capacity=1, slot_size=0)
+
+    def test_bytes_and_objects_round_trip(self):
+        """Test that bytes come back as bytes and other objects are pickled"""
+        self.queue.put(b"payload")
+        self.queue.put({"id": 1, "values": [1, 2]})
+        self.assertEqual(self.queue.size(), 2)
+
+        self.assertEqual(self.queue.get(), b"payload")
+        self.assertEqual(self.queue.get(), {"id": 1, "values": [1, 2]})
+        self.assertEqual(self.queue.size(), 0)
+
+    def test_capacity_and_timeouts(self):
+        """Test blocking capacity semantics and the non-blocking variants"""
+        with self.assertRaises(TimeoutError):
+            self.queue.get(timeout=0.05)
+        self.assertIsNone(self.queue.try_get())
+
+        self.assertEqual(self.queue.put_many([b"a", b"b", b"c"], timeout=0.05), 2)
+        self.assertFalse(self.queue.try_put(b"c"))
+        with self.assertRaises(TimeoutError):
+            self.queue.put(b"c", timeout=0.05)
+
+        self.assertEqual(self.queue.get_many(5), [b"a", b"b"])
+
+    def test_item_larger_than_slot_raises_error(self):
+        """Test that a payload that does not fit into a slot is rejected"""
+        with self.assertRaises(ValueError):
+            self.queue.put(bytes(8193))
+
+    def test_view_is_zero_copy_and_released_in_ring_order(self):
+        """Test that a view reads the slot in place and that its slot is reused only once older slots are free"""
+        self.queue.put(b"first")
+        self.queue.put(b"second")
+
+        with self.queue.get_view() as first:
+            with self.queue.get_view() as second:
+                self.assertEqual(bytes(second), b"second")
+            # the newer slot is released, but the older one is still being read
+            self.assertFalse(self.queue.try_put(b"third"))
+            self.assertEqual(bytes(first), b"first")
+        self.assertTrue(self.queue.try_put(b"third"))
+
+        with self.assertRaises(ValueError):
+            first[0]  # views are released when their block exits
+
+    def test_closed_queue_drains_then_raises(self):
+        """Test that a closed queue rejects puts but still hands out the remaining items"""
+        self.queue.put(b"left")
+        self.queue.close()
+        self.queue.close()
+
+        self.assertTrue(self.queue.closed)
+        with self.assertRaises(QueueClosedError):
+            self.queue.put(b"more")
+        self.assertEqual(self.queue.get(), b"left")
+        with self.assertRaises(QueueClosedError):
+            self.queue.get(timeout=1.0)
+
+    def test_transfer_from_another_process(self):
+        """Test moving items from a producer process until it closes the queue"""
+        process = multiprocessing.Process(target=produce_bytes, args=(self.queue, 10))
+        process.start()
+
+        received = []
+        with self.assertRaises(QueueClosedError):
+            while True:
+                received.append(self.queue.get(timeout=5.0))
+        process.join(timeout=5.0)
+
+        self.assertEqual(received, [bytes([i]) * 1000 for i in range(10)])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_arrays_from_another_process(self):
+        """Test that arrays keep dtype and shape, as copies and as zero-copy views"""
+        process = multiprocessing.Process(target=produce_arrays, args=(self.queue, 6))
+        process.start()
+
+        copies = [self.queue.get(timeout=5.0) for _ in range(3)]
+        firsts = []
+        while True:
+            try:
+                with self.queue.get_view(timeout=5.0) as array:
+                    self.assertEqual(array.shape, (4, 256))
+                    firsts.append(float(array[0, 0]))
+                del array
+            except QueueClosedError:
+                break
+        process.join(timeout=5.0)
+
+        self.assertEqual([float(copy[3, 255]) for copy in copies], [0.0, 1.0, 2.0])
+        self.assertEqual(copies[0].dtype, np.float64)
+        self.assertEqual(firsts, [3.0, 4.0, 5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
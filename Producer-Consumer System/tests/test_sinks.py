@@ -0,0 +1,96 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import BoundedBlockingQueue
+from producer_consumer_system import ProducerConsumerSystem
+from sinks import BufferedSink, CallbackSink, JsonlFileSink, ListSink, QueueSink, RingBufferSink, Sink
+
+
+class TestSinks(unittest.TestCase):
+    """Test cases for the built-in sinks"""
+
+    def test_list_sink(self):
+        """Test that the list sink keeps every item"""
+        sink = ListSink()
+        sink.append(1)
+        sink.extend([2, 3])
+        self.assertEqual(sink.items, [1, 2, 3])
+
+    def test_ring_buffer_sink_keeps_most_recent(self):
+        """Test that the ring buffer sink keeps only the last maxlen items"""
+        sink = RingBufferSink(maxlen=3)
+        sink.extend(range(10))
+        self.assertEqual(sink.items(), [7, 8, 9])
+
+    def test_callback_sink_flushes_in_batches(self):
+        """Test that the callback receives full batches, and the rest on flush"""
+        batches = []
+        sink = CallbackSink(batches.append, flush_every=4)
+
+        sink.extend(range(6))
+        self.assertEqual(batches, [[0, 1, 2, 3]])
+
+        sink.flush()
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5]])
+
+    def test_invalid_flush_every(self):
+        """Test that an empty batch size is rejected"""
+        with self.assertRaises(ValueError):
+            CallbackSink(print, flush_every=0)
+
+    def test_jsonl_file_sink(self):
+        """Test that items are written as JSON lines once flushed"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.jsonl")
+            with JsonlFileSink(path, flush_every=2) as sink:
+                sink.extend([{"id": 1}, [2, 3], "four"])
+                sink.append(object)  # not JSON serializable, written through str()
+
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(lines, [{"id": 1}, [2, 3], "four", str(object)])
+
+    def test_queue_sink_forwards_downstream(self):
+        """Test that the queue sink forwards batches to a downstream queue"""
+        downstream = BoundedBlockingQueue[int](capacity=10)
+        sink = QueueSink(downstream, flush_every=3)
+
+        sink.extend([1, 2])
+        self.assertEqual(downstream.size(), 0)
+        sink.append(3)
+        self.assertEqual(downstream.get_many(10), [1, 2, 3])
+
+    def test_system_flushes_sink(self):
+        """Test that the system flushes a buffered sink once all consumers are done"""
+        batches = []
+        sink = CallbackSink(batches.append, flush_every=7)
+        system = ProducerConsumerSystem(source=range(20), capacity=4, batch_size=3, num_consumers=2, sink=sink)
+
+        system.run()
+
+        self.assertEqual(sorted(item for batch in batches for item in batch), list(range(20)))
+        # full batches of flush_every items, then the remainder written by the final flush
+        self.assertEqual([len(batch) for batch in batches], [7, 7, 6])
+
+    def test_incomplete_sinks_cannot_be_created(self):
+        """Test that a sink missing its write method fails when it is created, not in the middle of a run"""
+        class NoExtend(Sink):
+            pass
+
+        class NoWriteBatch(BufferedSink):
+            pass
+
+        for incomplete in (Sink, NoExtend, BufferedSink, NoWriteBatch):
+            with self.assertRaises(TypeError):
+                incomplete()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import os
+import tempfile
+import threading
+import time
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import QueueClosedError
+from metrics import QueueMetrics
+from producer_consumer_system import ProducerConsumerSystem
+from spilling_queue import SpillingQueue
+
+
+class TestSpillingQueue(unittest.TestCase):
+    """Test cases for SpillingQueue"""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".seg"))
+
+    def test_spills_beyond_memory_capacity_in_fifo_order(self):
+        """Test that items past the high-water mark go to disk and come back in order"""
+        with SpillingQueue(capacity=100, directory=self.directory, memory_capacity=3) as queue:
+            queue.put_many(range(5))
+            self.assertEqual((queue.size(), queue.spilled()), (5, 2))
+
+            # while anything is on disk, new items go to disk too
+            self.assertEqual(queue.get_many(4), [0, 1, 2, 3])
+            queue.put(5)
+            self.assertEqual(queue.spilled(), 2)
+            self.assertEqual([queue.get(), queue.try_get()], [4, 5])
+            self.assertIsNone(queue.try_get())
+
+            # once the log is drained, memory is used again
+            queue.put({"id": 6})
+            self.assertEqual(queue.spilled(), 0)
+            self.assertEqual(queue.get(), {"id": 6})
+
+    def test_capacity_still_blocks_producers(self):
+        """Test that capacity bounds memory and disk together"""
+        queue = SpillingQueue(capacity=4, directory=self.directory, memory_capacity=2)
+        self.assertEqual(queue.put_many(range(6), timeout=0.05), 4)
+        self.assertFalse(queue.try_put(9))
+        with self.assertRaises(ValueError):
+            SpillingQueue(capacity=4, directory=self.directory, memory_capacity=5)
+        queue.release()
+
+    def test_unacknowledged_items_are_replayed_after_restart(self):
+        """Test at-least-once delivery: spilled items taken without ack come back in the next run"""
+        queue = SpillingQueue(capacity=100, directory=self.directory, memory_capacity=2)
+        queue.put_many(range(10))
+        self.assertEqual(queue.get_many(3), [0, 1, 2])
+        seq, item = queue.get_unacked()
+        self.assertEqual(item, 3)
+        seq_4, item_4 = queue.get_unacked()
+        queue.ack(seq_4)
+        queue.ack(seq_4)  # acknowledging twice is a no-op
+        queue.release()  # as if the process stopped here
+
+        queue = SpillingQueue(capacity=100, directory=self.directory, memory_capacity=2)
+        # 3 was never acknowledged; 4 was, but after it, so it is delivered again as well
+        self.assertEqual(queue.get_many(100), [3, 4, 5, 6, 7, 8, 9])
+        queue.release()
+
+        queue = SpillingQueue(capacity=100, directory=self.directory, memory_capacity=2)
+        self.assertEqual(queue.size(), 0)
+        queue.release()
+
+    def test_durable_mode_logs_items_held_in_memory(self):
+        """Test that with durable=True even items that never spilled survive a restart"""
+        queue = SpillingQueue(capacity=10, directory=self.directory, memory_capacity=10, durable=True)
+        queue.put_many(["a", "b", "c"])
+        self.assertEqual(queue.spilled(), 0)
+        self.assertEqual(queue.get(), "a")
+        queue.release()
+
+        queue = SpillingQueue(capacity=10, directory=self.directory, memory_capacity=10, durable=True)
+        self.assertEqual(queue.get_many(10), ["b", "c"])
+        queue.release()
+
+    def test_acknowledged_segments_are_deleted(self):
+        """Test that a checkpoint removes segments holding only acknowledged items"""
+        queue = SpillingQueue(capacity=1000, directory=self.directory, memory_capacity=1, segment_bytes=256, checkpoint_every=10**6)
+        queue.put_many([bytes(100)] * 20)
+        self.assertGreater(len(self.segments()), 5)
+
+        queue.get_many(20)
+        queue.checkpoint(sync=True)
+        self.assertEqual(len(self.segments()), 1)
+        queue.release()
+
+    def test_torn_record_is_ignored_on_recovery(self):
+        """Test that a record damaged by a crash ends the replay instead of returning garbage"""
+        queue = SpillingQueue(capacity=10, directory=self.directory, memory_capacity=1)
+        queue.put_many([b"first", b"second", b"third"])
+        queue.release()
+
+        path = os.path.join(self.directory, self.segments()[0])
+        with open(path, "r+b") as file:
+            data = file.read()
+            file.seek(data.index(b"third"))
+            file.write(b"XXXXX")
+
+        queue = SpillingQueue(capacity=10, directory=self.directory, memory_capacity=1)
+        self.assertEqual(queue.get_many(10), [b"second"])
+        queue.put(b"fourth")  # appended to a new segment after the damaged one
+        self.assertEqual(queue.get(), b"fourth")
+        queue.release()
+
+    def test_blocked_consumer_gets_spilled_items_and_close(self):
+        """Test blocking get across a spill, and close behaving like BoundedBlockingQueue"""
+        metrics = QueueMetrics()
+        queue = SpillingQueue(capacity=50, directory=self.directory, memory_capacity=1, metrics=metrics)
+        results = []
+
+        def consume():
+            try:
+                while True:
+                    results.append(queue.get())
+            except QueueClosedError:
+                pass
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        time.sleep(0.05)
+        queue.put_many(range(30))
+        queue.close()
+        thread.join(timeout=2.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(results, list(range(30)))
+        self.assertEqual(metrics.snapshot().latency.count, 30)
+        queue.release()
+
+    def test_system_with_spilling_queue(self):
+        """Test that ProducerConsumerSystem runs on an injected SpillingQueue"""
+        queue = SpillingQueue(capacity=1000, directory=self.directory, memory_capacity=4)
+        system = ProducerConsumerSystem(source=range(500), queue=queue, num_consumers=2, batch_size=8)
+        system.run(timeout=10.0)
+        queue.release()
+
+        self.assertEqual(sorted(system._destination_data), list(range(500)))
+
+
+if __name__ == "__main__":
+    unittest.main()
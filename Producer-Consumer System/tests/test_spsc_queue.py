@@ -0,0 +1,150 @@
+import unittest
+import threading
+import time
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_blocking_queue import QueueClosedError
+from events import EventType, RingBufferCollector
+from spsc_queue import SPSCQueue
+
+
+class TestSPSCQueue(unittest.TestCase):
+    """Test cases for SPSCQueue"""
+
+    def test_init_invalid_capacity(self):
+        """Test that zero and negative capacities raise ValueError"""
+        with self.assertRaises(ValueError):
+            SPSCQueue[int](capacity=0)
+        with self.assertRaises(ValueError):
+            SPSCQueue[int](capacity=-1)
+
+    def test_put_and_get_wrap_around(self):
+        """Test FIFO order while the ring wraps around several times"""
+        queue = SPSCQueue[int](capacity=3)
+        retrieved = []
+        for start in range(0, 12, 2):
+            queue.put(start)
+            queue.put(start + 1)
+            retrieved.append(queue.get())
+            retrieved.append(queue.get())
+
+        self.assertEqual(retrieved, list(range(12)))
+        self.assertEqual(queue.size(), 0)
+
+    def test_put_many_and_get_many(self):
+        """Test that batches respect the capacity and keep FIFO order"""
+        queue = SPSCQueue[int](capacity=4)
+        self.assertEqual(queue.put_many([1, 2, 3, 4, 5], timeout=0.05), 4)
+        self.assertEqual(queue.get_many(3), [1, 2, 3])
+        self.assertEqual(queue.put_many([5, 6]), 2)
+        self.assertEqual(queue.get_many(10), [4, 5, 6])
+        self.assertEqual(queue.get_many(10, timeout=0.05), [])
+        with self.assertRaises(ValueError):
+            queue.get_many(0)
+
+    def test_get_many_stops_after_matching_item(self):
+        """Test that get_many with stop ends the batch at the first matching item, also across the wrap-around"""
+        queue = SPSCQueue[int](capacity=4)
+        queue.put_many([9, 9, 9])
+        queue.get_many(3)
+        queue.put_many([1, 0, 2, 0]) # slots 3, 0, 1, 2
+        self.assertEqual(queue.get_many(4, stop=lambda item: item == 0), [1, 0])
+        self.assertEqual(queue.get_many(4, stop=lambda item: item == 0), [2, 0])
+
+    def test_put_and_get_timeout(self):
+        """Test that put on a full queue and get on an empty queue raise TimeoutError"""
+        queue = SPSCQueue[int](capacity=1)
+        with self.assertRaises(TimeoutError):
+            queue.get(timeout=0.05)
+
+        queue.put(1)
+        with self.assertRaises(TimeoutError):
+            queue.put(2, timeout=0.05)
+        self.assertEqual(queue.get(), 1)
+
+    def test_try_put_and_try_get(self):
+        """Test the non-blocking variants"""
+        queue = SPSCQueue[int](capacity=1)
+        self.assertEqual(queue.try_get(default=-1), -1)
+        self.assertTrue(queue.try_put(1))
+        self.assertFalse(queue.try_put(2))
+        self.assertEqual(queue.try_get(), 1)
+
+    def test_threads_transfer_every_item_in_order(self):
+        """Test one producer and one consumer thread moving many items through a small ring"""
+        queue = SPSCQueue[int](capacity=8, spin=0)  # park immediately, to exercise the wakeups
+        items = list(range(5000))
+        retrieved = []
+
+        def consume():
+            for _ in items:
+                retrieved.append(queue.get())
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for start in range(0, len(items), 7):
+            queue.put_many(items[start:start + 7])
+        consumer.join(timeout=5.0)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(retrieved, items)
+
+    def test_close_wakes_parked_consumer_and_drains(self):
+        """Test that close wakes a parked consumer and that remaining items are still handed out"""
+        collector = RingBufferCollector()
+        queue = SPSCQueue[int](capacity=2, observer=collector, spin=0)
+        errors = []
+
+        def get_item():
+            try:
+                queue.get()
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=get_item)
+        thread.start()
+        time.sleep(0.05)
+        queue.close()
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual([event.type for event in collector.events()], [EventType.CONSUMER_BLOCKED, EventType.QUEUE_CLOSED])
+
+        queue = SPSCQueue[int](capacity=2)
+        queue.put_many([1, 2])
+        queue.close()
+        self.assertTrue(queue.closed)
+        with self.assertRaises(QueueClosedError):
+            queue.put(3)
+        self.assertEqual(queue.get_many(5), [1, 2])
+        with self.assertRaises(QueueClosedError):
+            queue.try_get()
+
+    def test_close_wakes_parked_producer(self):
+        """Test that close wakes a producer parked on a full queue with QueueClosedError"""
+        queue = SPSCQueue[int](capacity=1, spin=0)
+        queue.put(1)
+        errors = []
+
+        def put_item():
+            try:
+                queue.put(2)
+            except QueueClosedError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=put_item)
+        thread.start()
+        time.sleep(0.05)
+        queue.close()
+        thread.join(timeout=1.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
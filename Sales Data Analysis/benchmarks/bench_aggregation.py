@@ -0,0 +1,132 @@
+"""
+Benchmark: the full report with repeated group-bys (how main.py computed it before the aggregation engine)
+against the report with one shared SalesAggregates, both with an empty result cache, and a repeated run of
+the report in the same process, served from the result cache.
+
+The sample data is repeated `--scale` times to stand in for a large extract. Printing is discarded, so
+only the analysis is timed. Reports the best of `--repeats` runs for each variant.
+
+Usage:
+    python benchmarks/bench_aggregation.py --scale 200 --repeats 3
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregation import SalesAggregates
+from src.cache import default_cache
+from src.analysis import (
+    overall_analysis,
+    country_level_analysis,
+    product_level_analysis,
+    yearly_analysis,
+    order_status_analysis,
+    customer_level_analysis,
+)
+from src.analysis_utils import (
+    total_sales,
+    sales_by_country,
+    sales_by_product,
+    sales_by_year,
+    sales_by_year_and_quarter,
+    best_quarter_each_year,
+    worst_quarter_each_year,
+    average_sales_per_order_line,
+    large_orders,
+    total_orders,
+    total_customers,
+    total_products,
+    filter_by_status,
+    sort_products_by_sales,
+    sort_countries_by_sales,
+    sort_products_by_quantity,
+    sales_by_customer,
+)
+from src.utils import get_percentile
+
+
+@contextlib.contextmanager
+def uncached():
+    """
+    Run without the result cache: with no memory budget no result is kept, so every call, including the
+    ones the analysis functions make to each other, computes again like before the cache existed.
+    """
+    max_bytes = default_cache.max_bytes
+    default_cache.max_bytes = 0
+    try:
+        yield
+    finally:
+        default_cache.max_bytes = max_bytes
+
+
+def repeated_report(df):
+    """The calls the report made before the aggregation engine, every one scanning the rows again."""
+    with uncached():
+        _repeated_calls(df)
+
+
+def _repeated_calls(df):
+    large_orders(df, get_percentile(df, "SALES", 0.75))
+    total_sales(df), total_customers(df), total_orders(df), total_products(df), average_sales_per_order_line(df)
+    sales_by_country(df), sort_countries_by_sales(df), sort_countries_by_sales(df)
+    sales_by_product(df), sort_products_by_quantity(df), sort_products_by_sales(df), sort_products_by_sales(df)
+    sales_by_year(df), sales_by_year_and_quarter(df), best_quarter_each_year(df), worst_quarter_each_year(df)
+    for status in ("Shipped", "Cancelled"):
+        filtered = filter_by_status(df, status)
+        len(filtered), total_sales(filtered)
+    sales_by_customer(df), sales_by_customer(df)
+
+
+def shared_report(df):
+    """The report as main.py runs it: one SalesAggregates shared by every section."""
+    aggregates = SalesAggregates(df)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for analysis in (overall_analysis, country_level_analysis, product_level_analysis, yearly_analysis,
+                         order_status_analysis, customer_level_analysis):
+            analysis(df, aggregates)
+
+
+def best_time(report, df, repeats, cold=True):
+    times = []
+    for _ in range(repeats):
+        if cold:
+            default_cache.clear()
+        start = time.perf_counter()
+        report(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, default=Path(__file__).parent.parent / "data" / "sales_data_sample.csv")
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    sample = pd.read_csv(args.csv, encoding='latin-1')
+    df = pd.concat([sample] * args.scale, ignore_index=True)
+
+    repeated = best_time(repeated_report, df, args.repeats)
+    shared = best_time(shared_report, df, args.repeats)
+    # the last cold run left the cache filled
+    cached = best_time(shared_report, df, args.repeats, cold=False)
+    print(f"{len(df):,} rows ({args.scale}x the sample)")
+    print(f"  {'report':<28} {'seconds':>9}")
+    print(f"  {'repeated group-bys':<28} {repeated:>9.3f}")
+    print(f"  {'shared SalesAggregates':<28} {shared:>9.3f}")
+    print(f"  {'repeated run, cached':<28} {cached:>9.3f}")
+    print(f"  speedup: {repeated / shared:.2f}x shared, {repeated / cached:.0f}x cached")
+
+
+if __name__ == "__main__":
+    main()
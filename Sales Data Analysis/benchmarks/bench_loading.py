@@ -0,0 +1,75 @@
+"""
+Benchmark: time and peak memory of loading the sales CSV with every column in default dtypes against
+the schema-aware loader (only the report's columns, category strings, downcast integers), for growing files.
+
+The sample data is repeated `--scales` times into temporary CSV files. Each load happens in its own process,
+so its peak RSS belongs to that load alone.
+
+Usage:
+    python benchmarks/bench_loading.py --scales 50 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError: # not available on Windows, peak RSS is then not reported
+    resource = None
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.loader import load_sales_data, memory_usage
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "sales_data_sample.csv"
+
+
+def run(csv_path, compact):
+    """Load the file; returns seconds, the frame's size in MB and peak RSS in MB."""
+    start = time.perf_counter()
+    if compact:
+        df = load_sales_data(csv_path)
+    else:
+        df = pd.read_csv(csv_path, encoding='latin-1')
+    elapsed = time.perf_counter() - start
+
+    peak_rss = 0.0
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, memory_usage(df) / (1024 * 1024), peak_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[50, 200])
+    args = parser.parse_args()
+
+    # the files are written by repeating the sample's lines: a child process starts with its parent's peak RSS on Linux,
+    # so the parent must not hold the large frames itself
+    header, *lines = SAMPLE_CSV.read_bytes().splitlines(keepends=True)
+    body = b"".join(lines)
+    print(f"  {'rows':>10} {'mode':<16} {'seconds':>8} {'frame MB':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            csv_path = Path(directory) / f"sales_{scale}.csv"
+            with open(csv_path, "wb") as file:
+                file.write(header)
+                for _ in range(scale):
+                    file.write(body)
+            for name, compact in (("default dtypes", False), ("schema-aware", True)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    elapsed, frame_mb, peak_rss = executor.submit(run, csv_path, compact).result()
+                print(f"  {len(lines) * scale:>10,} {name:<16} {elapsed:>8.2f} {frame_mb:>9.0f} {peak_rss:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: startup of the report with and without the columnar cache, for growing files.
+
+Each file is loaded three ways, each in a fresh process: parsing the CSV (`--no-cache`), the first cached run
+(parses the CSV and writes the cache) and a warm run (maps the cached columns). Every run then prints the
+full report to nowhere, and the time to have the data loaded and the time for the whole run are reported.
+
+Usage:
+    python benchmarks/bench_startup.py --scales 1 200
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregation import SalesAggregates
+from src.analysis import (
+    overall_analysis,
+    country_level_analysis,
+    product_level_analysis,
+    yearly_analysis,
+    order_status_analysis,
+    customer_level_analysis,
+)
+from src.columnar_cache import ColumnarCache
+from src.loader import load_sales_data
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "sales_data_sample.csv"
+
+
+def run(csv_path, cache_directory):
+    """Load the data and print the report to nowhere; returns seconds to load and seconds in total."""
+    start = time.perf_counter()
+    if cache_directory is None:
+        df = load_sales_data(csv_path)
+    else:
+        df = ColumnarCache(cache_directory).load(csv_path)
+    loaded = time.perf_counter() - start
+    aggregates = SalesAggregates(df)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for analysis in (overall_analysis, country_level_analysis, product_level_analysis, yearly_analysis,
+                         order_status_analysis, customer_level_analysis):
+            analysis(df, aggregates)
+    return loaded, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 200])
+    args = parser.parse_args()
+
+    header, *lines = SAMPLE_CSV.read_bytes().splitlines(keepends=True)
+    body = b"".join(lines)
+    print(f"  {'rows':>10} {'run':<18} {'load s':>8} {'total s':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            csv_path = Path(directory) / f"sales_{scale}.csv"
+            with open(csv_path, "wb") as file:
+                file.write(header)
+                for _ in range(scale):
+                    file.write(body)
+            cache_directory = Path(directory) / "cache"
+            for name, cache in (("no cache", None), ("cold (builds)", cache_directory), ("warm", cache_directory)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    loaded, total = executor.submit(run, csv_path, cache).result()
+                print(f"  {len(lines) * scale:>10,} {name:<18} {loaded:>8.3f} {total:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
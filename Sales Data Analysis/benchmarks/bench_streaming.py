@@ -0,0 +1,94 @@
+"""
+Benchmark: peak memory and time of the full report, loading the CSV at once vs streaming it in chunks,
+for growing files.
+
+The sample data is repeated `--scales` times into temporary CSV files. Each run happens in its own process,
+so its peak RSS belongs to that run alone. Loading at once grows with the file; streaming stays flat.
+
+Usage:
+    python benchmarks/bench_streaming.py --scales 50 200 --chunksize 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError: # not available on Windows, peak RSS is then not reported
+    resource = None
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregation import SalesAggregates
+from src.analysis import (
+    overall_analysis,
+    country_level_analysis,
+    product_level_analysis,
+    yearly_analysis,
+    order_status_analysis,
+    customer_level_analysis,
+)
+from src.streaming import StreamingAggregates
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "sales_data_sample.csv"
+
+
+def run(csv_path, chunksize):
+    """Print the report to nowhere; returns seconds and peak RSS in MB."""
+    start = time.perf_counter()
+    if chunksize is None:
+        df = pd.read_csv(csv_path, encoding='latin-1')
+        aggregates = SalesAggregates(df)
+    else:
+        df = None
+        aggregates = StreamingAggregates(csv_path, chunksize=chunksize)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for analysis in (overall_analysis, country_level_analysis, product_level_analysis, yearly_analysis,
+                         order_status_analysis, customer_level_analysis):
+            analysis(df, aggregates)
+    elapsed = time.perf_counter() - start
+
+    peak_rss = 0.0
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, peak_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # the files are written by repeating the sample's lines: a child process starts with its parent's peak RSS on Linux,
+    # so the parent must not hold the large frames itself
+    header, *lines = SAMPLE_CSV.read_bytes().splitlines(keepends=True)
+    body = b"".join(lines)
+    print(f"  {'rows':>10} {'file MB':>8} {'mode':<22} {'seconds':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            csv_path = Path(directory) / f"sales_{scale}.csv"
+            with open(csv_path, "wb") as file:
+                file.write(header)
+                for _ in range(scale):
+                    file.write(body)
+            size_mb = csv_path.stat().st_size / (1024 * 1024)
+            for name, chunksize in (("load at once", None), (f"stream, {args.chunksize:,} rows", args.chunksize)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    elapsed, peak_rss = executor.submit(run, csv_path, chunksize).result()
+                print(f"  {len(lines) * scale:>10,} {size_mb:>8.0f} {name:<22} {elapsed:>8.2f} {peak_rss:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,20 +7,55 @@ from src.analysis import (
     customer_level_analysis,
 )
 
+from src.aggregation import SalesAggregates
+from src.columnar_cache import ColumnarCache
+from src.loader import format_load_stats, load_sales_data, load_stats
+from src.streaming import StreamingAggregates
+
 from pathlib import Path
-import pandas as pd
+import argparse
+
+REPORTS = {
+    'overall': overall_analysis,
+    'country': country_level_analysis,
+    'product': product_level_analysis,
+    'yearly': yearly_analysis,
+    'order_status': order_status_analysis,
+    'customer': customer_level_analysis,
+}
 
 def main():
-    # Read the CSV file using pandas
-    csv_path = Path("data/sales_data_sample.csv")
-    df = pd.read_csv(csv_path, encoding='latin-1')
-
-    overall_analysis(df)
-    country_level_analysis(df)
-    product_level_analysis(df)
-    yearly_analysis(df)
-    order_status_analysis(df)
-    customer_level_analysis(df)
+    parser = argparse.ArgumentParser(description="Sales data analysis report")
+    parser.add_argument("csv_path", nargs="?", type=Path, default=Path("data/sales_data_sample.csv"))
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the CSV in chunks of this many rows instead of loading it at once")
+    parser.add_argument("--reports", nargs="+", choices=list(REPORTS), default=list(REPORTS),
+                        help="the reports to print, in this order (default: all of them)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse the CSV instead of reading its columnar cache, and leave the cache as it is")
+    parser.add_argument("--memory-usage", action="store_true",
+                        help="print the memory the loaded data takes and how much the compact dtypes saved")
+    args = parser.parse_args()
+
+    if args.chunksize is None:
+        # Read only the columns the reports need, with compact dtypes, from the columnar cache next to the CSV
+        # unless it is missing or the CSV changed since it was built
+        if args.no_cache:
+            df = load_sales_data(args.csv_path, args.reports)
+        else:
+            df = ColumnarCache().load(args.csv_path, args.reports)
+        # every group-by is computed once and shared by all the sections
+        aggregates = SalesAggregates(df)
+    else:
+        # streaming mode: memory stays bounded by the chunk size, the analysis functions only use the aggregates
+        df = None
+        aggregates = StreamingAggregates(args.csv_path, chunksize=args.chunksize)
+
+    for report in args.reports:
+        REPORTS[report](df, aggregates)
+
+    if args.memory_usage and df is not None:
+        print(f"\n{format_load_stats(load_stats(args.csv_path, df))}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
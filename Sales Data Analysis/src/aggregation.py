@@ -0,0 +1,161 @@
+"""Aggregation engine: every group-by of the report computed once and shared by the analysis functions."""
+
+from functools import cached_property
+
+from src.analysis_utils import (
+    total_sales,
+    sales_by_country,
+    sales_by_year_and_quarter,
+    best_quarters,
+    worst_quarters,
+    average_sales_per_order_line,
+    total_orders,
+    total_customers,
+    total_products,
+    sales_by_customer,
+)
+from src.cache import memoize
+
+
+@memoize
+def product_totals(df):
+    """
+    Calculate total sales and quantity grouped by product line, in one group-by.
+    """
+    return df.groupby('PRODUCTLINE', observed=True)[['SALES', 'QUANTITYORDERED']].sum()
+
+
+@memoize
+def status_totals(df):
+    """
+    Calculate the order line count and total sales grouped by status, in one group-by.
+    """
+    return df.groupby('STATUS', observed=True)['SALES'].agg(['size', 'sum'])
+
+
+@memoize
+def sales_percentile(df, percentile):
+    """
+    Calculate a percentile of the order line sales (e.g. 0.75).
+    """
+    return df['SALES'].quantile(percentile)
+
+
+@memoize
+def count_above(df, threshold):
+    """
+    Count the order lines with sales above the threshold, without building the filtered frame.
+    """
+    return int((df['SALES'] > threshold).sum())
+
+
+class SalesAggregates:
+    """
+    Cached aggregates of a sales DataFrame.
+
+    Each aggregate is computed on first access, with one group-by per key, and reused afterwards:
+    the product line totals of sales and quantity come from the same group-by, sales by year and the
+    best/worst quarters are derived from the year x quarter totals, and the sorted views only sort the
+    cached totals. The DataFrame must not change while its aggregates are in use.
+
+    The group-bys themselves go through src.cache, so a new SalesAggregates of the same, unchanged
+    DataFrame (e.g. the next run of a report) reuses them too.
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+    @cached_property
+    def total_sales(self):
+        return total_sales(self.df)
+
+    @cached_property
+    def average_sales(self):
+        return average_sales_per_order_line(self.df)
+
+    @cached_property
+    def total_orders(self):
+        return total_orders(self.df)
+
+    @cached_property
+    def total_customers(self):
+        return total_customers(self.df)
+
+    @cached_property
+    def total_products(self):
+        return total_products(self.df)
+
+    def sales_percentile(self, percentile):
+        """
+        Percentile of the order line sales (e.g. 0.75).
+        """
+        return sales_percentile(self.df, percentile)
+
+    def count_above(self, threshold):
+        """
+        Count the order lines with sales above the threshold.
+        """
+        return count_above(self.df, threshold)
+
+    @cached_property
+    def sales_by_country(self):
+        return sales_by_country(self.df)
+
+    @cached_property
+    def countries_by_sales(self):
+        return self.sales_by_country.sort_values(ascending=False)
+
+    @cached_property
+    def _product_totals(self):
+        return product_totals(self.df)
+
+    @cached_property
+    def sales_by_product(self):
+        return self._product_totals['SALES']
+
+    @cached_property
+    def products_by_sales(self):
+        return self.sales_by_product.sort_values(ascending=False)
+
+    @cached_property
+    def products_by_quantity(self):
+        return self._product_totals['QUANTITYORDERED'].sort_values(ascending=False)
+
+    @cached_property
+    def sales_by_year_and_quarter(self):
+        return sales_by_year_and_quarter(self.df)
+
+    @cached_property
+    def sales_by_year(self):
+        # the quarters of a year add up to the year, no second pass over the rows
+        return self.sales_by_year_and_quarter.groupby(level='YEAR_ID').sum()
+
+    @cached_property
+    def best_quarter_each_year(self):
+        return best_quarters(self.sales_by_year_and_quarter)
+
+    @cached_property
+    def worst_quarter_each_year(self):
+        return worst_quarters(self.sales_by_year_and_quarter)
+
+    @cached_property
+    def _status_totals(self):
+        return status_totals(self.df)
+
+    def count_with_status(self, status):
+        """
+        Count the order lines with the given status (e.g., 'Shipped', 'Cancelled').
+        """
+        totals = self._status_totals
+        return int(totals.at[status, 'size']) if status in totals.index else 0
+
+    def sales_with_status(self, status):
+        """
+        Total sales of the order lines with the given status.
+        """
+        totals = self._status_totals
+        return totals.at[status, 'sum'] if status in totals.index else 0.0
+
+    @cached_property
+    def sales_by_customer(self):
+        return sales_by_customer(self.df)
@@ -1,72 +1,59 @@
-"""Analysis categories functions for sales data."""
-
-from src.analysis_utils import (
-    total_sales,
-    sales_by_country,
-    sales_by_product,
-    sales_by_year,
-    sales_by_year_and_quarter,
-    best_quarter_each_year,
-    worst_quarter_each_year,
-    average_sales_per_order_line,
-    large_orders,
-    total_orders,
-    total_customers,
-    total_products,
-    filter_by_status,
-    sort_products_by_sales,
-    sort_countries_by_sales,
-    sort_products_by_quantity,
-    sales_by_customer,
-)
+"""Analysis categories functions for sales data.
+
+Every function takes the DataFrame and, optionally, its SalesAggregates. Pass the same SalesAggregates to all
+of them so each group-by is computed once for the whole report instead of once per use.
+"""
+
+from src.aggregation import SalesAggregates
 
 from src.utils import (
     format_currency,
     format_currency_item,
-    get_count,
     format_item,
-    get_percentile,
 )
 
 
-def overall_analysis(df):
+def overall_analysis(df, aggregates=None):
     """Overall analysis of the sales data."""
+    aggregates = SalesAggregates(df) if aggregates is None else aggregates
     print("============== DATA SUMMARY ==============\n")
 
-    avg_sales = average_sales_per_order_line(df)
-    percentile_75 = get_percentile(df, "SALES", 0.75)
-    large_orders_df = large_orders(df, percentile_75)
+    avg_sales = aggregates.average_sales
+    percentile_75 = aggregates.sales_percentile(0.75)
+    large_orders_count = aggregates.count_above(percentile_75)
 
-    print(f"Total Sales: ${format_currency(total_sales(df))}")
-    print(f"Total customers: {total_customers(df)}")
-    print(f"Total orders: {total_orders(df)}")
-    print(f"Total products: {total_products(df)}")
+    print(f"Total Sales: ${format_currency(aggregates.total_sales)}")
+    print(f"Total customers: {aggregates.total_customers}")
+    print(f"Total orders: {aggregates.total_orders}")
+    print(f"Total products: {aggregates.total_products}")
     print(f"Average Sales per order line: ${format_currency(avg_sales)}")
-    print(f"Large orders (above 75th percentile): {len(large_orders_df)}")
+    print(f"Large orders (above 75th percentile): {large_orders_count}")
 
 
-def country_level_analysis(df):
+def country_level_analysis(df, aggregates=None):
     """Analysis of the sales data by country."""
+    aggregates = SalesAggregates(df) if aggregates is None else aggregates
     print("\n============== SALES ANALYSIS BY COUNTRY ==============\n")
     print("\nOverall Sales:")
-    list(map(format_currency_item, sales_by_country(df).items()))
+    list(map(format_currency_item, aggregates.sales_by_country.items()))
 
     print("\nTop 5 performing countries:")
-    list(map(format_currency_item, sort_countries_by_sales(df).head(5).items()))
+    list(map(format_currency_item, aggregates.countries_by_sales.head(5).items()))
 
     print("\nBottom 5 performing countries:")
-    list(map(format_currency_item, sort_countries_by_sales(df).tail(5).items()))
+    list(map(format_currency_item, aggregates.countries_by_sales.tail(5).items()))
 
-def product_level_analysis(df):
+def product_level_analysis(df, aggregates=None):
     """Analysis of the sales data by product line."""
+    aggregates = SalesAggregates(df) if aggregates is None else aggregates
     print("\n============== SALES ANALYSIS BY PRODUCTLINE ==============\n")
     print("Product Category Sales:")
-    list(map(format_currency_item, sales_by_product(df).items()))
+    list(map(format_currency_item, aggregates.sales_by_product.items()))
 
     print("\nQuantities sold:")
-    list(map(format_currency_item, sort_products_by_quantity(df).items()))
+    list(map(format_currency_item, aggregates.products_by_quantity.items()))
 
-    product_performance = sort_products_by_sales(df).head(1)
+    product_performance = aggregates.products_by_sales.head(1)
     print("\nBest Selling product:")
     get_best = lambda s: (s.index[0], s.iloc[0])
     best_product, best_total = get_best(product_performance)
@@ -74,43 +61,44 @@ def product_level_analysis(df):
 
     print("\nWorst Selling product:")
     get_worst = lambda s: (s.index[-1], s.iloc[-1])
-    worst_product, worst_total = get_worst(sort_products_by_sales(df).tail(1))
+    worst_product, worst_total = get_worst(aggregates.products_by_sales.tail(1))
     print(f"  {worst_product}: making ${format_currency(worst_total)} in sales")
 
-def yearly_analysis(df):
+def yearly_analysis(df, aggregates=None):
     """Analysis of the sales data by year."""
+    aggregates = SalesAggregates(df) if aggregates is None else aggregates
     print("\n============== YEARLY ANALYSIS ==============\n")
     print("Sales by year:")
-    list(map(format_currency_item, sales_by_year(df).items()))
+    list(map(format_currency_item, aggregates.sales_by_year.items()))
 
     print("\nQuarterly analysis for each year:")
-    quarterly_analysis = sales_by_year_and_quarter(df)
+    quarterly_analysis = aggregates.sales_by_year_and_quarter
     print(quarterly_analysis)
 
 
     print("\nBest quarter for each year:")
-    list(map(format_item, best_quarter_each_year(df).items()))
+    list(map(format_item, aggregates.best_quarter_each_year.items()))
 
     print("\nWorst quarter for each year:")
-    list(map(format_item, worst_quarter_each_year(df).items()))
+    list(map(format_item, aggregates.worst_quarter_each_year.items()))
 
-def order_status_analysis(df):
+def order_status_analysis(df, aggregates=None):
     """Analysis of the sales data by order status."""
+    aggregates = SalesAggregates(df) if aggregates is None else aggregates
     print("\n============== FILTERING BY STATUS ==============\n")
-    shipped_filtered_df = filter_by_status(df, "Shipped")
-    cancelled_filtered_df = filter_by_status(df, "Cancelled")
-    print(f"  Shipped orders: {get_count(shipped_filtered_df)}")
-    print(f"  Cancelled orders: {get_count(cancelled_filtered_df)}")
-    print(f"  Total sales for shipped orders: {format_currency(total_sales(shipped_filtered_df))}")
-    print(f"  Lost revenue from cancelled orders: {format_currency(total_sales(cancelled_filtered_df))}")
+    print(f"  Shipped orders: {aggregates.count_with_status('Shipped')}")
+    print(f"  Cancelled orders: {aggregates.count_with_status('Cancelled')}")
+    print(f"  Total sales for shipped orders: {format_currency(aggregates.sales_with_status('Shipped'))}")
+    print(f"  Lost revenue from cancelled orders: {format_currency(aggregates.sales_with_status('Cancelled'))}")
 
 
-def customer_level_analysis(df):
+def customer_level_analysis(df, aggregates=None):
     """Analysis of the sales data by customer level."""
+    aggregates = SalesAggregates(df) if aggregates is None else aggregates
     print("\n============== CUSTOMER LEVEL ANALYSIS ==============\n")
 
     print("Most frequent customers:")
-    list(map(format_currency_item, sales_by_customer(df).head(5).items()))
+    list(map(format_currency_item, aggregates.sales_by_customer.head(5).items()))
 
     print("\nLeast frequent customers:")
-    list(map(format_currency_item, sales_by_customer(df).tail(5).items()))
+    list(map(format_currency_item, aggregates.sales_by_customer.tail(5).items()))
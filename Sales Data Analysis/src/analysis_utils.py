@@ -1,5 +1,13 @@
-"""Analysis utils for sales data."""
+"""Analysis utils for sales data.
 
+The aggregations are memoized in src.cache.default_cache, so repeated calls on unchanged data are nearly free.
+The row filters are not: their results are as large as the data and are usually changed or filtered further.
+"""
+
+from src.cache import memoize
+
+
+@memoize
 def total_sales(df):
     """
     Calculate the total sales across all orders.
@@ -7,47 +15,64 @@ def total_sales(df):
     return df['SALES'].sum()
 
 
+@memoize
 def sales_by_country(df):
     """
     Calculate total sales grouped by country.
     """
-    return df.groupby('COUNTRY')['SALES'].sum()
+    return df.groupby('COUNTRY', observed=True)['SALES'].sum()
 
 
+@memoize
 def sales_by_product(df):
     """
     Calculate total sales grouped by product line.
     """
-    return df.groupby('PRODUCTLINE')['SALES'].sum()
+    return df.groupby('PRODUCTLINE', observed=True)['SALES'].sum()
 
 
+@memoize
 def sales_by_year(df):
     """
     Calculate total sales grouped by year.
     """
-    return df.groupby('YEAR_ID')['SALES'].sum()
+    return df.groupby('YEAR_ID', observed=True)['SALES'].sum()
 
 
+@memoize
 def sales_by_year_and_quarter(df):
     """
     Calculate total sales grouped by year and quarter.
     """
-    return df.groupby(['YEAR_ID', 'QTR_ID'])['SALES'].sum()
+    return df.groupby(['YEAR_ID', 'QTR_ID'], observed=True)['SALES'].sum()
+
+def best_quarters(year_quarter_sales):
+    """
+    Pick the best quarter of each year from sales grouped by year and quarter.
+    """
+    return year_quarter_sales.groupby(level=0).idxmax().apply(lambda t: int(t[1]))
+
+def worst_quarters(year_quarter_sales):
+    """
+    Pick the worst quarter of each year from sales grouped by year and quarter.
+    """
+    return year_quarter_sales.groupby(level=0).idxmin().apply(lambda t: int(t[1]))
 
+@memoize
 def best_quarter_each_year(df):
     """
     Calculate the best quarter for each year.
     """
-    s = sales_by_year_and_quarter(df)
-    return s.groupby(level=0).idxmax().apply(lambda t: int(t[1]))
+    return best_quarters(sales_by_year_and_quarter(df))
 
+@memoize
 def worst_quarter_each_year(df):
     """
     Calculate the worst quarter for each year.
     """
-    s = sales_by_year_and_quarter(df)
-    return s.groupby(level=0).idxmin().apply(lambda t: int(t[1]))
+    return worst_quarters(sales_by_year_and_quarter(df))
 
+@memoize
 def average_sales_per_order_line(df):
     """
     Calculate the average sales amount per order line.
@@ -62,6 +87,7 @@ def large_orders(df, threshold):
     return df[df['SALES'] > threshold]
 
 
+@memoize
 def total_orders(df):
     """
     Count the total number of unique orders.
@@ -69,6 +95,7 @@ def total_orders(df):
     return df['ORDERNUMBER'].nunique()
 
 
+@memoize
 def total_customers(df):
     """
     Count the total number of unique customers.
@@ -76,6 +103,7 @@ def total_customers(df):
     return df['CUSTOMERNAME'].nunique()
 
 
+@memoize
 def total_products(df):
     """
     Count the total number of unique products.
@@ -90,37 +118,42 @@ def filter_by_status(df, status: str):
     return df[df["STATUS"] == status]
 
 
+@memoize
 def sort_products_by_sales(df):
     """
     Sort products by total sales in descending order.
     """
-    return df.groupby("PRODUCTLINE")["SALES"].sum().sort_values(ascending=False)
+    return df.groupby("PRODUCTLINE", observed=True)["SALES"].sum().sort_values(ascending=False)
 
 
+@memoize
 def sort_countries_by_sales(df):
     """
     Sort countries by sales values per order in descending order.
     """
-    return df.groupby("COUNTRY")["SALES"].sum().sort_values(ascending=False)
+    return df.groupby("COUNTRY", observed=True)["SALES"].sum().sort_values(ascending=False)
 
 
+@memoize
 def sort_products_by_quantity(df):
     """
     Sort products by total quantity ordered in descending order.
     """
-    qty = df.groupby("PRODUCTLINE")["QUANTITYORDERED"].sum()
+    qty = df.groupby("PRODUCTLINE", observed=True)["QUANTITYORDERED"].sum()
     return qty.sort_values(ascending=False)
 
 
+@memoize
 def sales_by_customer(df):
     """
     Calculate total sales grouped by customer.
     """
-    return df.groupby("CUSTOMERNAME")["SALES"].sum()
+    return df.groupby("CUSTOMERNAME", observed=True)["SALES"].sum()
 
 
+@memoize
 def total_orders_per_customer(df):
     """
     Calculate total orders grouped by customer.
     """
-    return df.groupby("CUSTOMERNAME")["ORDERNUMBER"].nunique()
\ No newline at end of file
+    return df.groupby("CUSTOMERNAME", observed=True)["ORDERNUMBER"].nunique()
\ No newline at end of file
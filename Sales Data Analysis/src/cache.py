@@ -0,0 +1,208 @@
+"""Memoization of analysis results per dataset, with LRU eviction under a memory budget."""
+
+import functools
+import sys
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+# rows measured to estimate the size of a large result
+_SAMPLE_ROWS = 1000
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'entries', 'nbytes'])
+
+
+def _column_arrays(df):
+    """
+    The arrays holding the DataFrame's columns. pandas replaces them when columns are assigned,
+    added or dropped, and on in-place edits of arrays that are shared (see _Dataset),
+    so holding on to them and comparing by identity shows whether the data changed.
+    """
+    return tuple(df._mgr.arrays)
+
+
+def _size_of(result):
+    """
+    Estimate the memory held by a cached result in bytes. Measuring strings means visiting every one of them,
+    so large results are estimated from their first rows.
+    """
+    if isinstance(result, (pd.Series, pd.DataFrame)):
+        if len(result) > _SAMPLE_ROWS:
+            return int(_size_of(result.iloc[:_SAMPLE_ROWS]) * len(result) / _SAMPLE_ROWS)
+        usage = result.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    return sys.getsizeof(result)
+
+
+def _shared(result):
+    """
+    What a cached result is handed out as: pandas objects as shallow copies, which under copy-on-write
+    copy their data the first time the caller changes them, so the cached result stays as it was.
+    """
+    if isinstance(result, (pd.Series, pd.DataFrame)):
+        return result.copy(deep=False)
+    return result
+
+
+class _Dataset:
+    """
+    What the cache knows about one DataFrame: its current version and what its data looked like then.
+
+    A shallow copy of the DataFrame is kept with it. Its columns share their arrays with the DataFrame, so under
+    copy-on-write an in-place edit (df.loc[i, col] = x, df.update(other)) gives the edited column a new array
+    instead of writing to the shared one, and the identity comparison catches the edit.
+    """
+
+    def __init__(self, df):
+        self.version = 0
+        self.update(df)
+
+    def update(self, df):
+        """
+        Remember what the DataFrame's data looks like now.
+        """
+        self._snapshot = df.copy(deep=False)
+        self.signature = self.signature_of(df)
+
+    @staticmethod
+    def signature_of(df):
+        return df.shape, tuple(df.columns), _column_arrays(df)
+
+    def changed(self, df):
+        shape, columns, arrays = self.signature_of(df)
+        old_shape, old_columns, old_arrays = self.signature
+        return (shape != old_shape or columns != old_columns
+                or any(new is not old for new, old in zip(arrays, old_arrays)))
+
+
+class ResultCache:
+    """
+    LRU cache for functions of a DataFrame, keyed on the DataFrame's identity and version
+    plus the function and its other arguments.
+
+    The version goes up whenever the DataFrame's data changes: columns assigned, added or dropped, rows added
+    or removed, values edited in place. Results of older versions are dropped then, and so are the results of
+    a DataFrame that is garbage collected. Writing to a column's underlying numpy array directly
+    (df['SALES'].to_numpy()[0] = x) bypasses pandas, so call invalidate(df) after that.
+
+    The least recently used results are evicted once their estimated size exceeds `max_bytes`;
+    a result larger than that is returned but not kept. Every caller gets its own shallow copy of a cached
+    Series or DataFrame, so changing it does not change what later calls return.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> (result, size), least recently used first
+        self._datasets = {} # id(df) -> _Dataset
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def memoize(self, fn):
+        """
+        Decorator caching fn(df, *args, **kwargs). Calls with unhashable arguments are not cached.
+        """
+        @functools.wraps(fn)
+        def wrapper(df, *args, **kwargs):
+            try:
+                key = (id(df), self.version(df), fn, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return fn(df, *args, **kwargs)
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return _shared(entry[0])
+                self._misses += 1
+
+            # computed outside the lock, so one slow function does not hold up the others
+            result = fn(df, *args, **kwargs)
+            self._store(key, result)
+            return _shared(result)
+
+        wrapper.cache = self
+        return wrapper
+
+    def version(self, df):
+        """
+        The current version of a DataFrame, starting at 0 the first time the cache sees it.
+        """
+        with self._lock:
+            dataset = self._datasets.get(id(df))
+            if dataset is None:
+                dataset = self._datasets[id(df)] = _Dataset(df)
+                # the id may be reused by another object once this one is gone
+                weakref.finalize(df, self._forget, id(df))
+            elif dataset.changed(df):
+                self._drop(id(df))
+                dataset.version += 1
+                dataset.update(df)
+            return dataset.version
+
+    def invalidate(self, df=None):
+        """
+        Drop the results of one DataFrame (e.g. after writing to its numpy arrays), or of all of them.
+        """
+        with self._lock:
+            if df is None:
+                self.clear()
+                return
+            dataset = self._datasets.get(id(df))
+            if dataset is not None:
+                self._drop(id(df))
+                dataset.version += 1
+                dataset.update(df)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._nbytes)
+
+    def _store(self, key, result):
+        size = _size_of(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # the data may have changed while the result was computed
+            dataset = self._datasets.get(key[0])
+            if dataset is None or dataset.version != key[1]:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._entries[key] = (result, size)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_size
+                self._evictions += 1
+
+    def _drop(self, dataset_id):
+        """
+        Remove every result of one DataFrame. Called with the lock held.
+        """
+        for key in [key for key in self._entries if key[0] == dataset_id]:
+            self._nbytes -= self._entries.pop(key)[1]
+
+    def _forget(self, dataset_id):
+        with self._lock:
+            self._drop(dataset_id)
+            self._datasets.pop(dataset_id, None)
+
+
+# shared by analysis_utils and the aggregation engine
+default_cache = ResultCache()
+memoize = default_cache.memoize
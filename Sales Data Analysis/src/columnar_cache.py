@@ -0,0 +1,174 @@
+"""On-disk columnar cache of the loaded sales data, so repeated runs skip parsing the CSV."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.loader import columns_for, load_sales_data
+
+# bump when the layout of the cache or the loader's dtypes change, older caches are then rebuilt
+FORMAT_VERSION = 1
+# the directory next to the CSV holding the caches of the files in it, unless one is given
+DEFAULT_DIRECTORY = '.columnar_cache'
+_METADATA = 'metadata.json'
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_hash(path):
+    """
+    SHA-256 of a file's contents, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_key(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': str(Path(csv_path).resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class ColumnarCache:
+    """
+    Cache of the sales data as loaded by src.loader (the report's columns, compact dtypes), one .npy file per
+    column: numbers as they are, categories as their integer codes, with the category labels in the metadata.
+    Loading maps the column files into memory instead of reading them, so only the pages the report touches
+    are read, and only the columns the requested reports need are opened. The frame can be changed like a
+    loaded one; the changes stay in memory.
+
+    A cache is keyed on the CSV's resolved path, and is valid for the size, modification time and SHA-256 of
+    the file it was built from. When the size or modification time differ, the file is hashed: unchanged
+    contents (e.g. a copy or a touch) keep the cache, anything else rebuilds it. With verify=True the hash is
+    checked on every load, catching edits that keep both size and modification time.
+    """
+
+    def __init__(self, directory=None, verify=False):
+        self.directory = None if directory is None else Path(directory)
+        self.verify = verify
+
+    def path_for(self, csv_path):
+        """
+        The directory holding the cache of a CSV file.
+        """
+        csv_path = Path(csv_path).resolve()
+        directory = csv_path.parent / DEFAULT_DIRECTORY if self.directory is None else self.directory
+        name = hashlib.sha256(str(csv_path).encode()).hexdigest()[:16]
+        return directory / f"{csv_path.stem}-{name}"
+
+    def is_fresh(self, csv_path):
+        """
+        Whether the cache of the CSV exists and matches its current contents.
+        """
+        return self._fresh_metadata(csv_path) is not None
+
+    def load(self, csv_path, reports=None):
+        """
+        The sales data of the CSV as load_sales_data(csv_path, reports) returns it, from the cache,
+        which is built first if it is missing or stale.
+        """
+        metadata = self._fresh_metadata(csv_path)
+        if metadata is None:
+            metadata = self.build(csv_path)
+        return self._read(self.path_for(csv_path), metadata, columns_for(reports))
+
+    def build(self, csv_path):
+        """
+        Load the CSV and write its cache, replacing any older one. Returns the cache's metadata.
+        """
+        source = _source_key(csv_path)
+        source['sha256'] = file_hash(csv_path)
+        df = load_sales_data(csv_path)
+        metadata = {'format': FORMAT_VERSION, 'source': source, 'rows': len(df), 'columns': {}}
+
+        path = self.path_for(csv_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # written next to the cache and moved into place, so a failed build never leaves a partial cache
+        staging = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}-"))
+        try:
+            for column in df.columns:
+                values = df[column]
+                if not pd.api.types.is_numeric_dtype(values):
+                    # strings the loader kept as they are (e.g. text in a numeric column) are stored as categories
+                    values = values.astype('category')
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    np.save(staging / f"{column}.npy", values.cat.codes.to_numpy())
+                    metadata['columns'][column] = {'categories': values.cat.categories.tolist()}
+                else:
+                    np.save(staging / f"{column}.npy", values.to_numpy())
+                    metadata['columns'][column] = {}
+            (staging / _METADATA).write_text(json.dumps(metadata))
+            return self._publish(csv_path, staging, metadata)
+        finally:
+            # left over when the build failed or another process published the same cache first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _publish(self, csv_path, staging, metadata):
+        """
+        Move a built cache into place and return its metadata. A directory cannot replace a non-empty one,
+        so an old cache is deleted first; should another process building the same CSV publish its cache
+        in the meantime, that one is used instead and `staging` is left for the caller to delete.
+        """
+        path = self.path_for(csv_path)
+        while True:
+            try:
+                os.replace(staging, path)
+                return metadata
+            except OSError:
+                if not path.exists():
+                    raise
+            fresh = self._fresh_metadata(csv_path)
+            if fresh is not None:
+                return fresh
+            self.invalidate(csv_path)
+
+    def invalidate(self, csv_path):
+        """
+        Delete the cache of a CSV file, if there is one.
+        """
+        shutil.rmtree(self.path_for(csv_path), ignore_errors=True)
+
+    def _fresh_metadata(self, csv_path):
+        """
+        The metadata of the CSV's cache if it is up to date, else None. Refreshes the recorded size and
+        modification time when only those changed.
+        """
+        path = self.path_for(csv_path)
+        try:
+            metadata = json.loads((path / _METADATA).read_text())
+        except (OSError, ValueError):
+            return None
+        if metadata.get('format') != FORMAT_VERSION or set(metadata['columns']) != set(columns_for()):
+            return None
+
+        source = _source_key(csv_path)
+        recorded = metadata['source']
+        if all(source[key] == recorded[key] for key in source) and not self.verify:
+            return metadata
+        if source['size'] != recorded['size'] or file_hash(csv_path) != recorded['sha256']:
+            return None
+        if source['mtime_ns'] != recorded['mtime_ns']:
+            recorded.update(source)
+            (path / _METADATA).write_text(json.dumps(metadata))
+        return metadata
+
+    @staticmethod
+    def _read(path, metadata, columns):
+        data = {}
+        # in the CSV's order, like read_csv gives them
+        for column in (column for column in metadata['columns'] if column in columns):
+            # mapped copy-on-write: changing the frame copies the pages it touches and never writes to the cache;
+            # an empty array cannot be memory mapped
+            values = np.load(path / f"{column}.npy", mmap_mode='c' if metadata['rows'] else None).view(np.ndarray)
+            categories = metadata['columns'][column].get('categories')
+            if categories is not None:
+                values = pd.Categorical.from_codes(values, categories=categories)
+            data[column] = values
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,89 @@
+"""Schema-aware loading of the sales CSV: only the columns the requested reports read, in compact dtypes."""
+
+from collections import namedtuple
+
+import pandas as pd
+
+# rows read with default dtypes to estimate what loading the whole file that way would take
+_SAMPLE_ROWS = 1000
+
+# the columns each report of src.analysis reads
+REPORT_COLUMNS = {
+    'overall': ['SALES', 'ORDERNUMBER', 'CUSTOMERNAME', 'PRODUCTLINE'],
+    'country': ['SALES', 'COUNTRY'],
+    'product': ['SALES', 'PRODUCTLINE', 'QUANTITYORDERED'],
+    'yearly': ['SALES', 'YEAR_ID', 'QTR_ID'],
+    'order_status': ['SALES', 'STATUS'],
+    'customer': ['SALES', 'CUSTOMERNAME'],
+}
+
+# low-cardinality strings, stored once per distinct value with a small integer code per row
+CATEGORY_COLUMNS = ['STATUS', 'PRODUCTLINE', 'COUNTRY', 'CUSTOMERNAME', 'DEALSIZE', 'TERRITORY']
+# whole numbers, downcast to the smallest integer type holding them; SALES and prices stay float64,
+# float32 would change the cents of the totals
+INTEGER_COLUMNS = ['ORDERNUMBER', 'QUANTITYORDERED', 'ORDERLINENUMBER', 'QTR_ID', 'MONTH_ID', 'YEAR_ID', 'MSRP']
+
+LoadStats = namedtuple('LoadStats', ['rows', 'columns', 'nbytes', 'default_nbytes'])
+
+
+def columns_for(reports=None):
+    """
+    The columns the given reports (names of REPORT_COLUMNS) read, each once. All the reports if None.
+    """
+    reports = REPORT_COLUMNS if reports is None else reports
+    unknown = set(reports) - set(REPORT_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown reports: {', '.join(sorted(unknown))}")
+    return list(dict.fromkeys(column for report in reports for column in REPORT_COLUMNS[report]))
+
+
+def optimize_dtypes(df):
+    """
+    Convert the known low-cardinality string columns to category and downcast the integer columns.
+    Columns the frame does not have are skipped; integer columns with missing values are left as they are.
+    """
+    df = df.copy(deep=False)
+    for column in df.columns:
+        if column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column in INTEGER_COLUMNS and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def load_sales_data(csv_path, reports=None):
+    """
+    Load the sales CSV with only the columns the given reports read (all reports if None),
+    low-cardinality strings as category and integers downcast.
+    """
+    columns = columns_for(reports)
+    dtypes = {column: 'category' for column in columns if column in CATEGORY_COLUMNS}
+    df = pd.read_csv(csv_path, encoding='latin-1', usecols=columns, dtype=dtypes)
+    return optimize_dtypes(df)
+
+
+def memory_usage(df):
+    """
+    Memory held by a DataFrame in bytes, counting the strings themselves.
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def load_stats(csv_path, df):
+    """
+    Memory of a DataFrame from load_sales_data against what loading every column of the file with
+    default dtypes would take, estimated from its first rows.
+    """
+    sample = pd.read_csv(csv_path, encoding='latin-1', nrows=_SAMPLE_ROWS)
+    default_nbytes = int(memory_usage(sample) * len(df) / len(sample)) if len(sample) else 0
+    return LoadStats(len(df), len(df.columns), memory_usage(df), default_nbytes)
+
+
+def format_load_stats(stats):
+    """
+    One line describing the memory saved at load time.
+    """
+    mb = 1024 * 1024
+    saved = 1 - stats.nbytes / stats.default_nbytes if stats.default_nbytes else 0.0
+    return (f"Loaded {stats.rows:,} rows x {stats.columns} columns in {stats.nbytes / mb:.1f} MB "
+            f"instead of about {stats.default_nbytes / mb:.1f} MB ({saved:.0%} saved)")
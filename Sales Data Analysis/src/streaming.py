@@ -0,0 +1,294 @@
+"""Streaming mode: the report's aggregates computed from a CSV read in chunks, with memory independent of the row count."""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.analysis_utils import best_quarters, worst_quarters
+from src.loader import columns_for
+
+# the only columns the report reads
+REPORT_COLUMNS = columns_for()
+
+# candidate values the exact percentile search may hold in memory at once
+PERCENTILE_CANDIDATES = 100_000
+# bins per refinement pass of the percentile search
+PERCENTILE_BINS = 1024
+# the first pass counts the sales by the top bits of their IEEE 754 representation: sign, exponent and
+# the top 6 mantissa bits, i.e. 64 buckets per power of two, whatever the range of the values
+HISTOGRAM_BITS = 18
+_SIGN_BIT = np.uint64(1 << 63)
+_HISTOGRAM_SHIFT = np.uint64(64 - HISTOGRAM_BITS)
+
+
+def read_chunks(csv_path, chunksize, columns=None):
+    """
+    Read a sales CSV in DataFrames of at most `chunksize` rows, keeping only `columns`.
+    """
+    return pd.read_csv(csv_path, encoding='latin-1', usecols=columns, chunksize=chunksize)
+
+
+def _add_series(a, b):
+    """
+    Add two grouped totals, keeping keys that appear in only one of them.
+    """
+    if a is None:
+        return b
+    return pd.concat([a, b]).groupby(level=list(range(a.index.nlevels))).sum()
+
+
+def _distinct(series):
+    return np.unique(series.dropna().to_numpy())
+
+
+def _histogram_buckets(values):
+    """
+    Bucket of every value, in the same order as the values: flipping the sign bit of positive numbers and
+    every bit of negative ones turns the float order into the unsigned integer order of the bits.
+    """
+    bits = (np.asarray(values, dtype=np.float64) + 0.0).view(np.uint64) # + 0.0 turns -0.0 into 0.0
+    keys = np.where(bits & _SIGN_BIT, ~bits, bits | _SIGN_BIT)
+    return (keys >> _HISTOGRAM_SHIFT).astype(np.int64)
+
+
+def _bucket_bounds(first, last):
+    """
+    The smallest value of bucket `first` and the largest value of bucket `last`.
+    """
+    keys = np.array([first << int(_HISTOGRAM_SHIFT), ((last + 1) << int(_HISTOGRAM_SHIFT)) - 1], dtype=np.uint64)
+    bits = np.where(keys & _SIGN_BIT, keys & ~_SIGN_BIT, ~keys)
+    low, high = bits.view(np.float64)
+    return low, high
+
+
+class PartialAggregates:
+    """
+    Mergeable aggregates of part of the sales data: sums, counts and grouped totals, which add up,
+    and the distinct values behind the distinct counts, which are merged as sorted arrays.
+
+    Memory grows with the number of countries, product lines, quarters, customers and orders,
+    never with the number of rows. The distinct values are kept exactly, since the report prints exact counts,
+    so the distinct orders are as many as the file has orders.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.sales_count = 0 # rows with a SALES value
+        self.sales_sum = 0.0
+        self.sales_min = math.inf
+        self.sales_max = -math.inf
+        self.sales_histogram = np.zeros(1 << HISTOGRAM_BITS, dtype=np.int64)
+        self.sales_by_country = None
+        self.product_totals = None
+        self.sales_by_year_and_quarter = None
+        self.sales_by_customer = None
+        self.status_totals = None
+        self.orders = np.array([], dtype=np.int64)
+        self.customers = np.array([], dtype=object)
+        self.products = np.array([], dtype=object)
+
+    @classmethod
+    def from_chunk(cls, df):
+        partial = cls()
+        sales = df['SALES']
+        partial.rows = len(df)
+        partial.sales_count = int(sales.count())
+        partial.sales_sum = sales.sum()
+        if partial.sales_count:
+            partial.sales_min = sales.min()
+            partial.sales_max = sales.max()
+            partial.sales_histogram = np.bincount(_histogram_buckets(sales.dropna().to_numpy()), minlength=1 << HISTOGRAM_BITS)
+        partial.sales_by_country = df.groupby('COUNTRY')['SALES'].sum()
+        partial.product_totals = df.groupby('PRODUCTLINE')[['SALES', 'QUANTITYORDERED']].sum()
+        partial.sales_by_year_and_quarter = df.groupby(['YEAR_ID', 'QTR_ID'])['SALES'].sum()
+        partial.sales_by_customer = df.groupby('CUSTOMERNAME')['SALES'].sum()
+        partial.status_totals = df.groupby('STATUS')['SALES'].agg(['size', 'sum'])
+        partial.orders = _distinct(df['ORDERNUMBER'])
+        partial.customers = _distinct(df['CUSTOMERNAME'])
+        partial.products = _distinct(df['PRODUCTLINE'])
+        return partial
+
+    def merge(self, other):
+        """
+        Combine two partial aggregates into the aggregates of both parts.
+        Takes time proportional to the distinct keys of both, e.g. the orders seen so far.
+        """
+        merged = PartialAggregates()
+        merged.rows = self.rows + other.rows
+        merged.sales_count = self.sales_count + other.sales_count
+        merged.sales_sum = self.sales_sum + other.sales_sum
+        merged.sales_min = min(self.sales_min, other.sales_min)
+        merged.sales_max = max(self.sales_max, other.sales_max)
+        merged.sales_histogram = self.sales_histogram + other.sales_histogram
+        for name in ('sales_by_country', 'product_totals', 'sales_by_year_and_quarter', 'sales_by_customer', 'status_totals'):
+            setattr(merged, name, _add_series(getattr(self, name), getattr(other, name)))
+        merged.orders = np.union1d(self.orders, other.orders)
+        merged.customers = np.union1d(self.customers, other.customers)
+        merged.products = np.union1d(self.products, other.products)
+        return merged
+
+
+class StreamingAggregates:
+    """
+    The aggregates of a sales CSV, computed chunk by chunk, with the interface of SalesAggregates,
+    so every analysis function takes it as `aggregates` (with df=None).
+
+    One pass builds PartialAggregates of every chunk and merges them. Percentiles are exact and need
+    extra passes reading only the SALES column: the histogram of the first pass gives the value range
+    holding the wanted ranks, further passes narrow it down with finer histograms if it holds more than
+    PERCENTILE_CANDIDATES values, and a last pass collects and sorts the values in it. On ordinary data
+    that is one extra pass.
+    Peak memory is one chunk plus the merged aggregates, which are O(number of distinct keys): the grouped totals
+    and the distinct orders, customers and product lines. Merging a chunk into them re-merges that state, so each
+    merge takes time proportional to the keys seen so far; the rows themselves are never held beyond their chunk.
+    """
+
+    def __init__(self, csv_path, chunksize=100_000):
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        self.csv_path = csv_path
+        self.chunksize = chunksize
+        totals = PartialAggregates()
+        for chunk in read_chunks(csv_path, chunksize, REPORT_COLUMNS):
+            totals = totals.merge(PartialAggregates.from_chunk(chunk))
+        self._totals = totals
+        # sorted values around the last computed percentile, (values below them, candidates, values above them)
+        self._candidates = None
+
+    @property
+    def total_sales(self):
+        return self._totals.sales_sum
+
+    @property
+    def average_sales(self):
+        return self._totals.sales_sum / self._totals.sales_count if self._totals.sales_count else math.nan
+
+    @property
+    def total_orders(self):
+        return len(self._totals.orders)
+
+    @property
+    def total_customers(self):
+        return len(self._totals.customers)
+
+    @property
+    def total_products(self):
+        return len(self._totals.products)
+
+    @property
+    def sales_by_country(self):
+        return self._totals.sales_by_country
+
+    @property
+    def countries_by_sales(self):
+        return self.sales_by_country.sort_values(ascending=False)
+
+    @property
+    def sales_by_product(self):
+        return self._totals.product_totals['SALES']
+
+    @property
+    def products_by_sales(self):
+        return self.sales_by_product.sort_values(ascending=False)
+
+    @property
+    def products_by_quantity(self):
+        return self._totals.product_totals['QUANTITYORDERED'].sort_values(ascending=False)
+
+    @property
+    def sales_by_year_and_quarter(self):
+        return self._totals.sales_by_year_and_quarter
+
+    @property
+    def sales_by_year(self):
+        return self.sales_by_year_and_quarter.groupby(level='YEAR_ID').sum()
+
+    @property
+    def best_quarter_each_year(self):
+        return best_quarters(self.sales_by_year_and_quarter)
+
+    @property
+    def worst_quarter_each_year(self):
+        return worst_quarters(self.sales_by_year_and_quarter)
+
+    def count_with_status(self, status):
+        """
+        Count the order lines with the given status (e.g., 'Shipped', 'Cancelled').
+        """
+        totals = self._totals.status_totals
+        return int(totals.at[status, 'size']) if status in totals.index else 0
+
+    def sales_with_status(self, status):
+        """
+        Total sales of the order lines with the given status.
+        """
+        totals = self._totals.status_totals
+        return totals.at[status, 'sum'] if status in totals.index else 0.0
+
+    @property
+    def sales_by_customer(self):
+        return self._totals.sales_by_customer
+
+    def _sales_chunks(self):
+        for chunk in read_chunks(self.csv_path, self.chunksize, ['SALES']):
+            values = chunk['SALES'].to_numpy()
+            yield values[~np.isnan(values)]
+
+    def sales_percentile(self, percentile):
+        """
+        Exact percentile of the order line sales, interpolated linearly like pandas' quantile.
+        """
+        n = self._totals.sales_count
+        if n == 0:
+            return math.nan
+        position = (n - 1) * percentile
+        rank = math.floor(position)
+        wanted = [rank, min(rank + 1, n - 1)]
+
+        # [low, high] holds the wanted ranks, `below` values are smaller than low
+        cumulative = np.cumsum(self._totals.sales_histogram)
+        first, last = np.searchsorted(cumulative, wanted, side='right')
+        below = int(cumulative[first - 1]) if first else 0
+        inside = int(cumulative[last]) - below
+        low, high = _bucket_bounds(int(first), int(last))
+        low, high = max(low, self._totals.sales_min), min(high, self._totals.sales_max)
+        while inside > PERCENTILE_CANDIDATES and low < high:
+            edges = np.linspace(low, high, PERCENTILE_BINS + 1)
+            counts = np.zeros(PERCENTILE_BINS, dtype=np.int64)
+            for values in self._sales_chunks():
+                values = values[(values >= low) & (values <= high)]
+                bins = np.minimum(np.searchsorted(edges, values, side='right') - 1, PERCENTILE_BINS - 1)
+                counts += np.bincount(bins, minlength=PERCENTILE_BINS)
+            cumulative = below + np.cumsum(counts)
+            first, last = np.searchsorted(cumulative, wanted, side='right')
+            below = int(cumulative[first - 1]) if first else below
+            inside = int(cumulative[last]) - below
+            # the last bin includes its upper edge, the others end just below theirs
+            bounds = low, high
+            low = edges[first]
+            high = edges[last + 1] if last == PERCENTILE_BINS - 1 else np.nextafter(edges[last + 1], -np.inf)
+            # the two wanted values may be all that is left, yet more than a tiny PERCENTILE_CANDIDATES
+            if (low, high) == bounds:
+                break
+
+        if low == high:
+            # every value left is the same, no need to collect them
+            self._candidates = (below, np.array([low]), n - below - inside)
+            return low
+
+        candidates = np.sort(np.concatenate([values[(values >= low) & (values <= high)] for values in self._sales_chunks()]))
+        self._candidates = (below, candidates, n - below - len(candidates))
+        lower, upper = candidates[wanted[0] - below], candidates[wanted[1] - below]
+        return lower + (upper - lower) * (position - rank)
+
+    def count_above(self, threshold):
+        """
+        Count the order lines with sales above the threshold. A threshold among the values kept from the last
+        percentile search, e.g. that percentile itself, is answered without reading the file again.
+        """
+        if self._candidates is not None:
+            below, candidates, above = self._candidates
+            if len(candidates) and candidates[0] <= threshold <= candidates[-1]:
+                return above + int(len(candidates) - np.searchsorted(candidates, threshold, side='right'))
+        return int(sum((values > threshold).sum() for values in self._sales_chunks()))
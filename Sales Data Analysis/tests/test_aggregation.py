@@ -0,0 +1,90 @@
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregation import SalesAggregates
+from src.analysis_utils import (
+    total_sales,
+    sales_by_country,
+    sales_by_product,
+    sales_by_year,
+    sales_by_year_and_quarter,
+    best_quarter_each_year,
+    worst_quarter_each_year,
+    filter_by_status,
+    sort_products_by_sales,
+    sort_countries_by_sales,
+    sort_products_by_quantity,
+    sales_by_customer,
+)
+
+
+class TestSalesAggregates(unittest.TestCase):
+    """Test cases for the aggregation engine."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.df = pd.DataFrame({
+            'ORDERNUMBER': [10107, 10121, 10134, 10145, 10159, 10159],
+            'SALES': [2871.0, 2765.9, 3884.34, 3746.7, 5205.27, 1000.0],
+            'COUNTRY': ['USA', 'France', 'France', 'USA', 'USA', 'Spain'],
+            'PRODUCTLINE': ['Motorcycles', 'Motorcycles', 'Planes', 'Motorcycles', 'Planes', 'Ships'],
+            'YEAR_ID': [2003, 2003, 2003, 2004, 2004, 2004],
+            'QTR_ID': [1, 2, 3, 1, 2, 2],
+            'STATUS': ['Shipped', 'Shipped', 'Shipped', 'Cancelled', 'Shipped', 'Shipped'],
+            'QUANTITYORDERED': [30, 34, 41, 45, 49, 10],
+            'CUSTOMERNAME': ['Customer1', 'Customer2', 'Customer3', 'Customer1', 'Customer4', 'Customer4']
+        })
+        self.aggregates = SalesAggregates(self.df)
+
+    def test_matches_the_analysis_functions(self):
+        """Test that every cached aggregate equals its analysis_utils counterpart."""
+        a = self.aggregates
+        pd.testing.assert_series_equal(a.sales_by_country, sales_by_country(self.df))
+        pd.testing.assert_series_equal(a.countries_by_sales, sort_countries_by_sales(self.df))
+        pd.testing.assert_series_equal(a.sales_by_product, sales_by_product(self.df))
+        pd.testing.assert_series_equal(a.products_by_sales, sort_products_by_sales(self.df))
+        pd.testing.assert_series_equal(a.products_by_quantity, sort_products_by_quantity(self.df))
+        pd.testing.assert_series_equal(a.sales_by_year_and_quarter, sales_by_year_and_quarter(self.df))
+        pd.testing.assert_series_equal(a.sales_by_year, sales_by_year(self.df))
+        pd.testing.assert_series_equal(a.best_quarter_each_year, best_quarter_each_year(self.df))
+        pd.testing.assert_series_equal(a.worst_quarter_each_year, worst_quarter_each_year(self.df))
+        pd.testing.assert_series_equal(a.sales_by_customer, sales_by_customer(self.df))
+        self.assertAlmostEqual(a.total_sales, total_sales(self.df), places=2)
+
+    def test_status_totals(self):
+        """Test counts and sales by status, including a status that does not occur."""
+        shipped = filter_by_status(self.df, 'Shipped')
+        self.assertEqual(self.aggregates.count_with_status('Shipped'), len(shipped))
+        self.assertAlmostEqual(self.aggregates.sales_with_status('Shipped'), total_sales(shipped), places=2)
+        self.assertEqual(self.aggregates.count_with_status('On Hold'), 0)
+        self.assertEqual(self.aggregates.sales_with_status('On Hold'), 0.0)
+
+    def test_counts(self):
+        """Test the distinct counts and the large order count."""
+        self.assertEqual(self.aggregates.total_orders, 5)
+        self.assertEqual(self.aggregates.total_customers, 4)
+        self.assertEqual(self.aggregates.total_products, 3)
+        self.assertEqual(self.aggregates.count_above(3000), 3)
+
+    def test_each_group_by_runs_once(self):
+        """Test that repeated and derived lookups reuse the cached group-by."""
+        with patch.object(pd.DataFrame, 'groupby', autospec=True, side_effect=pd.DataFrame.groupby) as groupby:
+            aggregates = SalesAggregates(self.df)
+            aggregates.products_by_sales
+            aggregates.sales_by_product
+            aggregates.products_by_quantity
+            aggregates.best_quarter_each_year
+            aggregates.worst_quarter_each_year
+            aggregates.sales_by_year
+        # one group-by for the product lines, one for year x quarter
+        self.assertEqual(groupby.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
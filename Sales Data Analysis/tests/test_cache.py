@@ -0,0 +1,179 @@
+import gc
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregation import SalesAggregates
+from src.analysis_utils import filter_by_status, sales_by_country, total_sales
+from src.cache import ResultCache, default_cache
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the memoization layer."""
+
+    def setUp(self):
+        """Set up test data and a cache with a counting function."""
+        self.df = pd.DataFrame({
+            'SALES': [2871.0, 2765.9, 3884.34, 3746.7, 5205.27],
+            'COUNTRY': ['USA', 'France', 'France', 'USA', 'USA'],
+        })
+        self.cache = ResultCache()
+        self.calls = 0
+
+        def by_country(df, column='SALES'):
+            self.calls += 1
+            return df.groupby('COUNTRY')[column].sum()
+
+        self.by_country = self.cache.memoize(by_country)
+
+    def test_repeated_calls_hit_the_cache(self):
+        """Test that only the first call computes."""
+        first = self.by_country(self.df)
+        pd.testing.assert_series_equal(self.by_country(self.df), first)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.stats()[:3], (1, 1, 0))
+
+    def test_arguments_are_part_of_the_key(self):
+        """Test that other arguments and other DataFrames get their own entries."""
+        self.by_country(self.df)
+        self.by_country(self.df, column='SALES')
+        self.by_country(self.df.copy())
+        self.assertEqual(self.calls, 3)
+
+    def test_column_assignment_invalidates(self):
+        """Test that assigning a column, or adding rows, changes the version."""
+        self.by_country(self.df)
+        self.df['SALES'] = self.df['SALES'] * 2
+        self.assertAlmostEqual(self.by_country(self.df)['France'], 2 * (2765.9 + 3884.34), places=2)
+
+        self.df.loc[len(self.df)] = [1.0, 'Spain']
+        self.assertIn('Spain', self.by_country(self.df).index)
+        self.assertEqual(self.calls, 3)
+
+    def test_in_place_edits_invalidate(self):
+        """Test that values edited in place through pandas change the version."""
+        self.by_country(self.df)
+        self.df.loc[0, 'SALES'] = 100.0
+        self.assertAlmostEqual(self.by_country(self.df)['USA'], 100.0 + 3746.7 + 5205.27, places=2)
+
+        self.df.update(pd.DataFrame({'SALES': [1.0]}, index=[1]))
+        self.assertAlmostEqual(self.by_country(self.df)['France'], 1.0 + 3884.34, places=2)
+        self.assertEqual(self.calls, 3)
+
+    def test_invalidate_after_writing_the_arrays(self):
+        """Test that a write bypassing pandas is picked up after invalidate()."""
+        self.by_country(self.df)
+        values = self.df['SALES'].to_numpy()
+        values.flags.writeable = True
+        values[0] = 0.0
+        self.cache.invalidate(self.df)
+        self.assertAlmostEqual(self.by_country(self.df)['USA'], 3746.7 + 5205.27, places=2)
+        self.assertEqual(self.calls, 2)
+
+    def test_callers_cannot_change_cached_results(self):
+        """Test that changing a returned result leaves what later calls return alone."""
+        result = self.by_country(self.df)
+        result['USA'] = 0.0
+        result *= 10
+        self.assertAlmostEqual(self.by_country(self.df)['USA'], 2871.0 + 3746.7 + 5205.27, places=2)
+        self.assertEqual(self.calls, 1)
+
+    def test_lru_eviction_under_memory_budget(self):
+        """Test that the least recently used results are evicted first."""
+        frames = [self.df.copy() for _ in range(3)]
+        size = self.by_country(frames[0]).memory_usage(deep=True)
+        self.cache.max_bytes = 2 * size
+
+        self.by_country(frames[1])
+        self.by_country(frames[0]) # frames[1] is now the least recently used
+        self.by_country(frames[2])
+        self.assertEqual(self.cache.stats().evictions, 1)
+        self.assertLessEqual(self.cache.stats().nbytes, self.cache.max_bytes)
+
+        self.by_country(frames[0])
+        self.assertEqual(self.calls, 3)
+        self.by_country(frames[1])
+        self.assertEqual(self.calls, 4)
+
+    def test_result_larger_than_budget_is_not_kept(self):
+        """Test that an oversized result is returned without being stored."""
+        self.cache.max_bytes = 10
+        self.by_country(self.df)
+        self.by_country(self.df)
+        self.assertEqual((self.calls, self.cache.stats().entries), (2, 0))
+
+    def test_collected_dataframe_is_forgotten(self):
+        """Test that the results of a garbage-collected DataFrame are dropped."""
+        df = self.df.copy()
+        self.by_country(df)
+        self.assertEqual(self.cache.stats().entries, 1)
+        del df
+        gc.collect()
+        self.assertEqual(self.cache.stats().entries, 0)
+
+    def test_unhashable_arguments_are_not_cached(self):
+        """Test that a call with unhashable arguments goes straight to the function."""
+        memoized = self.cache.memoize(lambda df, columns: df[columns].sum())
+        self.assertAlmostEqual(memoized(self.df, ['SALES'])['SALES'], self.df['SALES'].sum())
+        self.assertEqual(self.cache.stats().entries, 0)
+
+    def test_invalid_budget(self):
+        """Test that the memory budget must not be negative."""
+        with self.assertRaises(ValueError):
+            ResultCache(max_bytes=-1)
+
+
+class TestAnalysisCaching(unittest.TestCase):
+    """Test cases for the memoized analysis functions."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.df = pd.DataFrame({
+            'ORDERNUMBER': [10107, 10121, 10134],
+            'SALES': [2871.0, 2765.9, 3884.34],
+            'COUNTRY': ['USA', 'France', 'France'],
+            'PRODUCTLINE': ['Motorcycles', 'Planes', 'Planes'],
+            'YEAR_ID': [2003, 2003, 2004],
+            'QTR_ID': [1, 2, 1],
+            'STATUS': ['Shipped', 'Shipped', 'Cancelled'],
+            'QUANTITYORDERED': [30, 34, 41],
+            'CUSTOMERNAME': ['Customer1', 'Customer2', 'Customer1']
+        })
+        self.hits = default_cache.stats().hits
+
+    def test_analysis_functions_are_memoized(self):
+        """Test that analysis_utils returns the cached result for unchanged data."""
+        pd.testing.assert_series_equal(sales_by_country(self.df), sales_by_country(self.df))
+        self.assertEqual(default_cache.stats().hits - self.hits, 1)
+        first = total_sales(self.df)
+        self.df['SALES'] = self.df['SALES'] + 1
+        self.assertAlmostEqual(total_sales(self.df), first + 3, places=2)
+
+    def test_new_aggregates_reuse_the_group_bys(self):
+        """Test that a second report run on the same data does no group-by at all."""
+        report = lambda a: (a.sales_by_country, a.products_by_quantity, a.best_quarter_each_year, a.count_with_status('Shipped'),
+                            a.sales_by_customer, a.count_above(a.sales_percentile(0.75)))
+        first = report(SalesAggregates(self.df))
+        with patch.object(pd.DataFrame, 'groupby', autospec=True, side_effect=pd.DataFrame.groupby) as groupby:
+            second = report(SalesAggregates(self.df))
+        self.assertEqual(groupby.call_count, 0)
+        pd.testing.assert_series_equal(second[0], first[0])
+
+    def test_results_are_not_shared_with_callers(self):
+        """Test that changing a filtered frame or a grouped result does not change later calls."""
+        shipped = filter_by_status(self.df, 'Shipped')
+        shipped['SALES'] *= 10
+        self.assertEqual(filter_by_status(self.df, 'Shipped')['SALES'].tolist(), [2871.0, 2765.9])
+        by_country = sales_by_country(self.df)
+        by_country['USA'] = 0.0
+        self.assertEqual(sales_by_country(self.df)['USA'], 2871.0)
+        self.assertEqual(self.df['SALES'].tolist(), [2871.0, 2765.9, 3884.34])
+
+
+if __name__ == '__main__':
+    unittest.main()
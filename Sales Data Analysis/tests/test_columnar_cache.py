@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.columnar_cache
+from src.analysis_utils import sales_by_country
+from src.columnar_cache import ColumnarCache
+from src.loader import load_sales_data
+
+
+class TestColumnarCache(unittest.TestCase):
+    """Test cases for the on-disk columnar cache."""
+
+    def setUp(self):
+        """Write test data to a CSV file and give the cache its own directory."""
+        self.df = pd.DataFrame({
+            'ORDERNUMBER': [10107, 10121, 10134, 10145],
+            'QUANTITYORDERED': [30, 34, 41, 45],
+            'SALES': [2871.0, 2765.9, 3884.34, 3746.7],
+            'STATUS': ['Shipped', 'Shipped', 'Shipped', 'Cancelled'],
+            'QTR_ID': [1, 2, 3, 1],
+            'YEAR_ID': [2003, 2003, 2003, 2004],
+            'PRODUCTLINE': ['Motorcycles', 'Motorcycles', 'Planes', 'Motorcycles'],
+            'CUSTOMERNAME': ['Customer1', 'Customer2', 'Customer3', 'Customer1'],
+            'COUNTRY': ['USA', 'France', 'France', 'USA'],
+            'PHONE': ['2125557818'] * 4,
+        })
+        self._directory = tempfile.TemporaryDirectory()
+        self.csv_path = Path(self._directory.name) / "sales.csv"
+        self.df.to_csv(self.csv_path, index=False)
+        self.cache = ColumnarCache(Path(self._directory.name) / "cache")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def load_counting_builds(self, reports=None):
+        """Load through the cache, returning the frame and whether the CSV was parsed."""
+        with patch.object(src.columnar_cache, 'load_sales_data', wraps=load_sales_data) as parse:
+            df = self.cache.load(self.csv_path, reports)
+        return df, parse.called
+
+    def test_cached_frame_equals_the_loaded_one(self):
+        """Test that the cache gives back the loader's frame, for all or some reports, parsing the CSV once."""
+        df, parsed = self.load_counting_builds()
+        self.assertTrue(parsed)
+        pd.testing.assert_frame_equal(df, load_sales_data(self.csv_path))
+        for reports in (None, ['country', 'yearly']):
+            df, parsed = self.load_counting_builds(reports)
+            self.assertFalse(parsed)
+            pd.testing.assert_frame_equal(df, load_sales_data(self.csv_path, reports))
+
+    def test_rebuilt_when_the_csv_changes(self):
+        """Test that a changed CSV rebuilds the cache."""
+        self.cache.load(self.csv_path)
+        self.df.loc[0, 'SALES'] = 1000.0
+        self.df.to_csv(self.csv_path, index=False)
+        self.assertFalse(self.cache.is_fresh(self.csv_path))
+        df, parsed = self.load_counting_builds()
+        self.assertTrue(parsed)
+        self.assertEqual(df['SALES'].iloc[0], 1000.0)
+        self.assertTrue(self.cache.is_fresh(self.csv_path))
+
+    def test_touched_csv_keeps_the_cache(self):
+        """Test that a new modification time with the same contents reuses the cache."""
+        self.cache.load(self.csv_path)
+        stat = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        _, parsed = self.load_counting_builds()
+        self.assertFalse(parsed)
+
+    def test_verify_catches_edits_keeping_size_and_mtime(self):
+        """Test that verify=True hashes the file even when its size and modification time are unchanged."""
+        self.cache.load(self.csv_path)
+        stat = os.stat(self.csv_path)
+        self.csv_path.write_text(self.csv_path.read_text().replace('2871.0', '2872.0'))
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertTrue(self.cache.is_fresh(self.csv_path))
+        self.cache.verify = True
+        df, parsed = self.load_counting_builds()
+        self.assertTrue(parsed)
+        self.assertEqual(df['SALES'].iloc[0], 2872.0)
+
+    def test_cached_frame_is_usable(self):
+        """Test that the memory-mapped frame groups like a loaded one and that changing it leaves the cache alone."""
+        df = self.cache.load(self.csv_path)
+        self.assertEqual(sales_by_country(df).to_dict(), {'France': 2765.9 + 3884.34, 'USA': 2871.0 + 3746.7})
+        df.loc[0, 'SALES'] = 0.0
+        self.assertEqual(self.cache.load(self.csv_path)['SALES'].iloc[0], 2871.0)
+
+    def test_overlapping_builds(self):
+        """Test that a build finding another process's cache in place, old or just published, ends with a fresh cache."""
+        replace = os.replace
+        other = ColumnarCache(self.cache.directory)
+        interrupted = []
+
+        def other_process_publishes_first(source, target):
+            if not interrupted:
+                interrupted.append(target)
+                other.build(self.csv_path)
+            replace(source, target)
+
+        for _ in range(2): # first without a cache, then over a stale one
+            interrupted.clear()
+            with patch.object(src.columnar_cache.os, 'replace', side_effect=other_process_publishes_first):
+                metadata = self.cache.build(self.csv_path)
+            self.assertEqual(metadata['rows'], 4)
+            self.assertTrue(self.cache.is_fresh(self.csv_path))
+            pd.testing.assert_frame_equal(self.cache.load(self.csv_path), load_sales_data(self.csv_path))
+            self.assertEqual(os.listdir(self.cache.directory), [self.cache.path_for(self.csv_path).name])
+            self.df.loc[0, 'SALES'] = 1000.0
+            self.df.to_csv(self.csv_path, index=False)
+
+    def test_empty_csv(self):
+        """Test a CSV with a header and no rows."""
+        self.df.iloc[:0].to_csv(self.csv_path, index=False)
+        self.cache.load(self.csv_path)
+        self.assertEqual(len(self.cache.load(self.csv_path)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
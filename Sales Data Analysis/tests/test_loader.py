@@ -0,0 +1,107 @@
+import contextlib
+import io
+import tempfile
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregation import SalesAggregates
+from src.analysis import (
+    overall_analysis,
+    country_level_analysis,
+    product_level_analysis,
+    yearly_analysis,
+    order_status_analysis,
+    customer_level_analysis,
+)
+from src.analysis_utils import filter_by_status, sales_by_country
+from src.loader import columns_for, load_sales_data, load_stats, optimize_dtypes
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "sales_data_sample.csv"
+
+
+class TestLoader(unittest.TestCase):
+    """Test cases for the schema-aware loader."""
+
+    def setUp(self):
+        """Write test data to a CSV file."""
+        self.df = pd.DataFrame({
+            'ORDERNUMBER': [10107, 10121, 10134, 10145],
+            'SALES': [2871.0, 2765.9, 3884.34, 3746.7],
+            'COUNTRY': ['USA', 'France', 'France', 'USA'],
+            'PRODUCTLINE': ['Motorcycles', 'Motorcycles', 'Planes', 'Motorcycles'],
+            'YEAR_ID': [2003, 2003, 2003, 2004],
+            'QTR_ID': [1, 2, 3, 1],
+            'STATUS': ['Shipped', 'Shipped', 'Shipped', 'Cancelled'],
+            'QUANTITYORDERED': [30, 34, 41, 45],
+            'CUSTOMERNAME': ['Customer1', 'Customer2', 'Customer3', 'Customer1'],
+            'PHONE': ['2125557818'] * 4,
+        })
+        self._directory = tempfile.TemporaryDirectory()
+        self.csv_path = Path(self._directory.name) / "sales.csv"
+        self.df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_columns_for(self):
+        """Test that the requested reports decide the columns, each listed once."""
+        self.assertEqual(columns_for(['country', 'order_status']), ['SALES', 'COUNTRY', 'STATUS'])
+        self.assertNotIn('PHONE', columns_for())
+        with self.assertRaises(ValueError):
+            columns_for(['forecast'])
+
+    def test_load_prunes_columns_and_compacts_dtypes(self):
+        """Test that only the needed columns are read, strings as category and integers downcast."""
+        df = load_sales_data(self.csv_path, ['overall', 'yearly', 'order_status'])
+        self.assertEqual(set(df.columns), {'SALES', 'ORDERNUMBER', 'CUSTOMERNAME', 'PRODUCTLINE', 'YEAR_ID', 'QTR_ID', 'STATUS'})
+        self.assertEqual(df['STATUS'].dtype, 'category')
+        self.assertEqual(df['CUSTOMERNAME'].dtype, 'category')
+        self.assertEqual(df['QTR_ID'].dtype, 'int8')
+        self.assertEqual(df['YEAR_ID'].dtype, 'int16')
+        self.assertEqual(df['SALES'].dtype, 'float64')
+        self.assertEqual(df['ORDERNUMBER'].tolist(), self.df['ORDERNUMBER'].tolist())
+
+    def test_optimize_dtypes_keeps_missing_integers(self):
+        """Test that an integer column with gaps is left as float and the frame passed in is not changed."""
+        df = self.df.astype({'QTR_ID': 'float64'})
+        df.loc[0, 'QTR_ID'] = None
+        optimized = optimize_dtypes(df)
+        self.assertEqual(optimized['QTR_ID'].dtype, 'float64')
+        self.assertEqual(optimized['COUNTRY'].dtype, 'category')
+        self.assertNotEqual(df['COUNTRY'].dtype, 'category')
+
+    def test_filtered_groups_leave_out_unobserved_categories(self):
+        """Test that grouping a filtered frame only shows the categories left in it."""
+        df = load_sales_data(self.csv_path)
+        cancelled = filter_by_status(df, 'Cancelled')
+        self.assertEqual(sales_by_country(cancelled).to_dict(), {'USA': 3746.7})
+
+    def test_load_stats(self):
+        """Test that the loaded frame is reported smaller than the default one."""
+        df = load_sales_data(self.csv_path)
+        stats = load_stats(self.csv_path, df)
+        self.assertEqual((stats.rows, stats.columns), (4, len(columns_for())))
+        self.assertLess(stats.nbytes, stats.default_nbytes)
+
+    def test_report_is_the_same_with_compact_dtypes(self):
+        """Test that the whole report prints the same from the sample file either way."""
+        def report(df):
+            output = io.StringIO()
+            aggregates = SalesAggregates(df)
+            with contextlib.redirect_stdout(output):
+                for analysis in (overall_analysis, country_level_analysis, product_level_analysis, yearly_analysis,
+                                 order_status_analysis, customer_level_analysis):
+                    analysis(df, aggregates)
+            return output.getvalue()
+
+        default = pd.read_csv(SAMPLE_CSV, encoding='latin-1')
+        self.assertEqual(report(load_sales_data(SAMPLE_CSV)), report(default))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import contextlib
+import io
+import math
+import tempfile
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Adding parent directory to path to import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.streaming
+from src.aggregation import SalesAggregates
+from src.analysis import (
+    overall_analysis,
+    country_level_analysis,
+    product_level_analysis,
+    yearly_analysis,
+    order_status_analysis,
+    customer_level_analysis,
+)
+from src.streaming import PartialAggregates, StreamingAggregates
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "sales_data_sample.csv"
+
+
+class TestStreamingAggregates(unittest.TestCase):
+    """Test cases for the streaming mode."""
+
+    def setUp(self):
+        """Write test data to a CSV file."""
+        self.df = pd.DataFrame({
+            'ORDERNUMBER': [10107, 10121, 10134, 10145, 10159, 10159, 10160],
+            'SALES': [2871.0, 2765.9, 3884.34, 3746.7, 5205.27, 1000.0, 2765.9],
+            'COUNTRY': ['USA', 'France', 'France', 'USA', 'USA', 'Spain', 'Spain'],
+            'PRODUCTLINE': ['Motorcycles', 'Motorcycles', 'Planes', 'Motorcycles', 'Planes', 'Ships', 'Ships'],
+            'YEAR_ID': [2003, 2003, 2003, 2004, 2004, 2004, 2005],
+            'QTR_ID': [1, 2, 3, 1, 2, 2, 1],
+            'STATUS': ['Shipped', 'Shipped', 'Shipped', 'Cancelled', 'Shipped', 'Shipped', 'On Hold'],
+            'QUANTITYORDERED': [30, 34, 41, 45, 49, 10, 12],
+            'CUSTOMERNAME': ['Customer1', 'Customer2', 'Customer3', 'Customer1', 'Customer4', 'Customer4', 'Customer5'],
+            'PHONE': ['2125557818'] * 7,
+        })
+        self._directory = tempfile.TemporaryDirectory()
+        self.csv_path = Path(self._directory.name) / "sales.csv"
+        self.df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_matches_the_in_memory_aggregates(self):
+        """Test that every chunk size gives the aggregates of the whole frame."""
+        expected = SalesAggregates(self.df)
+        for chunksize in (1, 2, 3, 100):
+            streamed = StreamingAggregates(self.csv_path, chunksize=chunksize)
+            self.assertAlmostEqual(streamed.total_sales, expected.total_sales, places=6)
+            self.assertAlmostEqual(streamed.average_sales, expected.average_sales, places=6)
+            self.assertEqual((streamed.total_orders, streamed.total_customers, streamed.total_products),
+                             (expected.total_orders, expected.total_customers, expected.total_products))
+            for name in ('sales_by_country', 'countries_by_sales', 'sales_by_product', 'products_by_sales', 'products_by_quantity',
+                         'sales_by_year_and_quarter', 'sales_by_year', 'best_quarter_each_year', 'worst_quarter_each_year',
+                         'sales_by_customer'):
+                pd.testing.assert_series_equal(getattr(streamed, name), getattr(expected, name), check_exact=False)
+            for status in ('Shipped', 'Cancelled', 'On Hold', 'Disputed'):
+                self.assertEqual(streamed.count_with_status(status), expected.count_with_status(status))
+                self.assertAlmostEqual(streamed.sales_with_status(status), expected.sales_with_status(status), places=6)
+
+    def test_percentile_is_exact(self):
+        """Test percentiles against pandas, including when only a few candidates may be held."""
+        for candidates in (100_000, 2):
+            with patch.object(src.streaming, 'PERCENTILE_CANDIDATES', candidates):
+                streamed = StreamingAggregates(self.csv_path, chunksize=2)
+                for percentile in (0.0, 0.25, 0.5, 0.75, 0.9, 1.0):
+                    value = streamed.sales_percentile(percentile)
+                    self.assertAlmostEqual(value, self.df['SALES'].quantile(percentile), places=9)
+                    self.assertEqual(streamed.count_above(value), (self.df['SALES'] > value).sum())
+                self.assertEqual(streamed.count_above(2800), (self.df['SALES'] > 2800).sum())
+
+    def test_percentile_with_negative_and_repeated_values(self):
+        """Test percentiles of refunds (negative sales) and long runs of equal values."""
+        self.df['SALES'] = [-250.5, -0.0, 0.0, 99.99, 99.99, 99.99, 1e6]
+        self.df.to_csv(self.csv_path, index=False)
+        for candidates in (100_000, 2):
+            with patch.object(src.streaming, 'PERCENTILE_CANDIDATES', candidates):
+                streamed = StreamingAggregates(self.csv_path, chunksize=3)
+                for percentile in (0.0, 0.2, 0.3, 0.5, 0.75, 0.95, 1.0):
+                    self.assertAlmostEqual(streamed.sales_percentile(percentile), self.df['SALES'].quantile(percentile), places=9)
+
+    def test_partial_aggregates_merge(self):
+        """Test that merging the partials of two halves equals the partial of the whole."""
+        whole = PartialAggregates.from_chunk(self.df)
+        merged = PartialAggregates.from_chunk(self.df.iloc[:3]).merge(PartialAggregates.from_chunk(self.df.iloc[3:]))
+        self.assertEqual((merged.rows, merged.sales_count, len(merged.orders)), (whole.rows, whole.sales_count, len(whole.orders)))
+        self.assertAlmostEqual(merged.sales_sum, whole.sales_sum, places=6)
+        pd.testing.assert_frame_equal(merged.product_totals, whole.product_totals)
+        pd.testing.assert_frame_equal(merged.status_totals, whole.status_totals)
+
+    def test_missing_sales_are_skipped(self):
+        """Test that empty SALES cells are left out of the mean and the percentiles, like pandas does."""
+        self.df.loc[2, 'SALES'] = math.nan
+        self.df.to_csv(self.csv_path, index=False)
+        streamed = StreamingAggregates(self.csv_path, chunksize=3)
+        self.assertAlmostEqual(streamed.average_sales, self.df['SALES'].mean(), places=6)
+        self.assertAlmostEqual(streamed.sales_percentile(0.75), self.df['SALES'].quantile(0.75), places=9)
+
+    def test_invalid_chunksize(self):
+        """Test that a chunk must hold at least one row."""
+        with self.assertRaises(ValueError):
+            StreamingAggregates(self.csv_path, chunksize=0)
+
+    def test_report_is_the_same_in_streaming_mode(self):
+        """Test that the whole report prints the same from the sample file either way."""
+        def report(df, aggregates):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                for analysis in (overall_analysis, country_level_analysis, product_level_analysis, yearly_analysis,
+                                 order_status_analysis, customer_level_analysis):
+                    analysis(df, aggregates)
+            return output.getvalue()
+
+        df = pd.read_csv(SAMPLE_CSV, encoding='latin-1')
+        self.assertEqual(report(None, StreamingAggregates(SAMPLE_CSV, chunksize=500)), report(df, SalesAggregates(df)))
+
+
+if __name__ == '__main__':
+    unittest.main()